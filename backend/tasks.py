@@ -1,16 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
 from celery import Celery
-from scrapers.amazon_scraper import search_amazon
-from scrapers.flipkart_scraper import search_flipkart
+from scrapers import config as scraper_config
+from scrapers.engine import FAILED, commit_validators_sync, search_all_sync
+from scrapers.resolver import get_resolver
 from scrapers.review_scraper import scrape_reviews_amazon, scrape_reviews_flipkart
 
 celery_app = Celery('tasks', broker='redis://localhost:6379/0')
+# The product resolver index lives in process memory, so resolve_offers has a queue
+# of its own, consumed by a single worker process (celery-resolver in docker-compose.yml)
+celery_app.conf.task_routes = {'*.resolve_offers': {'queue': 'resolver'}}
+
+ML_PIPELINE_DIR = os.getenv('ML_PIPELINE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml'))
+ML_PYTHON = os.getenv('ML_PYTHON', sys.executable)  # interpreter with the ml/ requirements
 
 @celery_app.task
 def periodic_scrape(query):
-    amazon_results = search_amazon(query)
-    flipkart_results = search_flipkart(query)
-    # Save results to DB (omitted for brevity)
-    return {'amazon': amazon_results, 'flipkart': flipkart_results}
+    # All marketplaces are queried concurrently; a slow or failing site yields FAILED
+    # instead of blocking. Sites whose result page is unchanged since the last run come
+    # back as None. Neither is written, so a failure is not stored as zero offers.
+    results = search_all_sync(query, skip_unchanged=True)
+    changed = {site: result for site, result in results.items() if result is not None and result is not FAILED}
+    resolve_offers.delay([row for result in changed.values() for row in result.rows],
+                         {result.url: result.validators for result in changed.values()})
+    return {site: result.rows for site, result in changed.items()}
+
+@celery_app.task
+def resolve_offers(offers, validators=None):
+    # Attaches each offer to a canonical product (product_id). Runs on the 'resolver'
+    # queue: one process owns the index and its snapshot, see task_routes above.
+    resolver = get_resolver()
+    offers = resolver.resolve_offers(offers)
+    resolver.maybe_save(scraper_config.RESOLVER_SNAPSHOT, scraper_config.RESOLVER_SAVE_INTERVAL)
+    # Save offers and any new products to DB (omitted for brevity)
+    # Only now are the pages marked as seen: if anything above fails, the next
+    # periodic_scrape fetches and writes them again instead of skipping them
+    commit_validators_sync(validators or {})
+    return offers
 
 @celery_app.task
 def check_price_alerts():
@@ -18,6 +47,9 @@ def check_price_alerts():
     pass
 
 @celery_app.task
-def retrain_sentiment_model():
-    # Trigger ML pipeline for retraining (omitted for brevity)
-    pass
+def retrain_sentiment_model(force=False):
+    # Incremental: only new or changed scrape files are ingested and preprocessed
+    # (see ml/dataset_store.py), and the model is retrained only if the dataset changed.
+    command = [ML_PYTHON, 'retrain.py'] + (['--force'] if force else [])
+    completed = subprocess.run(command, cwd=ML_PIPELINE_DIR, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
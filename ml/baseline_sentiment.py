@@ -6,9 +6,13 @@ Uses TextBlob for basic sentiment analysis - will be replaced with advanced mode
 import joblib
 from textblob import TextBlob
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import logging
 
+from batch_sentiment import LexiconBatchScorer, label_polarity
+from sentiment_cache import cached_predict_batch, get_cache
+from sentiment_pool import get_pool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,7 +25,8 @@ class BaselineSentimentAnalyzer:
     
     def __init__(self):
         self.model_name = "textblob_baseline"
-        self.version = "1.0.0"
+        self.version = "1.0.1"  # 1.0.0 cached wrong batch scores for words with leading punctuation
+        self._batch_scorer = None
     
     def predict_sentiment(self, text: str) -> Dict[str, float]:
         """
@@ -36,24 +41,7 @@ class BaselineSentimentAnalyzer:
         try:
             blob = TextBlob(text)
             polarity = blob.sentiment.polarity  # -1 to 1
-            
-            # Convert polarity to sentiment label
-            if polarity > 0.1:
-                label = "positive"
-                confidence = min(polarity, 1.0)
-            elif polarity < -0.1:
-                label = "negative" 
-                confidence = min(abs(polarity), 1.0)
-            else:
-                label = "neutral"
-                confidence = 1.0 - abs(polarity)
-            
-            return {
-                "text": text,
-                "sentiment": label,
-                "confidence": confidence,
-                "polarity": polarity
-            }
+            return self._prediction(text, polarity)
             
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {e}")
@@ -61,20 +49,46 @@ class BaselineSentimentAnalyzer:
                 "text": text,
                 "sentiment": "neutral",
                 "confidence": 0.5,
-                "polarity": 0.0
+                "polarity": 0.0,
+                "error": True
             }
     
-    def predict_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+    def _prediction(self, text: str, polarity: float) -> Dict[str, float]:
+        # Convert polarity to sentiment label
+        label, confidence = label_polarity(polarity)
+        return {
+            "text": text,
+            "sentiment": label,
+            "confidence": confidence,
+            "polarity": polarity
+        }
+    
+    def predict_batch(self, texts: List[str], workers: Optional[int] = None) -> List[Dict[str, float]]:
         """
         Predict sentiment for multiple texts
         
+        Scores the whole batch at once with LexiconBatchScorer, which gives
+        the same polarities as predict_sentiment (up to float rounding).
+        
         Args:
             texts: List of texts to analyze
+            workers: Score large batches across this many processes
+                (see sentiment_pool; -1 for one per CPU, None to stay in-process)
             
         Returns:
-            List of sentiment predictions
+            List of sentiment predictions, in the order of texts
         """
-        return [self.predict_sentiment(text) for text in texts]
+        if workers is not None and workers != 1:
+            return get_pool(workers).predict_batch(texts)
+        try:
+            if self._batch_scorer is None:
+                self._batch_scorer = LexiconBatchScorer()
+            polarities = self._batch_scorer.polarity(texts)
+        except Exception as e:
+            # e.g. a non-string text; score one by one so only that text degrades
+            logger.error(f"Error in batch sentiment scoring, scoring texts one by one: {e}")
+            return [self.predict_sentiment(text) for text in texts]
+        return [self._prediction(text, float(polarity)) for text, polarity in zip(texts, polarities)]
     
     def get_summary_stats(self, predictions: List[Dict[str, float]]) -> Dict[str, int]:
         """
@@ -118,6 +132,9 @@ def analyze_review_sentiment(reviews: List[str]) -> Dict:
     """
     Analyze sentiment for a list of reviews
     
+    Reviews scored before by the same model version come from the sentiment
+    cache; only new texts are scored.
+    
     Args:
         reviews: List of review texts
         
@@ -125,7 +142,7 @@ def analyze_review_sentiment(reviews: List[str]) -> Dict:
         Dictionary with predictions and summary
     """
     model = get_model()
-    predictions = model.predict_batch(reviews)
+    predictions = cached_predict_batch(model, reviews, get_cache())
     summary = model.get_summary_stats(predictions)
     
     return {
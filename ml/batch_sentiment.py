@@ -0,0 +1,128 @@
+"""
+Vectorized batch scoring for the TextBlob baseline
+
+TextBlob's polarity for a text is the mean polarity of the lexicon words in it,
+adjusted by modifiers ("very good"), negations ("not good"), exclamation
+marks and emoticons. Most reviews use none of those adjustments, so their
+polarity is a plain lexicon average, which for a whole batch is two sparse
+matrix-vector products over a word-occurrence matrix. The matrix keeps one
+entry per occurrence in text order, so the sums are taken in the same order
+as TextBlob's and the polarities come out bit-identical.
+
+LexiconBatchScorer scores such texts that way and sends the rest (anything
+with a negation, a modifier word, "!" or other punctuation) through TextBlob's
+own analyzer, so results match the per-text TextBlob loop exactly. Duplicate
+texts in a batch are scored once.
+"""
+
+import re
+from typing import Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from textblob.en import sentiment as pattern_sentiment
+
+# Texts made of these characters, with no chunk starting with '.', ',' or '-',
+# tokenize like TextBlob does when split on whitespace and stripped of trailing
+# '.', ',' and '-'. TextBlob keeps leading punctuation on a word (".good" is not
+# in the lexicon), so those texts go through its analyzer.
+_PLAIN_TEXT = re.compile(r"(?:[A-Za-z0-9]|(?<=\S)[.,\-]|[ \n\t])*")
+# A whitespace-separated chunk without its trailing '.', ',' and '-'
+_TOKEN = re.compile(r"(?:(?<=\s)|^)([^\s]*?[^\s.,\-])[.,\-]*(?=\s|$)")
+# Emoticons that are made of plain-text characters
+_PLAIN_EMOTICONS = ('8-d', 'x-d', 'o.o')
+
+
+class LexiconBatchScorer:
+    """
+    Batch polarity scorer equivalent to TextBlob(text).sentiment.polarity
+    """
+
+    def __init__(self, sentiment=pattern_sentiment):
+        self.sentiment = sentiment
+        if not len(sentiment):
+            sentiment.load()
+        special = set(sentiment.negations) | set(_PLAIN_EMOTICONS)
+        polarity = {}
+        for word, scores in sentiment.items():
+            if any(pos in scores for pos in sentiment.modifiers):
+                special.add(word)
+            elif None in scores:
+                polarity[word] = scores[None][0]
+        words = sorted(polarity)
+        special = sorted(special - set(words))
+        self._vocabulary = {word: i for i, word in enumerate(words + special)}
+        self._polarity = np.array([polarity[w] for w in words] + [0.0] * len(special))
+        self._known = np.array([1.0] * len(words) + [0.0] * len(special))
+        self._special = np.array([0.0] * len(words) + [1.0] * len(special))
+
+    def polarity(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Polarity (-1 to 1) of every text
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            Array of polarities, in the order of texts
+        """
+        unique = list(dict.fromkeys(texts))
+        position = {text: i for i, text in enumerate(unique)}
+        scores = np.zeros(len(unique))
+
+        plain = [i for i, text in enumerate(unique) if _PLAIN_TEXT.fullmatch(text)]
+        if plain:
+            counts = self._occurrences([unique[i] for i in plain])
+            known = counts @ self._known
+            adjusted = counts @ self._special
+            totals = counts @ self._polarity
+            plain = np.asarray(plain)
+            simple = adjusted == 0
+            scores[plain[simple]] = np.divide(totals[simple], known[simple], out=np.zeros(simple.sum()),
+                                              where=known[simple] > 0)
+            fallback = set(plain[~simple].tolist())
+        else:
+            fallback = set()
+        fallback.update(i for i, text in enumerate(unique) if not _PLAIN_TEXT.fullmatch(text))
+
+        for i in fallback:
+            scores[i] = self.sentiment(unique[i])[0]
+        return scores[[position[text] for text in texts]]
+
+    def _occurrences(self, texts: Sequence[str]) -> csr_matrix:
+        # One entry per lexicon word occurrence, in text order, duplicates not summed
+        vocabulary = self._vocabulary
+        indices, indptr = [], [0]
+        for text in texts:
+            indices.extend(vocabulary[t] for t in _TOKEN.findall(text.lower()) if t in vocabulary)
+            indptr.append(len(indices))
+        return csr_matrix((np.ones(len(indices)), np.asarray(indices, dtype=np.int32), indptr),
+                          shape=(len(texts), len(vocabulary)))
+
+    def fallback_share(self, texts: Sequence[str]) -> float:
+        """Fraction of distinct texts that need TextBlob's per-text analyzer"""
+        unique = list(dict.fromkeys(texts))
+        if not unique:
+            return 0.0
+        plain = [text for text in unique if _PLAIN_TEXT.fullmatch(text)]
+        simple = 0
+        if plain:
+            simple = int((self._occurrences(plain) @ self._special == 0).sum())
+        return 1.0 - simple / len(unique)
+
+
+def label_polarity(polarity: float) -> Tuple[str, float]:
+    """
+    Map a polarity to the baseline's (label, confidence)
+
+    Args:
+        polarity: Polarity between -1 and 1
+
+    Returns:
+        (label, confidence)
+    """
+    if polarity > 0.1:
+        return "positive", min(polarity, 1.0)
+    if polarity < -0.1:
+        return "negative", min(abs(polarity), 1.0)
+    return "neutral", 1.0 - abs(polarity)
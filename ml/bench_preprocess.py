@@ -0,0 +1,77 @@
+"""
+Benchmark fast_preprocess against preprocess.clean_text
+
+Cleans a review corpus with df['text'].apply(clean_text) (what
+preprocess_dataset does), with the vectorized clean_texts, and end to end
+through preprocess_dataset_parallel; checks that the outputs are identical
+and reports rows/sec.
+
+    python bench_preprocess.py [--reviews 50000] [--csv review_dataset.csv] [--workers 8]
+
+Without --csv a synthetic corpus of raw reviews (HTML, punctuation, emoji) is used.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from bench_sentiment import synthetic_reviews
+from fast_preprocess import clean_texts, preprocess_dataset_parallel
+from preprocess import clean_text
+
+NOISE = ["<br/>", "<b>Verified</b> ", " 👍", "!!", " I wanna return it", " Can't complain.", "\n", " 5/5", " gonna buy again"]
+
+
+def raw_reviews(n, seed=0):
+    """Synthetic reviews with the markup and punctuation scraped reviews have"""
+    rng = random.Random(seed)
+    return [text + "".join(rng.sample(NOISE, rng.randint(0, 3))) for text in synthetic_reviews(n, seed)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel text preprocessing")
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--csv", help="CSV with a 'text' column, e.g. review_dataset.csv")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv, nrows=args.reviews)
+    else:
+        df = pd.DataFrame({"text": raw_reviews(args.reviews), "rating": 5})
+
+    start = time.perf_counter()
+    expected = df["text"].apply(clean_text)
+    apply_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = clean_texts(df["text"])
+    vectorized_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_csv = os.path.join(directory, "raw.csv")
+        output_csv = os.path.join(directory, "clean.csv")
+        df.to_csv(input_csv, index=False)
+        start = time.perf_counter()
+        preprocess_dataset_parallel(input_csv, output_csv, chunksize=max(len(df) // 16, 1000), workers=args.workers)
+        parallel_seconds = time.perf_counter() - start
+        with open(output_csv, "rb") as f:
+            parallel_bytes = f.read()
+    expected_bytes = df.assign(text=expected).to_csv(index=False).encode()
+
+    rows = len(df)
+    print(f"{rows} reviews")
+    print(f"apply(clean_text)           : {rows / apply_seconds:10.0f} rows/sec")
+    print(f"clean_texts                 : {rows / vectorized_seconds:10.0f} rows/sec "
+          f"({apply_seconds / vectorized_seconds:.1f}x)")
+    print(f"preprocess_dataset_parallel : {rows / parallel_seconds:10.0f} rows/sec "
+          f"({apply_seconds / parallel_seconds:.1f}x, including CSV read and write)")
+    print(f"identical: texts {vectorized.equals(expected)}, file {parallel_bytes == expected_bytes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark batch sentiment scoring against the per-text TextBlob loop
+
+Scores a review corpus with BaselineSentimentAnalyzer.predict_sentiment one
+text at a time (the old predict_batch) and with the vectorized predict_batch,
+checks that both give the same labels and polarities, and reports reviews/sec.
+With --workers the batch is also scored across a process pool (sentiment_pool).
+
+    python bench_sentiment.py [--reviews 20000] [--csv review_dataset.csv] [--workers 8]
+
+Without --csv a synthetic corpus of product reviews is used.
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from baseline_sentiment import BaselineSentimentAnalyzer
+
+OPENERS = ["Good phone", "Terrible product", "Decent value", "Amazing camera", "Poor battery life",
+           "Works fine", "Worst purchase", "Excellent build quality", "Average performance", "Love it"]
+DETAILS = ["the display is bright and sharp", "battery drains quickly", "delivery was fast",
+           "it heats up while gaming", "sound quality is great", "the packaging was damaged",
+           "camera is okay in daylight", "customer support was useless", "fingerprint sensor is slow",
+           "charging is quick", "not worth the price", "really happy with it", "very disappointed",
+           "would recommend to friends", "stopped working after a week"]
+ENDINGS = [".", "!", ". Overall satisfied.", ". Returned it.", "", " :)"]
+
+
+def synthetic_reviews(n, seed=0):
+    """
+    Generate product reviews from templates
+
+    Args:
+        n: Number of reviews
+        seed: Random seed
+
+    Returns:
+        List of review texts (with repeats, like real review pages)
+    """
+    rng = random.Random(seed)
+    reviews = []
+    for _ in range(n):
+        details = ", ".join(rng.sample(DETAILS, rng.randint(1, 3)))
+        reviews.append(f"{rng.choice(OPENERS)}, {details}{rng.choice(ENDINGS)}")
+    return reviews
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch sentiment scoring")
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--csv", help="CSV with a 'text' column, e.g. review_dataset.csv")
+    parser.add_argument("--workers", type=int, help="also score with a process pool (-1 for one per CPU)")
+    args = parser.parse_args()
+
+    if args.csv:
+        texts = pd.read_csv(args.csv)["text"].astype(str).tolist()[:args.reviews]
+    else:
+        texts = synthetic_reviews(args.reviews)
+    model = BaselineSentimentAnalyzer()
+    model.predict_batch(texts[:10])  # build the lexicon matrix outside the timed run
+
+    start = time.perf_counter()
+    loop = [model.predict_sentiment(text) for text in texts]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = model.predict_batch(texts)
+    batch_seconds = time.perf_counter() - start
+
+    labels_match = all(a["sentiment"] == b["sentiment"] for a, b in zip(loop, batch))
+    max_diff = max(abs(a["polarity"] - b["polarity"]) for a, b in zip(loop, batch))
+    print(f"{len(texts)} reviews ({len(set(texts))} distinct), "
+          f"{model._batch_scorer.fallback_share(texts):.0%} of distinct texts need TextBlob's analyzer")
+    print(f"per-text loop : {len(texts) / loop_seconds:10.0f} reviews/sec")
+    print(f"predict_batch : {len(texts) / batch_seconds:10.0f} reviews/sec ({loop_seconds / batch_seconds:.1f}x)")
+    print(f"labels match: {labels_match}, max polarity difference: {max_diff:.2e}")
+
+    if args.workers is not None:
+        model.predict_batch(texts[:10000], workers=args.workers)  # start the workers outside the timed run
+        start = time.perf_counter()
+        pooled = model.predict_batch(texts, workers=args.workers)
+        pool_seconds = time.perf_counter() - start
+        print(f"process pool  : {len(texts) / pool_seconds:10.0f} reviews/sec "
+              f"({batch_seconds / pool_seconds:.1f}x predict_batch), same output: {pooled == batch}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the quantized ONNX backend against the PyTorch pipeline
+
+Loads the PyTorch model (transformers pipeline, as serve_model does) and the
+int8 ONNX export, checks label parity on the benchmark reviews, then reports
+single-review latency (p50/p95) and batched throughput for both.
+
+    python bench_transformer.py [--model transformer_sentiment_model] [--onnx transformer_sentiment_onnx]
+                                [--csv review_dataset_clean.csv] [--reviews 2000] [--batch-size 32]
+
+Without --csv the synthetic reviews of bench_sentiment are used.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from transformers import pipeline
+
+from bench_sentiment import synthetic_reviews
+from export_onnx import check_parity
+from onnx_runtime import OnnxSentimentPipeline
+
+
+def latency_ms(predict, texts, runs=200):
+    times = []
+    for text in texts[:runs]:
+        start = time.perf_counter()
+        predict([text])
+        times.append(1000 * (time.perf_counter() - start))
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def throughput(predict, texts, batch_size):
+    start = time.perf_counter()
+    predict(texts, batch_size=batch_size, truncation=True)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quantized ONNX backend")
+    parser.add_argument("--model", default="transformer_sentiment_model")
+    parser.add_argument("--onnx", default="transformer_sentiment_onnx")
+    parser.add_argument("--csv", help="CSV with a 'text' column")
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.csv:
+        texts = pd.read_csv(args.csv)["text"].dropna().astype(str).tolist()[:args.reviews]
+    else:
+        texts = synthetic_reviews(args.reviews)
+
+    backends = {
+        "pytorch": pipeline("sentiment-analysis", model=args.model, tokenizer=args.model),
+        "onnx-int8": OnnxSentimentPipeline(args.onnx)
+    }
+    parity = check_parity(args.model, args.onnx, texts, args.batch_size)
+    print(f"parity on {parity['texts']} reviews: {parity['label_agreement']:.2%} labels agree, "
+          f"max probability difference {parity['max_probability_diff']:.4f}")
+
+    print(f"{'backend':<12}{'p50 ms':>9}{'p95 ms':>9}{'reviews/s':>12}")
+    rates = {}
+    for name, predict in backends.items():
+        predict(texts[:args.batch_size], batch_size=args.batch_size, truncation=True)  # warm up
+        p50, p95 = latency_ms(predict, texts)
+        rates[name] = throughput(predict, texts, args.batch_size)
+        print(f"{name:<12}{p50:>9.1f}{p95:>9.1f}{rates[name]:>12.0f}")
+    print(f"onnx-int8 throughput: {rates['onnx-int8'] / rates['pytorch']:.1f}x pytorch")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,21 @@
-import pandas as pd
-import glob
-import os
+import argparse
 
-def build_review_dataset(scraped_dir='scraped_reviews/'):
-    files = glob.glob(os.path.join(scraped_dir, '*.csv'))
-    dfs = [pd.read_csv(f) for f in files]
-    df = pd.concat(dfs, ignore_index=True)
-    # Weak supervision: infer sentiment from rating
-    def infer_sentiment(rating):
-        if rating >= 4:
-            return 'positive'
-        elif rating <= 2:
-            return 'negative'
-        else:
-            return 'neutral'
-    df['sentiment'] = df['rating'].apply(infer_sentiment)
-    df = df[['text', 'sentiment']]
-    df.to_csv('review_dataset.csv', index=False)
-    print('Dataset built:', df.shape)
+from dataset_store import ReviewStore
+
+def build_review_dataset(scraped_dir='scraped_reviews/', store_dir='review_store', export_csv=None):
+    # New and changed scrape files (per the store's manifest) are (re)ingested into
+    # the 'raw' stage, labelled from their rating (see dataset_store.infer_sentiment)
+    store = ReviewStore(store_dir)
+    summary = store.ingest_scraped(scraped_dir)
+    print('Dataset built:', summary, store.count_rows('raw'), 'reviews in total')
+    if export_csv:
+        store.read('raw', columns=['text', 'sentiment']).to_csv(export_csv, index=False)
+    return summary
 
 if __name__ == '__main__':
-    build_review_dataset()
+    parser = argparse.ArgumentParser(description='Ingest scraped reviews into the dataset store')
+    parser.add_argument('--scraped-dir', default='scraped_reviews/')
+    parser.add_argument('--store', default='review_store')
+    parser.add_argument('--export-csv', help='also write the raw dataset as CSV (e.g. review_dataset.csv)')
+    args = parser.parse_args()
+    build_review_dataset(args.scraped_dir, args.store, args.export_csv)
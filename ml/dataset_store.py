@@ -0,0 +1,322 @@
+"""
+Columnar dataset store for the ML pipeline
+
+Each pipeline stage ('raw' from build_dataset.py, 'clean' from preprocess.py)
+is a directory of Parquet files partitioned by the scrape file they came from:
+
+    review_store/
+        raw/source=amazon_2024_03_01/part-0.parquet
+        raw/source=flipkart_2024_03_01/part-0.parquet
+        clean/source=amazon_2024_03_01/part-0.parquet
+
+Labels are stored dictionary-encoded (int8 codes plus the three label strings)
+and come back as a pandas Categorical. Builds are incremental: each stage has a
+manifest (_manifest.json) recording, per partition, the content hash and row
+count of the input it was built from. A new scrape file becomes a new
+partition, a changed one replaces its partition, unchanged ones are not
+read at all, and a deleted one has its partition removed; 'clean' partitions
+are rebuilt only when their 'raw' partition changed, and removed with it. Reads go through pyarrow.dataset on a memory-mapped filesystem, so trainers
+can load only the columns they need, or stream record batches, without
+re-parsing CSV.
+
+    store = ReviewStore()
+    store.ingest_scraped('scraped_reviews/')
+    df = store.read('clean', columns=['text', 'sentiment'])
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.fs as pa_fs
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+LABELS = ["negative", "neutral", "positive"]
+PART_FILE = "part-0.parquet"
+MANIFEST_FILE = "_manifest.json"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def source_name(path: str) -> str:
+    """Partition name for a scrape file: its file name without extension, made path-safe"""
+    return _UNSAFE.sub("_", os.path.splitext(os.path.basename(path))[0])
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """Content hash of a file (blake2b, hex)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path: str, write):
+    """Call write(tmp_path), then move the file to path, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def infer_sentiment(ratings: np.ndarray) -> np.ndarray:
+    """
+    Weak supervision: label reviews from their star rating (vectorized)
+
+    Args:
+        ratings: Star ratings (NaN allowed)
+
+    Returns:
+        Array of 'positive' (>= 4), 'negative' (<= 2) or 'neutral' (anything else)
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    return np.select([ratings >= 4, ratings <= 2], ["positive", "negative"], "neutral")
+
+
+def encode_labels(labels: Sequence[str]) -> pa.DictionaryArray:
+    """Labels as a dictionary array over LABELS"""
+    codes = pd.Index(LABELS).get_indexer(labels)
+    if (codes < 0).any():
+        unknown = sorted({label for label, code in zip(labels, codes) if code < 0}, key=str)
+        raise ValueError(f"Unknown sentiment labels {unknown}, expected {LABELS}")
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()), pa.array(LABELS))
+
+
+class ReviewStore:
+    """
+    Partitioned Parquet store of review datasets, one directory per stage
+    """
+
+    def __init__(self, root: str = "review_store"):
+        """
+        Args:
+            root: Store directory
+        """
+        self.root = root
+        self._fs = pa_fs.LocalFileSystem(use_mmap=True)
+
+    def stage_dir(self, stage: str) -> str:
+        return os.path.join(self.root, stage)
+
+    def part_path(self, stage: str, source: str) -> str:
+        return os.path.join(self.stage_dir(stage), f"source={source}", PART_FILE)
+
+    def sources(self, stage: str) -> List[str]:
+        """Partitions present in a stage, sorted"""
+        pattern = os.path.join(self.stage_dir(stage), "source=*", PART_FILE)
+        return sorted(os.path.basename(os.path.dirname(path))[len("source="):] for path in glob.glob(pattern))
+
+    def write_part(self, stage: str, source: str, df: pd.DataFrame):
+        """
+        Write one partition atomically
+
+        Args:
+            stage: Stage name, e.g. 'raw' or 'clean'
+            source: Partition (scrape file) name
+            df: Rows with 'text' and 'sentiment' columns
+        """
+        table = pa.table({
+            "text": pa.array(df["text"], type=pa.string(), from_pandas=True),
+            "sentiment": encode_labels(df["sentiment"].astype(str).tolist())
+        })
+        write_atomic(self.part_path(stage, source),
+                      lambda tmp_path: pq.write_table(table, tmp_path, compression="zstd"))
+
+    def prune(self, stage: str, keep: Sequence[str]) -> List[str]:
+        """
+        Remove a stage's partitions (and manifest entries) that are not in keep
+
+        Args:
+            stage: Stage name
+            keep: Partitions to keep
+
+        Returns:
+            Sorted names of the removed partitions
+        """
+        manifest = self.manifest(stage)
+        removed = sorted((set(self.sources(stage)) | set(manifest)) - set(keep))
+        for source in removed:
+            shutil.rmtree(os.path.dirname(self.part_path(stage, source)), ignore_errors=True)
+            manifest.pop(source, None)
+            logger.info(f"Removed partition {source} from '{stage}'")
+        if removed:
+            self.save_manifest(stage, manifest)
+        return removed
+
+    def manifest(self, stage: str) -> Dict[str, Dict]:
+        """
+        What each partition of a stage was built from
+
+        Returns:
+            Partition name -> {'digest', 'rows', ...} ({} for a stage without a manifest)
+        """
+        path = os.path.join(self.stage_dir(stage), MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, stage: str, manifest: Dict[str, Dict]):
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        write_atomic(os.path.join(self.stage_dir(stage), MANIFEST_FILE), write)
+
+    def dataset(self, stage: str, sources: Optional[Sequence[str]] = None) -> ds.Dataset:
+        """
+        pyarrow dataset over a stage (memory-mapped, partitions in sorted order)
+
+        Args:
+            stage: Stage name
+            sources: Only these partitions (default all)
+        """
+        sources = self.sources(stage) if sources is None else sorted(sources)
+        paths = [self.part_path(stage, source) for source in sources]
+        return ds.dataset(paths, format="parquet", filesystem=self._fs,
+                          partitioning=ds.partitioning(flavor="hive"), partition_base_dir=self.stage_dir(stage))
+
+    def read(self, stage: str, columns: Optional[List[str]] = None,
+             sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Load a stage into pandas
+
+        Args:
+            stage: Stage name
+            columns: Columns to load (default all, including 'source')
+            sources: Only these partitions (default all)
+
+        Returns:
+            DataFrame, 'sentiment' as a Categorical
+        """
+        return self.dataset(stage, sources).to_table(columns=columns).to_pandas()
+
+    def iter_batches(self, stage: str, columns: Optional[List[str]] = None,
+                     batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream a stage in order as DataFrames of up to batch_size rows
+
+        Args:
+            stage: Stage name
+            columns: Columns to load
+            batch_size: Most rows per DataFrame
+        """
+        for batch in self.dataset(stage).to_batches(columns=columns, batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def count_rows(self, stage: str) -> int:
+        return self.dataset(stage).count_rows()
+
+    def ingest_scraped(self, scraped_dir: str = "scraped_reviews/") -> Dict[str, int]:
+        """
+        Bring the 'raw' stage up to date with the scrape files
+
+        Files whose size and modification time match the manifest are skipped
+        without reading them; otherwise their content hash decides. Partitions
+        of files no longer in scraped_dir are removed.
+
+        Args:
+            scraped_dir: Directory of scraped review CSVs ('text' and 'rating' columns)
+
+        Returns:
+            Counts of 'new', 'changed', 'unchanged' and 'removed' files and rows 'ingested'
+
+        Raises:
+            FileNotFoundError: If scraped_dir does not exist
+            ValueError: If two file names map to the same partition name
+        """
+        if not os.path.isdir(scraped_dir):
+            # Otherwise a wrong path would look like every file was deleted
+            raise FileNotFoundError(f"Scrape directory {scraped_dir} does not exist")
+        manifest = self.manifest("raw")
+        present = set(self.sources("raw"))
+        summary = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "ingested": 0}
+        files = {}
+        for path in sorted(glob.glob(os.path.join(scraped_dir, "*.csv"))):
+            source = source_name(path)
+            if source in files:
+                # Checked before ingesting anything, so one file can't silently replace another
+                raise ValueError(f"{files[source]} and {path} both map to partition {source}; rename one")
+            files[source] = path
+        seen = set(files)
+        for source, path in files.items():
+            stat = os.stat(path)
+            entry = manifest.get(source)
+            if entry and source in present and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                summary["unchanged"] += 1
+                continue
+            digest = file_digest(path)
+            if entry and source in present and entry["digest"] == digest:
+                # Touched but not modified
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                summary["unchanged"] += 1
+                continue
+            rows = self._ingest_file(path, source)
+            manifest[source] = {"input": path, "digest": digest, "rows": rows,
+                                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            summary["changed" if source in present else "new"] += 1
+            summary["ingested"] += rows
+            present.add(source)
+            # Saved per file, so an interrupted build resumes where it stopped
+            self.save_manifest("raw", manifest)
+        self.save_manifest("raw", manifest)
+        summary["removed"] = len(self.prune("raw", seen))
+        return summary
+
+    def _ingest_file(self, path: str, source: str) -> int:
+        table = pa_csv.read_csv(
+            path,
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(include_columns=["text", "rating"],
+                                                  column_types={"text": pa.string(), "rating": pa.float64()})
+        )
+        df = pd.DataFrame({
+            "text": table.column("text").to_pandas(),
+            "sentiment": infer_sentiment(table.column("rating").to_numpy(zero_copy_only=False))
+        })
+        self.write_part("raw", source, df)
+        logger.info(f"Ingested {len(df)} reviews from {path}")
+        return len(df)
+
+    def stale_sources(self, stage: str, upstream: str) -> List[str]:
+        """
+        Partitions of upstream that stage is missing or built from an older version of
+
+        Args:
+            stage: Derived stage, e.g. 'clean'
+            upstream: Stage it is built from, e.g. 'raw'
+
+        Returns:
+            Sorted partition names to (re)build
+        """
+        upstream_manifest = self.manifest(upstream)
+        manifest = self.manifest(stage)
+        present = set(self.sources(stage))
+        return [source for source in self.sources(upstream)
+                if source not in present
+                or manifest.get(source, {}).get("digest") != upstream_manifest.get(source, {}).get("digest")]
+
+    def record(self, stage: str, source: str, upstream: str, rows: int):
+        """Note in stage's manifest that source was built from upstream's current version"""
+        manifest = self.manifest(stage)
+        manifest[source] = {"digest": self.manifest(upstream).get(source, {}).get("digest"), "rows": rows}
+        self.save_manifest(stage, manifest)
@@ -0,0 +1,137 @@
+"""
+Export the transformer sentiment model to ONNX with int8 dynamic quantization
+
+Reads the model saved by train_transformer.py, writes an fp32 ONNX graph with
+dynamic batch and sequence axes, quantizes its weights to int8 (activations
+are quantized on the fly at run time) and copies the tokenizer and config next
+to it, so the directory is all onnx_runtime.OnnxSentimentPipeline needs.
+
+The export then runs a parity check: quantized and PyTorch predictions on a
+sample of reviews must agree on at least --min-agreement of the labels.
+
+    python export_onnx.py [--model transformer_sentiment_model] [--output transformer_sentiment_onnx]
+                          [--csv review_dataset_clean.csv] [--min-agreement 0.98]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from onnx_runtime import QUANTIZED_MODEL_FILE, OnnxSentimentPipeline, softmax
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FP32_MODEL_FILE = "model.onnx"
+
+
+def export(model_dir: str, output_dir: str, opset: int = 14) -> str:
+    """
+    Export and quantize a sequence classification model
+
+    Args:
+        model_dir: Directory with the saved transformers model and tokenizer
+        output_dir: Directory to write the ONNX graphs, tokenizer and config to
+        opset: ONNX opset version
+
+    Returns:
+        Path of the quantized graph
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+    fp32_path = os.path.join(output_dir, FP32_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names},
+                          "logits": {0: "batch"}},
+            opset_version=opset
+        )
+    logger.info(f"Exported fp32 graph to {fp32_path}")
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(fp32_path, quantized_path, weight_type=QuantType.QInt8)
+    logger.info(f"Quantized graph written to {quantized_path} "
+                f"({os.path.getsize(fp32_path) / 2**20:.0f} MB -> {os.path.getsize(quantized_path) / 2**20:.0f} MB)")
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.return_dict = True
+    model.config.save_pretrained(output_dir)
+    return quantized_path
+
+
+def check_parity(model_dir: str, onnx_dir: str, texts: Sequence[str], batch_size: int = 32) -> Dict[str, float]:
+    """
+    Compare quantized ONNX predictions with the PyTorch model
+
+    Args:
+        model_dir: Directory with the saved transformers model
+        onnx_dir: Directory written by export()
+        texts: Reviews to compare on
+        batch_size: Texts per forward pass
+
+    Returns:
+        Dictionary with label agreement and the largest probability difference
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+    onnx_model = OnnxSentimentPipeline(onnx_dir)
+
+    texts = list(texts)
+    torch_probs, onnx_probs = [], []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        encoded = tokenizer(batch, truncation=True, max_length=512, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            torch_probs.append(torch.softmax(model(**encoded).logits, dim=-1).numpy())
+        onnx_probs.append(softmax(onnx_model.logits(batch)))
+    torch_probs = np.concatenate(torch_probs)
+    onnx_probs = np.concatenate(onnx_probs)
+    return {
+        "texts": len(texts),
+        "label_agreement": float((torch_probs.argmax(axis=1) == onnx_probs.argmax(axis=1)).mean()),
+        "max_probability_diff": float(np.abs(torch_probs - onnx_probs).max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sentiment model to quantized ONNX")
+    parser.add_argument("--model", default="transformer_sentiment_model")
+    parser.add_argument("--output", default="transformer_sentiment_onnx")
+    parser.add_argument("--csv", default="review_dataset_clean.csv", help="reviews for the parity check")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    export(args.model, args.output)
+    texts = pd.read_csv(args.csv)["text"].dropna().astype(str)
+    texts = texts.sample(min(args.samples, len(texts)), random_state=0).tolist()
+    parity = check_parity(args.model, args.output, texts)
+    logger.info(f"Parity on {parity['texts']} reviews: {parity['label_agreement']:.2%} labels agree, "
+                f"max probability difference {parity['max_probability_diff']:.4f}")
+    if parity["label_agreement"] < args.min_agreement:
+        logger.error(f"Label agreement below {args.min_agreement:.0%}; don't deploy this export")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Length-bucketed batching for transformer inference
+
+A padded batch costs as much as its longest text times the batch size, so
+batching reviews in arrival order makes every short review pay for the longest
+one next to it. bucketed_predict sorts texts by token length, cuts the sorted
+list into batches (each padded only to its own longest text) and puts the
+results back in the original order.
+
+    results = bucketed_predict(run_model, texts, token_lengths(tokenizer, texts))
+"""
+
+from typing import Callable, List, Optional, Sequence
+
+
+def token_lengths(tokenizer, texts: Sequence[str], max_length: int = 512) -> List[int]:
+    """
+    Token count of each text, as the model will see it
+
+    Args:
+        tokenizer: Hugging Face tokenizer
+        texts: Texts to measure
+        max_length: Truncation length
+
+    Returns:
+        List of lengths, in the order of texts
+    """
+    encoded = tokenizer(list(texts), truncation=True, max_length=max_length)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def length_batches(lengths: Sequence[int], batch_size: int = 32,
+                   max_tokens: Optional[int] = None) -> List[List[int]]:
+    """
+    Group positions into batches of similar length
+
+    Args:
+        lengths: Length of each item
+        batch_size: Most items per batch
+        max_tokens: Most padded tokens per batch (items x longest length), if set
+
+    Returns:
+        List of batches, each a list of positions into lengths, shortest first
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches, batch = [], []
+    for i in order:
+        # Sorted ascending, so lengths[i] is the longest in the batch so far
+        if batch and (len(batch) == batch_size
+                      or (max_tokens and (len(batch) + 1) * lengths[i] > max_tokens)):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def bucketed_predict(predict_fn: Callable[[List[str]], Sequence], texts: Sequence[str],
+                     lengths: Sequence[int], batch_size: int = 32,
+                     max_tokens: Optional[int] = None) -> List:
+    """
+    Run predict_fn over length-sorted batches and restore the input order
+
+    Args:
+        predict_fn: Runs the model on one batch of texts, returns one result per text
+        texts: Texts to predict
+        lengths: Token length of each text (see token_lengths)
+        batch_size: Most texts per batch
+        max_tokens: Most padded tokens per batch, if set
+
+    Returns:
+        List of results, in the order of texts
+    """
+    results = [None] * len(texts)
+    for batch in length_batches(lengths, batch_size, max_tokens):
+        for i, result in zip(batch, predict_fn([texts[i] for i in batch])):
+            results[i] = result
+    return results
@@ -0,0 +1,214 @@
+"""
+Dynamic micro-batching for model inference
+
+Requests to the model server usually carry a handful of texts, and running a
+forward pass per request wastes most of what batching buys on CPU. MicroBatcher
+puts every request on a queue; one worker thread takes whatever has arrived
+within `max_wait_ms` of the first waiting request (or up to `max_batch_size`
+texts), runs a single forward pass over all of it, and hands each caller back
+its own slice of the results.
+
+The forward pass runs off the event loop, so an async endpoint just awaits:
+
+    batcher = MicroBatcher(transformer_pipe, max_batch_size=64, max_wait_ms=5)
+    batcher.start()
+    results = await batcher.submit(texts)
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued")
+
+    def __init__(self, texts: List, future: Future):
+        self.texts = texts
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    Queue that groups concurrent inference requests into shared batches
+    """
+
+    def __init__(self, predict_fn: Callable[[List], Sequence], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, name: str = "model"):
+        """
+        Args:
+            predict_fn: Runs the model on a list of inputs, returns one result per input
+            max_batch_size: Most inputs per forward pass (a bigger single request
+                still runs, alone)
+            max_wait_ms: How long the first request in a batch waits for others
+            name: Used in logs and metrics
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._carry: Optional[_Request] = None  # didn't fit the last batch, starts the next
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._requests = 0
+        self._errors = 0
+        self._batch_sizes = Counter()
+        self._wait_seconds = 0.0
+        self._inference_seconds = 0.0
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._thread.start()
+                logger.info(f"Started micro-batcher for {self.name} "
+                            f"(max batch {self.max_batch_size}, max wait {self.max_wait * 1000:.0f}ms)")
+
+    def stop(self, timeout: float = 5.0):
+        """Finish queued requests and stop the worker thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit_future(self, texts: Sequence) -> Future:
+        """
+        Queue texts for inference
+
+        Args:
+            texts: Inputs for predict_fn
+
+        Returns:
+            concurrent.futures.Future resolving to the results for these texts
+        """
+        future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result([])
+            return future
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        self._queue.put(_Request(texts, future))
+        return future
+
+    async def submit(self, texts: Sequence) -> List:
+        """Queue texts for inference and wait for their results without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit_future(texts))
+
+    def predict(self, texts: Sequence) -> List:
+        """Blocking version of submit, for synchronous callers"""
+        return self.submit_future(texts).result()
+
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        # Gather requests until the batch is full or the first one has waited max_wait
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return batch, True
+            if size + len(request.texts) > self.max_batch_size:
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first, self._carry = self._carry or self._queue.get(), None
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._run_batch(batch)
+        # Don't leave callers hanging on requests queued behind the stop
+        if self._carry is not None:
+            self._run_batch([self._carry])
+            self._carry = None
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _STOP:
+                self._run_batch([request])
+
+    def _run_batch(self, batch: List[_Request]):
+        # Callers that gave up (e.g. a cancelled await on submit) are dropped; the
+        # rest can no longer be cancelled, so their futures are ours to resolve
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request in batch for text in request.texts]
+        start = time.monotonic()
+        try:
+            results = list(self.predict_fn(texts))
+            if len(results) != len(texts):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(texts)} inputs")
+        except Exception as e:
+            logger.error(f"Error in {self.name} batch of {len(texts)}: {e}")
+            self._errors += 1
+            for request in batch:
+                self._deliver(request.future.set_exception, e)
+            return
+        finished = time.monotonic()
+
+        offset = 0
+        for request in batch:
+            self._deliver(request.future.set_result, results[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+
+        self._batches += 1
+        self._items += len(texts)
+        self._requests += len(batch)
+        self._batch_sizes[len(texts)] += 1
+        self._wait_seconds += sum(start - request.enqueued for request in batch)
+        self._inference_seconds += finished - start
+
+    def _deliver(self, resolve: Callable, value):
+        # One caller's future must never take the worker thread down with it
+        try:
+            resolve(value)
+        except Exception as e:
+            logger.error(f"Could not deliver {self.name} result: {e}")
+
+    def metrics(self) -> Dict:
+        """
+        Queue and batching statistics
+
+        Returns:
+            Dictionary with queue depth, batch counts, mean batch size and timings
+        """
+        return {
+            "model": self.name,
+            "queue_depth": self._queue.qsize() + (self._carry is not None),
+            "batches": self._batches,
+            "requests": self._requests,
+            "items": self._items,
+            "errors": self._errors,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            "mean_queue_wait_ms": 1000 * self._wait_seconds / self._requests if self._requests else 0.0,
+            "mean_inference_ms": 1000 * self._inference_seconds / self._batches if self._batches else 0.0
+        }
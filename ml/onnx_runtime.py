@@ -0,0 +1,94 @@
+"""
+ONNX Runtime backend for the transformer sentiment model
+
+Runs the int8-quantized graph written by export_onnx.py on CPU.
+OnnxSentimentPipeline is called like the transformers text-classification
+pipeline it replaces (same inputs, same [{'label', 'score'}] outputs, a
+`tokenizer` attribute), so serve_model can switch between the two by config:
+
+    TRANSFORMER_BACKEND=onnx ONNX_MODEL_DIR=transformer_sentiment_onnx python serve_model.py
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoConfig, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class OnnxSentimentPipeline:
+    """
+    Drop-in replacement for pipeline('sentiment-analysis') backed by ONNX Runtime
+    """
+
+    def __init__(self, model_dir: str, model_file: str = QUANTIZED_MODEL_FILE,
+                 threads: Optional[int] = None, max_length: int = 512):
+        """
+        Args:
+            model_dir: Directory written by export_onnx.py (graph, tokenizer, config)
+            model_file: Graph file in model_dir
+            threads: Intra-op threads (None lets ONNX Runtime use every core)
+            max_length: Truncation length
+        """
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(model_dir, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.id2label = AutoConfig.from_pretrained(model_dir).id2label
+        self.max_length = max_length
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX sentiment model {model_file} from {model_dir}")
+
+    def logits(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Raw model outputs for one batch
+
+        Args:
+            texts: Texts to score (padded together to the longest)
+
+        Returns:
+            Array of shape (len(texts), num_labels)
+        """
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length,
+                                 padding=True, return_tensors="np")
+        feed = {name: array.astype(np.int64) for name, array in encoded.items() if name in self._inputs}
+        return self.session.run(None, feed)[0]
+
+    def __call__(self, texts: Union[str, Sequence[str]], batch_size: Optional[int] = None,
+                 truncation: bool = True) -> List[Dict[str, Union[str, float]]]:
+        """
+        Classify texts like the transformers pipeline does
+
+        Args:
+            texts: One text or a list of texts
+            batch_size: Texts per forward pass (None for all at once)
+            truncation: Accepted for pipeline compatibility; texts are always truncated
+
+        Returns:
+            List of {'label', 'score'} dictionaries, in the order of texts
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        batch_size = batch_size or max(len(texts), 1)
+        results = []
+        for start in range(0, len(texts), batch_size):
+            probabilities = softmax(self.logits(texts[start:start + batch_size]))
+            for row in probabilities:
+                best = int(row.argmax())
+                results.append({"label": self.id2label[best], "score": float(row[best])})
+        return results
@@ -13,6 +13,22 @@ def clean_text(text):
     tokens = [w for w in tokens if w not in stop_words]
     return ' '.join(tokens)
 
+def preprocess_store(store_dir='review_store'):
+    # Clean only the 'raw' partitions that are new or changed since their 'clean' version,
+    # and drop 'clean' partitions whose 'raw' partition is gone
+    from dataset_store import ReviewStore
+    from fast_preprocess import clean_texts
+    store = ReviewStore(store_dir)
+    store.prune('clean', store.sources('raw'))
+    stale = store.stale_sources('clean', 'raw')
+    for source in stale:
+        df = store.read('raw', columns=['text', 'sentiment'], sources=[source])
+        df['text'] = clean_texts(df['text'])
+        store.write_part('clean', source, df)
+        store.record('clean', source, 'raw', len(df))
+        print('Preprocessed:', source, df.shape)
+    return stale
+
 def preprocess_dataset(input_csv='review_dataset.csv', output_csv='review_dataset_clean.csv'):
     df = pd.read_csv(input_csv)
     df['text'] = df['text'].apply(clean_text)
@@ -20,4 +36,4 @@ def preprocess_dataset(input_csv='review_dataset.csv', output_csv='review_datase
     print('Preprocessed:', df.shape)
 
 if __name__ == '__main__':
-    preprocess_dataset()
+    preprocess_store()
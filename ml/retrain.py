@@ -0,0 +1,88 @@
+"""
+Incremental retraining pipeline for the baseline sentiment model
+
+Runs the dataset stages against the store (see dataset_store.py), each one
+doing only the work its manifest says is new:
+
+1. build_dataset: ingest new or changed scrape files into 'raw', and drop
+   the partitions of deleted ones
+2. preprocess: clean the 'raw' partitions that changed into 'clean'
+3. train_streaming: retrain the classifier from 'clean', unless nothing
+   changed and a model already exists, and save it with its vectorizer as
+   one pipeline (streaming_model.joblib, what serve_model.py loads)
+
+Prints a JSON summary as its last line (backend/tasks.retrain_sentiment_model
+runs this script and returns that summary).
+
+    python retrain.py [--scraped-dir scraped_reviews/] [--store review_store] [--force]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+
+from build_dataset import build_review_dataset
+from dataset_store import ReviewStore
+from preprocess import preprocess_store
+from train_streaming import model_pipeline, train_streaming
+
+
+def retrain(scraped_dir: str = "scraped_reviews/", store_dir: str = "review_store",
+            model_out: str = "streaming_model.joblib", force: bool = False) -> dict:
+    """
+    Bring the dataset up to date and retrain if it changed
+
+    Args:
+        scraped_dir: Directory of scraped review CSVs
+        store_dir: Dataset store directory
+        model_out: Where to save the vectorizer + classifier pipeline
+        force: Retrain even if no partition changed
+
+    Returns:
+        Summary of what each stage did and how long it took ('error' says why
+        an empty dataset was not trained on)
+    """
+    summary = {}
+    start = time.perf_counter()
+    summary["build"] = build_review_dataset(scraped_dir, store_dir)
+    summary["build_seconds"] = round(time.perf_counter() - start, 1)
+
+    start = time.perf_counter()
+    summary["preprocessed"] = preprocess_store(store_dir)
+    summary["preprocess_seconds"] = round(time.perf_counter() - start, 1)
+
+    changed = summary["preprocessed"] or summary["build"]["removed"]
+    if not (force or changed or not os.path.exists(model_out)):
+        summary["trained"] = False
+        return summary
+    if not ReviewStore(store_dir).count_rows("clean"):
+        # e.g. every scrape file was deleted; keep serving the current model
+        summary["trained"] = False
+        summary["error"] = f"No reviews in {store_dir}, not training"
+        return summary
+
+    start = time.perf_counter()
+    checkpoint = os.path.join(store_dir, "streaming_checkpoint.joblib")
+    vectorizer, clf, stats = train_streaming(store_dir, checkpoint_path=checkpoint)
+    joblib.dump(model_pipeline(vectorizer, clf), model_out)
+    summary["trained"] = True
+    summary["train"] = {key: value for key, value in stats.items() if key != "report"}
+    summary["train_seconds"] = round(time.perf_counter() - start, 1)
+    print(stats["report"])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the dataset and retrain the baseline model")
+    parser.add_argument("--scraped-dir", default="scraped_reviews/")
+    parser.add_argument("--store", default="review_store")
+    parser.add_argument("--force", action="store_true", help="retrain even if the dataset didn't change")
+    args = parser.parse_args()
+    print(json.dumps(retrain(args.scraped_dir, args.store, force=args.force)))
+
+
+if __name__ == "__main__":
+    main()
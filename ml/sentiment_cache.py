@@ -0,0 +1,202 @@
+"""
+Content-addressed cache for sentiment predictions
+
+Predictions are keyed by the model's name and version plus a hash of the
+normalized review text, so the same review is scored once no matter how often
+it is re-read, and bumping the model version invalidates every old entry
+without a flush (old keys just stop being read and expire).
+
+Two tiers: an in-process LRU in front of Redis (REDIS_URL), both read and
+written a whole batch at a time. Redis is optional; when it is missing or down
+the LRU is used alone.
+
+    cache = get_cache()
+    predictions = cached_predict_batch(model, reviews, cache)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace (scores don't depend on either)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class SentimentCache:
+    """
+    Two-tier (LRU + Redis) cache of sentiment predictions
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, max_entries: int = 100000,
+                 ttl: int = 30 * 24 * 3600, retry_after: float = 30.0):
+        """
+        Args:
+            redis_url: Redis URL, or None for the in-process tier only
+            max_entries: LRU capacity
+            ttl: Redis expiry in seconds
+            retry_after: seconds to skip Redis after it fails
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.hits = 0
+        self.misses = 0
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=1.0) if redis_url and redis else None
+        self._down_until = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, version: str, text: str) -> str:
+        digest = hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+        return f"sentiment:{model_name}:{version}:{digest}"
+
+    def _remote(self):
+        if self._redis is not None and time.monotonic() >= self._down_until:
+            return self._redis
+        return None
+
+    def _failed(self, e: Exception):
+        logger.warning(f"Redis sentiment cache unavailable ({e}), using the in-process cache for {self.retry_after:.0f}s")
+        self._down_until = time.monotonic() + self.retry_after
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Dict]]:
+        """
+        Look up a batch of keys
+
+        Args:
+            keys: Cache keys from key()
+
+        Returns:
+            Cached value per key, None for misses
+        """
+        values = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    values[i] = value
+        remote = self._remote()
+        if missing and remote is not None:
+            try:
+                raws = remote.mget([keys[i] for i in missing])
+            except Exception as e:
+                self._failed(e)
+                raws = [None] * len(missing)
+            found = {}
+            for i, raw in zip(missing, raws):
+                if raw is not None:
+                    values[i] = found[keys[i]] = json.loads(raw)
+            self._store_local(found)
+        hits = sum(value is not None for value in values)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return values
+
+    def set_many(self, items: Dict[str, Dict]):
+        """
+        Store a batch of values in both tiers
+
+        Args:
+            items: Cache key -> JSON-serializable value
+        """
+        if not items:
+            return
+        self._store_local(items)
+        remote = self._remote()
+        if remote is None:
+            return
+        try:
+            pipe = remote.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, json.dumps(value, separators=(",", ":")), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            self._failed(e)
+
+    def _store_local(self, items: Dict[str, Dict]):
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries)
+        }
+
+
+def cached_predict_batch(model, texts: List[str], cache: "SentimentCache") -> List[Dict[str, float]]:
+    """
+    model.predict_batch(texts), scoring only texts the cache hasn't seen
+
+    Args:
+        model: Analyzer with model_name, version and predict_batch
+        texts: Texts to analyze
+        cache: SentimentCache to read and fill
+
+    Returns:
+        List of sentiment predictions, in the order of texts
+    """
+    cacheable = [i for i, text in enumerate(texts) if isinstance(text, str)]
+    keys = {i: cache.key(model.model_name, model.version, texts[i]) for i in cacheable}
+    cached = dict(zip(keys, cache.get_many(list(keys.values()))))
+
+    todo = [i for i in range(len(texts)) if cached.get(i) is None]
+    # Duplicate misses in one batch are scored once
+    first = {}
+    for i in todo:
+        first.setdefault(keys.get(i, i), i)
+    scored = dict(zip(first.values(), model.predict_batch([texts[i] for i in first.values()])))
+    # Fallback predictions for texts that failed to score are not cached
+    cache.set_many({keys[i]: {k: v for k, v in prediction.items() if k != "text"}
+                    for i, prediction in scored.items() if i in keys and not prediction.get("error")})
+
+    predictions = []
+    for i, text in enumerate(texts):
+        value = cached.get(i) or scored.get(first.get(keys.get(i, i)))
+        # Duplicates may differ in whitespace or normalization; each keeps its own text
+        predictions.append({**value, "text": text})
+    return predictions
+
+
+_cache_instance = None
+
+def get_cache() -> SentimentCache:
+    """Get or create the process-wide sentiment cache (singleton pattern)"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = SentimentCache(
+            redis_url=os.getenv("REDIS_URL"),
+            max_entries=int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "100000")),
+            ttl=int(os.getenv("SENTIMENT_CACHE_TTL", str(30 * 24 * 3600)))
+        )
+    return _cache_instance
@@ -0,0 +1,147 @@
+"""
+Multi-core sentiment scoring with a persistent process pool
+
+SentimentPool keeps a pool of worker processes alive between batches. Each
+worker builds its own BaselineSentimentAnalyzer once, when it starts, so a
+batch only pays for shipping texts and predictions between processes.
+
+Large batches are cut into chunks and scored in parallel. Chunk size adapts to
+the measured scoring speed: chunks aim to take about `target_seconds` each,
+which keeps per-chunk overhead small without leaving cores idle at the end of
+a batch. Predictions come back in input order.
+
+    pool = get_pool(workers=8)
+    predictions = pool.predict_batch(texts)
+
+or, equivalently, BaselineSentimentAnalyzer.predict_batch(texts, workers=8).
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Model used by the current worker process, built by _init_worker
+_worker_model = None
+
+
+def _init_worker():
+    global _worker_model
+    from baseline_sentiment import BaselineSentimentAnalyzer
+    _worker_model = BaselineSentimentAnalyzer()
+    _worker_model.predict_batch([""])  # build the lexicon matrix up front
+
+
+def _score_chunk(texts: List[str]):
+    start = time.perf_counter()
+    # The parent already has the texts; don't ship them back
+    predictions = [{k: v for k, v in prediction.items() if k != "text"}
+                   for prediction in _worker_model.predict_batch(texts)]
+    return predictions, time.perf_counter() - start
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Number of processes for workers (None or <= 0 means one per CPU)"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class SentimentPool:
+    """
+    Warm process pool that scores sentiment batches across cores
+    """
+
+    def __init__(self, workers: Optional[int] = None, target_seconds: float = 0.25,
+                 min_chunk: int = 256, max_chunk: int = 50000):
+        """
+        Args:
+            workers: Number of worker processes (None for one per CPU)
+            target_seconds: Scoring time to aim for per chunk
+            min_chunk: Smallest chunk; smaller batches are scored in-process
+            max_chunk: Largest chunk
+        """
+        self.workers = resolve_workers(workers)
+        self.target_seconds = target_seconds
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        # Moving average of seconds per text, learned from finished chunks
+        self._seconds_per_text = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                logger.info(f"Started sentiment pool with {self.workers} workers")
+            return self._executor
+
+    def chunk_size(self, n_texts: int) -> int:
+        """
+        Chunk size for a batch of n_texts
+
+        Args:
+            n_texts: Batch size
+
+        Returns:
+            Texts per chunk
+        """
+        # At least two chunks per worker, so a slow chunk doesn't hold up the batch
+        size = math.ceil(n_texts / (self.workers * 2))
+        if self._seconds_per_text:
+            size = min(size, int(self.target_seconds / self._seconds_per_text))
+        return max(self.min_chunk, min(size, self.max_chunk))
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Predict sentiment for multiple texts across the pool
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of sentiment predictions, in the order of texts
+        """
+        texts = list(texts)
+        size = self.chunk_size(len(texts))
+        if self.workers == 1 or len(texts) <= size:
+            from baseline_sentiment import get_model
+            return get_model().predict_batch(texts)
+
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        predictions = []
+        seconds = 0.0
+        for chunk, (chunk_predictions, chunk_seconds) in zip(chunks, self._pool().map(_score_chunk, chunks)):
+            predictions.extend({"text": text, **prediction} for text, prediction in zip(chunk, chunk_predictions))
+            seconds += chunk_seconds
+        per_text = seconds / len(texts)
+        if self._seconds_per_text is None:
+            self._seconds_per_text = per_text
+        else:
+            self._seconds_per_text = 0.7 * self._seconds_per_text + 0.3 * per_text
+        return predictions
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_pools: Dict[int, SentimentPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(workers: Optional[int] = None) -> SentimentPool:
+    """Get or create the process-wide pool with this many workers (singleton per size)"""
+    workers = resolve_workers(workers)
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = SentimentPool(workers)
+        return _pools[workers]
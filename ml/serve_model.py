@@ -1,8 +1,14 @@
+import os
+
 from fastapi import FastAPI
 from pydantic import BaseModel
 import joblib
+from sklearn.pipeline import make_pipeline
 from transformers import pipeline
 
+from length_buckets import bucketed_predict, token_lengths
+from micro_batcher import MicroBatcher
+
 app = FastAPI()
 
 class SentimentRequest(BaseModel):
@@ -11,21 +17,59 @@ class SentimentRequest(BaseModel):
 class SentimentResponse(BaseModel):
     results: list
 
-# Load baseline model
-vectorizer = joblib.load('tfidf_vectorizer.joblib')
-clf = joblib.load('sentiment_model.joblib')
+# Load baseline model: the vectorizer + classifier pipeline written by train_streaming.py
+# and the nightly retrain.py, else train_baseline.py's TF-IDF vectorizer and classifier
+BASELINE_MODEL = os.getenv('BASELINE_MODEL', 'streaming_model.joblib')
+if os.path.exists(BASELINE_MODEL):
+    baseline_model = joblib.load(BASELINE_MODEL)
+else:
+    baseline_model = make_pipeline(joblib.load('tfidf_vectorizer.joblib'), joblib.load('sentiment_model.joblib'))
+
+# Load transformer pipeline: PyTorch, or the int8 ONNX export (see export_onnx.py)
+TRANSFORMER_BACKEND = os.getenv('TRANSFORMER_BACKEND', 'pytorch')
+if TRANSFORMER_BACKEND == 'onnx':
+    from onnx_runtime import OnnxSentimentPipeline
+    transformer_pipe = OnnxSentimentPipeline(os.getenv('ONNX_MODEL_DIR', 'transformer_sentiment_onnx'))
+elif TRANSFORMER_BACKEND == 'pytorch':
+    transformer_pipe = pipeline('sentiment-analysis', model='transformer_sentiment_model', tokenizer='transformer_sentiment_model')
+else:
+    raise ValueError(f"Unknown TRANSFORMER_BACKEND {TRANSFORMER_BACKEND!r} (expected 'pytorch' or 'onnx')")
+
+TRANSFORMER_BATCH_SIZE = int(os.getenv('TRANSFORMER_BATCH_SIZE', '32'))
 
-# Load transformer pipeline
-transformer_pipe = pipeline('sentiment-analysis', model='transformer_sentiment_model', tokenizer='transformer_sentiment_model')
+def run_transformer(texts):
+    # Batches of similar-length texts, each padded only to its longest text
+    lengths = token_lengths(transformer_pipe.tokenizer, texts)
+    return bucketed_predict(lambda batch: transformer_pipe(batch, batch_size=len(batch), truncation=True),
+                            texts, lengths, TRANSFORMER_BATCH_SIZE)
+
+# Concurrent requests share forward passes (see micro_batcher)
+transformer_batcher = MicroBatcher(
+    run_transformer,
+    max_batch_size=int(os.getenv('TRANSFORMER_MAX_BATCH', '64')),
+    max_wait_ms=float(os.getenv('TRANSFORMER_MAX_WAIT_MS', '5')),
+    name='transformer'
+)
+
+@app.on_event('startup')
+def start_batcher():
+    transformer_batcher.start()
+
+@app.on_event('shutdown')
+def stop_batcher():
+    transformer_batcher.stop()
 
 @app.post('/predict_baseline', response_model=SentimentResponse)
 def predict_baseline(req: SentimentRequest):
-    X = vectorizer.transform(req.texts)
-    preds = clf.predict(X)
+    preds = baseline_model.predict(req.texts)
     return SentimentResponse(results=preds.tolist())
 
 @app.post('/predict_transformer', response_model=SentimentResponse)
-def predict_transformer(req: SentimentRequest):
-    results = transformer_pipe(req.texts)
+async def predict_transformer(req: SentimentRequest):
+    results = await transformer_batcher.submit(req.texts)
     sentiments = [r['label'] for r in results]
     return SentimentResponse(results=sentiments)
+
+@app.get('/metrics')
+def metrics():
+    return {'transformer': dict(transformer_batcher.metrics(), backend=TRANSFORMER_BACKEND)}
@@ -0,0 +1,42 @@
+import random
+
+from textblob import TextBlob
+
+from batch_sentiment import LexiconBatchScorer
+
+WORDS = ["good", "bad", "great", "terrible", "nice", "love", "ok", "phone", "battery", "is", "the", "12",
+         "not", "very", "8-d"]
+PUNCTUATION = ["", ".", ",", "-", "...", "--", ".,"]
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        tokens = []
+        for _ in range(rng.randint(1, 6)):
+            token = rng.choice(WORDS)
+            if rng.random() < 0.3:
+                token = rng.choice(PUNCTUATION) + token
+            if rng.random() < 0.3:
+                token += rng.choice(PUNCTUATION)
+            if rng.random() < 0.1:
+                token += rng.choice(PUNCTUATION) + rng.choice(WORDS)
+            tokens.append(token)
+        texts.append(rng.choice([" ", "  ", "\n", " \t"]).join(tokens))
+    return texts
+
+
+def test_polarity_matches_textblob_exactly():
+    texts = random_texts(3000) + ["Battery ...bad", "...good", "phone is .good", "good.", "great, phone"]
+    polarities = LexiconBatchScorer().polarity(texts)
+    mismatches = [(text, score, TextBlob(text).sentiment.polarity) for text, score in zip(texts, polarities)
+                  if score != TextBlob(text).sentiment.polarity]
+    assert mismatches == []
+
+
+def test_leading_punctuation_goes_through_textblob():
+    scorer = LexiconBatchScorer()
+    assert scorer.fallback_share(["...good"]) == 1.0
+    assert scorer.fallback_share(["good... phone"]) == 0.0
+    assert scorer.polarity(["Battery ...bad"])[0] == 0.0
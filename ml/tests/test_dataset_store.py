@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from dataset_store import LABELS, ReviewStore, encode_labels, infer_sentiment
+
+
+def write_scrape(directory, name, rows):
+    path = os.path.join(directory, f"{name}.csv")
+    pd.DataFrame(rows, columns=["text", "rating"]).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def scraped(tmp_path):
+    directory = tmp_path / "scraped"
+    directory.mkdir()
+    write_scrape(directory, "amazon_1", [("great", 5), ("bad", 1)])
+    write_scrape(directory, "flipkart_1", [("fine", 3)])
+    return str(directory)
+
+
+def test_manifest_records_each_ingested_file(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    assert store.ingest_scraped(scraped) == {"new": 2, "changed": 0, "unchanged": 0, "removed": 0, "ingested": 3}
+    manifest = store.manifest("raw")
+    assert sorted(manifest) == ["amazon_1", "flipkart_1"]
+    assert manifest["amazon_1"]["rows"] == 2 and manifest["amazon_1"]["digest"]
+
+
+def test_unchanged_and_touched_files_are_not_reingested(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    assert store.ingest_scraped(scraped) == {"new": 0, "changed": 0, "unchanged": 2, "removed": 0, "ingested": 0}
+    # Same content, new modification time: hashed, found unchanged, manifest updated
+    path = os.path.join(scraped, "amazon_1.csv")
+    os.utime(path, ns=(0, 10 ** 18))
+    assert store.ingest_scraped(scraped)["unchanged"] == 2
+    assert store.manifest("raw")["amazon_1"]["mtime_ns"] == 10 ** 18
+
+
+def test_changed_file_replaces_its_partition(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    digest = store.manifest("raw")["amazon_1"]["digest"]
+    write_scrape(scraped, "amazon_1", [("awful", 1), ("superb", 5), ("ok", 3)])
+    assert store.ingest_scraped(scraped) == {"new": 0, "changed": 1, "unchanged": 1, "removed": 0, "ingested": 3}
+    assert store.manifest("raw")["amazon_1"]["digest"] != digest
+    assert store.read("raw", sources=["amazon_1"])["text"].tolist() == ["awful", "superb", "ok"]
+
+
+def test_missing_partition_is_reingested(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    os.remove(store.part_path("raw", "flipkart_1"))
+    assert store.ingest_scraped(scraped) == {"new": 1, "changed": 0, "unchanged": 1, "removed": 0, "ingested": 1}
+
+
+def test_ratings_become_dictionary_encoded_labels(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    table = store.dataset("raw").to_table(columns=["sentiment"])
+    assert pa.types.is_dictionary(table.schema.field("sentiment").type)
+    df = store.read("raw")
+    assert isinstance(df["sentiment"].dtype, pd.CategoricalDtype)
+    assert list(df["sentiment"].cat.categories) == LABELS
+    assert df.set_index("text")["sentiment"].astype(str).to_dict() == {
+        "great": "positive", "bad": "negative", "fine": "neutral"}
+    assert df["source"].astype(str).tolist() == ["amazon_1", "amazon_1", "flipkart_1"]
+
+
+def test_infer_sentiment_and_encode_labels():
+    assert infer_sentiment(np.array([5, 4, 3, np.nan, 2, 1])).tolist() == [
+        "positive", "positive", "neutral", "neutral", "negative", "negative"]
+    encoded = encode_labels(["neutral", "positive", "neutral"])
+    assert encoded.indices.to_pylist() == [1, 2, 1]
+    assert encoded.dictionary.to_pylist() == LABELS
+    with pytest.raises(ValueError, match="mixed"):
+        encode_labels(["positive", "mixed"])
+
+
+def test_stale_sources_follow_upstream_changes(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    assert store.stale_sources("clean", "raw") == ["amazon_1", "flipkart_1"]
+    for source in ["amazon_1", "flipkart_1"]:
+        df = store.read("raw", columns=["text", "sentiment"], sources=[source])
+        store.write_part("clean", source, df)
+        store.record("clean", source, "raw", len(df))
+    assert store.stale_sources("clean", "raw") == []
+    write_scrape(scraped, "flipkart_1", [("changed", 4)])
+    store.ingest_scraped(scraped)
+    assert store.stale_sources("clean", "raw") == ["flipkart_1"]
+
+
+def test_deleted_scrape_files_drop_their_partitions(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    df = store.read("raw", columns=["text", "sentiment"], sources=["flipkart_1"])
+    store.write_part("clean", "flipkart_1", df)
+    store.record("clean", "flipkart_1", "raw", len(df))
+
+    os.remove(os.path.join(scraped, "flipkart_1.csv"))
+    assert store.ingest_scraped(scraped)["removed"] == 1
+    assert store.sources("raw") == ["amazon_1"] and sorted(store.manifest("raw")) == ["amazon_1"]
+    assert store.prune("clean", store.sources("raw")) == ["flipkart_1"]
+    assert store.sources("clean") == [] and store.manifest("clean") == {}
+    assert store.count_rows("raw") == 2
+
+
+def test_missing_scrape_directory_is_an_error(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(scraped)
+    with pytest.raises(FileNotFoundError):
+        store.ingest_scraped(str(tmp_path / "typo"))
+    assert store.sources("raw") == ["amazon_1", "flipkart_1"]
+
+
+def test_colliding_file_names_are_an_error(tmp_path, scraped):
+    store = ReviewStore(str(tmp_path / "store"))
+    write_scrape(scraped, "amazon 1", [("other", 2)])
+    with pytest.raises(ValueError, match="amazon_1"):
+        store.ingest_scraped(scraped)
+    assert store.sources("raw") == []
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def upper_batches(calls, delay=0.0):
+    def predict(texts):
+        calls.append(list(texts))
+        time.sleep(delay)
+        return [text.upper() for text in texts]
+    return predict
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_results():
+    calls = []
+    batcher = MicroBatcher(upper_batches(calls), max_batch_size=64, max_wait_ms=50)
+    try:
+        futures = [batcher.submit_future([f"a{i}", f"b{i}"]) for i in range(5)]
+        assert [future.result(timeout=5) for future in futures] == [[f"A{i}", f"B{i}"] for i in range(5)]
+    finally:
+        batcher.stop()
+    assert len(calls) == 1 and len(calls[0]) == 10
+    assert batcher.metrics()["requests"] == 5
+
+
+def test_batches_are_capped_and_keep_arrival_order():
+    calls = []
+    batcher = MicroBatcher(upper_batches(calls), max_batch_size=4, max_wait_ms=50)
+    try:
+        futures = [batcher.submit_future([str(i)] * 3) for i in range(4)]
+        assert [future.result(timeout=5) for future in futures] == [[str(i)] * 3 for i in range(4)]
+    finally:
+        batcher.stop()
+    # A request that doesn't fit starts the next batch instead of queueing behind later ones
+    assert [batch[0] for batch in calls] == ["0", "1", "2", "3"]
+    assert all(len(batch) <= 4 for batch in calls)
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(texts):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(fail, max_wait_ms=20)
+    try:
+        futures = [batcher.submit_future(["x"]) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_cancelled_callers_do_not_kill_the_worker():
+    calls = []
+    batcher = MicroBatcher(upper_batches(calls, delay=0.2), max_wait_ms=1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(batcher.submit(["slow"]), 0.05)
+        # Queued behind the running batch, then given up on before it starts
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(batcher.submit(["dropped"]), 0.05)
+        return await asyncio.wait_for(batcher.submit(["ok"]), 5)
+
+    try:
+        assert asyncio.run(run()) == ["OK"]
+        assert batcher._thread.is_alive()
+    finally:
+        batcher.stop()
+    assert ["dropped"] not in calls
+
+
+def test_dead_worker_is_restarted():
+    batcher = MicroBatcher(lambda texts: texts, max_wait_ms=1)
+    batcher._thread = threading.Thread(target=lambda: None)
+    batcher._thread.start()
+    batcher._thread.join()
+    try:
+        assert batcher.predict(["x"]) == ["x"]
+    finally:
+        batcher.stop()
@@ -0,0 +1,81 @@
+import os
+
+import joblib
+import pandas as pd
+import pytest
+
+try:
+    from retrain import retrain
+except LookupError:  # preprocess.py needs the NLTK stopwords corpus
+    pytest.skip("NLTK stopwords not downloaded", allow_module_level=True)
+
+REVIEWS = {
+    "amazon_2024_03_01": [("Great phone, love the camera", 5), ("Battery died in a day", 1), ("It is okay", 3)],
+    "flipkart_2024_03_01": [("Excellent value for money", 5), ("Terrible, screen cracked", 1), ("Average", 3)],
+}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    scraped = tmp_path / "scraped"
+    scraped.mkdir()
+    for name, rows in REVIEWS.items():
+        pd.DataFrame(rows * 5, columns=["text", "rating"]).to_csv(scraped / f"{name}.csv", index=False)
+    return {"scraped_dir": str(scraped), "store_dir": str(tmp_path / "store"),
+            "model_out": str(tmp_path / "streaming_model.joblib")}
+
+
+def test_first_run_builds_everything_and_saves_one_artifact(paths):
+    summary = retrain(**paths)
+    assert summary["build"] == {"new": 2, "changed": 0, "unchanged": 0, "removed": 0, "ingested": 30}
+    assert summary["preprocessed"] == sorted(REVIEWS)
+    assert summary["trained"]
+    model = joblib.load(paths["model_out"])
+    assert list(model.predict(["great phone"])) in (["positive"], ["neutral"], ["negative"])
+
+
+def test_unchanged_data_is_not_retrained(paths):
+    retrain(**paths)
+    saved_at = os.stat(paths["model_out"]).st_mtime_ns
+    summary = retrain(**paths)
+    assert summary["build"]["unchanged"] == 2 and summary["preprocessed"] == []
+    assert not summary["trained"]
+    assert os.stat(paths["model_out"]).st_mtime_ns == saved_at
+    assert retrain(**paths, force=True)["trained"]
+
+
+def test_changed_file_is_rebuilt_alone(paths):
+    retrain(**paths)
+    pd.DataFrame([("Changed my mind, awful", 1)], columns=["text", "rating"]).to_csv(
+        os.path.join(paths["scraped_dir"], "amazon_2024_03_01.csv"), index=False)
+    summary = retrain(**paths)
+    assert summary["build"] == {"new": 0, "changed": 1, "unchanged": 1, "removed": 0, "ingested": 1}
+    assert summary["preprocessed"] == ["amazon_2024_03_01"]
+    assert summary["trained"]
+
+
+def test_missing_model_is_trained_even_without_changes(paths):
+    retrain(**paths)
+    os.remove(paths["model_out"])
+    assert retrain(**paths)["trained"]
+    assert os.path.exists(paths["model_out"])
+
+
+def test_deleted_file_is_dropped_and_retrained(paths):
+    retrain(**paths)
+    os.remove(os.path.join(paths["scraped_dir"], "flipkart_2024_03_01.csv"))
+    summary = retrain(**paths)
+    assert summary["build"]["removed"] == 1 and summary["preprocessed"] == []
+    assert summary["trained"] and summary["train"]["rows_trained"] < 2 * 15 * 2
+
+
+def test_empty_store_is_not_trained_on(paths):
+    retrain(**paths)
+    saved_at = os.stat(paths["model_out"]).st_mtime_ns
+    for name in REVIEWS:
+        os.remove(os.path.join(paths["scraped_dir"], f"{name}.csv"))
+    summary = retrain(**paths)
+    assert summary["build"]["removed"] == 2
+    assert not summary["trained"] and "No reviews" in summary["error"]
+    assert os.stat(paths["model_out"]).st_mtime_ns == saved_at
+    assert not retrain(**paths, force=True)["trained"]
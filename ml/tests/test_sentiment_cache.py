@@ -0,0 +1,71 @@
+import fakeredis
+
+from sentiment_cache import SentimentCache, cached_predict_batch
+
+
+class CountingModel:
+    model_name = "test"
+
+    def __init__(self, version="1"):
+        self.version = version
+        self.scored = []
+
+    def predict_batch(self, texts):
+        self.scored.extend(texts)
+        return [{"text": text.strip(), "sentiment": "positive", "confidence": 0.9, "polarity": 0.9}
+                if text.strip() != "bad input" else
+                {"text": text, "sentiment": "neutral", "confidence": 0.5, "polarity": 0.0, "error": True}
+                for text in texts]
+
+
+def _cache(server=None):
+    cache = SentimentCache(max_entries=100)
+    cache._redis = fakeredis.FakeRedis(server=server)
+    return cache
+
+
+def test_bulk_get_and_set_go_through_redis():
+    server = fakeredis.FakeServer()
+    writer = _cache(server)
+    writer.set_many({"a": {"sentiment": "positive"}, "b": {"sentiment": "negative"}})
+
+    reader = _cache(server)  # another process: empty LRU, same Redis
+    assert reader.get_many(["a", "missing", "b"]) == [{"sentiment": "positive"}, None, {"sentiment": "negative"}]
+    assert reader.stats()["hits"] == 2 and reader.stats()["misses"] == 1
+    # Redis hits are kept in the LRU
+    reader._redis = None
+    assert reader.get_many(["a", "b"]) == [{"sentiment": "positive"}, {"sentiment": "negative"}]
+
+
+def test_only_unseen_texts_are_scored():
+    cache = _cache()
+    model = CountingModel()
+    cached_predict_batch(model, ["good", "great"], cache)
+    predictions = cached_predict_batch(model, ["great", "fine", "good"], cache)
+    assert model.scored == ["good", "great", "fine"]
+    assert [p["text"] for p in predictions] == ["great", "fine", "good"]
+
+
+def test_new_model_version_invalidates_entries():
+    cache = _cache()
+    cached_predict_batch(CountingModel("1"), ["good"], cache)
+    model = CountingModel("2")
+    cached_predict_batch(model, ["good"], cache)
+    assert model.scored == ["good"]
+
+
+def test_duplicates_keep_their_own_text():
+    cache = _cache()
+    model = CountingModel()
+    predictions = cached_predict_batch(model, ["good", "good ", " good"], cache)
+    assert model.scored == ["good"]
+    assert [p["text"] for p in predictions] == ["good", "good ", " good"]
+    assert [p["text"] for p in cached_predict_batch(model, ["good  "], cache)] == ["good  "]
+
+
+def test_error_fallbacks_are_not_cached():
+    cache = _cache()
+    model = CountingModel()
+    cached_predict_batch(model, ["bad input", "good"], cache)
+    cached_predict_batch(model, ["bad input", "good"], cache)
+    assert model.scored == ["bad input", "good", "bad input"]
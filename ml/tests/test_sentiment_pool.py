@@ -0,0 +1,39 @@
+from baseline_sentiment import get_model
+from sentiment_pool import SentimentPool
+
+TEXTS = [f"review {i}: " + ("great phone, love it" if i % 3 == 0 else "terrible battery" if i % 3 == 1 else "it is a phone")
+         for i in range(60)]
+
+
+def test_chunk_size_adapts_to_batch_and_speed():
+    pool = SentimentPool(workers=4, min_chunk=10, max_chunk=100)
+    assert pool.chunk_size(400) == 50  # two chunks per worker
+    assert pool.chunk_size(2000) == 100
+    assert pool.chunk_size(20) == 10
+    pool._seconds_per_text = 0.01  # learned: 0.25s per chunk is 25 texts
+    assert pool.chunk_size(400) == 25
+
+
+def test_small_batches_stay_in_process():
+    pool = SentimentPool(workers=2, min_chunk=256)
+    assert pool.predict_batch(TEXTS) == get_model().predict_batch(TEXTS)
+    assert pool._executor is None
+
+
+def test_pool_matches_in_process_scoring_in_input_order():
+    pool = SentimentPool(workers=2, min_chunk=4)
+    try:
+        assert pool.predict_batch(TEXTS) == get_model().predict_batch(TEXTS)
+        assert pool._executor is not None and pool._seconds_per_text > 0
+    finally:
+        pool.close()
+
+
+def test_predict_batch_with_workers_matches_in_process(monkeypatch):
+    pool = SentimentPool(workers=2, min_chunk=4)
+    monkeypatch.setattr("baseline_sentiment.get_pool", lambda workers: pool)
+    try:
+        model = get_model()
+        assert model.predict_batch(TEXTS, workers=2) == model.predict_batch(TEXTS)
+    finally:
+        pool.close()
@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import token_cache
+from dataset_store import ReviewStore
+from token_cache import TokenCache
+
+LABEL_MAP = {"negative": 0, "neutral": 1, "positive": 2}
+
+
+class StubTokenizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation, max_length):
+        self.calls.append(list(texts))
+        ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    stub = StubTokenizer()
+    monkeypatch.setattr(token_cache, "_load_tokenizer", lambda name: stub)
+    return stub
+
+
+def clean_store(tmp_path, partitions):
+    """Store whose 'clean' stage has the given partitions: name -> [(text, rating)]"""
+    scraped = tmp_path / "scraped"
+    scraped.mkdir(exist_ok=True)
+    for name, rows in partitions.items():
+        pd.DataFrame(rows, columns=["text", "rating"]).to_csv(scraped / f"{name}.csv", index=False)
+    store = ReviewStore(str(tmp_path / "store"))
+    store.ingest_scraped(str(scraped))
+    store.prune("clean", store.sources("raw"))
+    for source in store.stale_sources("clean", "raw"):
+        df = store.read("raw", columns=["text", "sentiment"], sources=[source])
+        store.write_part("clean", source, df)
+        store.record("clean", source, "raw", len(df))
+    return store
+
+
+def read(cache, source):
+    with pa.OSFile(cache.path(source)) as f:
+        return pa.ipc.open_stream(f).read_all().to_pydict()
+
+
+@pytest.fixture
+def partitions():
+    return {"amazon_1": [("great phone", 5), ("bad", 1)], "flipkart_1": [("it is fine really", 3)]}
+
+
+def test_partitions_are_tokenized_once(tmp_path, tokenizer, partitions):
+    store = clean_store(tmp_path, partitions)
+    cache = TokenCache("stub/tok", max_length=3, root=str(tmp_path / "cache"), workers=1)
+    assert cache.update(store, LABEL_MAP) == ["amazon_1", "flipkart_1"]
+    assert read(cache, "amazon_1") == {"input_ids": [[5, 5], [3]], "attention_mask": [[1, 1], [1]],
+                                       "labels": [2, 0]}
+    assert read(cache, "flipkart_1")["input_ids"] == [[2, 2, 4]]  # truncated to max_length
+    assert cache.update(store, LABEL_MAP) == []
+    assert len(tokenizer.calls) == 2
+    assert os.path.basename(cache.directory) == "stub_tok-3"
+
+
+def test_only_changed_partitions_are_retokenized(tmp_path, tokenizer, partitions):
+    store = clean_store(tmp_path, partitions)
+    cache = TokenCache("stub", root=str(tmp_path / "cache"), workers=1)
+    cache.update(store, LABEL_MAP)
+    partitions["flipkart_1"] = [("now it is terrible", 1)]
+    partitions["myntra_1"] = [("nice", 4)]
+    store = clean_store(tmp_path, partitions)
+    tokenizer.calls.clear()
+    assert cache.update(store, LABEL_MAP) == ["flipkart_1", "myntra_1"]
+    assert tokenizer.calls == [["now it is terrible"], ["nice"]]
+    assert read(cache, "flipkart_1")["labels"] == [0]
+
+
+def test_label_map_change_retokenizes_everything(tmp_path, tokenizer, partitions):
+    store = clean_store(tmp_path, partitions)
+    cache = TokenCache("stub", root=str(tmp_path / "cache"), workers=1)
+    cache.update(store, LABEL_MAP)
+    flipped = {"negative": 2, "neutral": 1, "positive": 0}
+    assert cache.update(store, flipped) == ["amazon_1", "flipkart_1"]
+    assert read(cache, "amazon_1")["labels"] == [0, 2]
+    with pytest.raises(ValueError, match="label_map"):
+        TokenCache("stub", root=str(tmp_path / "other"), workers=1).update(store, {"positive": 0})
+
+
+def test_partitions_gone_from_the_store_are_removed(tmp_path, tokenizer, partitions):
+    store = clean_store(tmp_path, partitions)
+    cache = TokenCache("stub", root=str(tmp_path / "cache"), workers=1)
+    cache.update(store, LABEL_MAP)
+    os.remove(tmp_path / "scraped" / "flipkart_1.csv")
+    store = clean_store(tmp_path, partitions={"amazon_1": partitions["amazon_1"]})
+    assert cache.update(store, LABEL_MAP) == []
+    assert sorted(cache.manifest()) == ["amazon_1"]
+    assert not os.path.exists(cache.path("flipkart_1"))
@@ -0,0 +1,178 @@
+"""
+Tokenized dataset cache for transformer fine-tuning
+
+Tokenizing the whole dataset is a large share of a CPU fine-tuning run, and
+it gives the same result every time the data hasn't changed. TokenCache keeps
+the tokenizer output as Arrow files, one per 'clean' partition of the dataset
+store (see dataset_store.py), under a directory keyed by tokenizer name and
+max length:
+
+    token_cache/distilbert-base-uncased-128/
+        _manifest.json              partition -> digest of the data it was tokenized from
+        amazon_2024_03_01.arrow     input_ids, attention_mask, labels
+
+A partition is tokenized again only when its digest in the store manifest
+changes, so repeat runs tokenize nothing and new scrape files only add their
+own rows. Cold partitions are tokenized across a process pool. The files are
+Arrow IPC streams, which datasets.Dataset.from_file memory-maps:
+
+    train_data = TokenCache('distilbert-base-uncased', 128).load(ReviewStore(), LABEL_MAP)
+"""
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from dataset_store import ReviewStore, write_atomic
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Tokenizer of the current worker process, set by _init_worker
+_worker_tokenizer = None
+
+
+def _load_tokenizer(name: str):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(name)
+
+
+def _init_worker(name: str):
+    global _worker_tokenizer
+    _worker_tokenizer = _load_tokenizer(name)
+
+
+def _tokenize(texts: List[str], max_length: int, tokenizer=None) -> Dict[str, list]:
+    # No padding: DataCollatorWithPadding pads each batch to its own longest review
+    encoded = (tokenizer or _worker_tokenizer)(texts, truncation=True, max_length=max_length)
+    return {"input_ids": encoded["input_ids"], "attention_mask": encoded["attention_mask"]}
+
+
+class TokenCache:
+    """
+    Incremental on-disk cache of tokenized 'clean' partitions
+    """
+
+    def __init__(self, tokenizer_name: str, max_length: int = 128, root: str = "token_cache",
+                 workers: Optional[int] = None, chunk_size: int = 10000):
+        """
+        Args:
+            tokenizer_name: Hugging Face tokenizer name or path
+            max_length: Truncation length
+            root: Cache directory
+            workers: Processes for tokenizing cold partitions (None for one per CPU)
+            chunk_size: Texts per worker task
+        """
+        self.tokenizer_name = tokenizer_name
+        self.max_length = max_length
+        self.directory = os.path.join(root, f"{_UNSAFE.sub('_', tokenizer_name)}-{max_length}")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def path(self, source: str) -> str:
+        return os.path.join(self.directory, f"{source}.arrow")
+
+    def manifest(self) -> Dict[str, Dict]:
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Dict]):
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        write_atomic(os.path.join(self.directory, MANIFEST_FILE), write)
+
+    def update(self, store: ReviewStore, label_map: Dict[str, int]) -> List[str]:
+        """
+        Tokenize the store's 'clean' partitions that are new or changed
+
+        Args:
+            store: Dataset store
+            label_map: Sentiment label -> class id
+
+        Returns:
+            Names of the partitions that were tokenized
+        """
+        upstream = store.manifest("clean")
+        manifest = self.manifest()
+        sources = store.sources("clean")
+        stale = [source for source in sources
+                 if not os.path.exists(self.path(source))
+                 or manifest.get(source, {}).get("digest") != upstream.get(source, {}).get("digest")
+                 or manifest.get(source, {}).get("label_map") != label_map]
+        for source in set(manifest) - set(sources):
+            # Partition gone from the store
+            del manifest[source]
+            if os.path.exists(self.path(source)):
+                os.remove(self.path(source))
+        if not stale:
+            self._save_manifest(manifest)
+            return []
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(self.tokenizer_name,)) if self.workers > 1 else None
+        tokenizer = None if pool else _load_tokenizer(self.tokenizer_name)
+        try:
+            for source in stale:
+                df = store.read("clean", columns=["text", "sentiment"], sources=[source])
+                texts = df["text"].fillna("").astype(str).tolist()
+                chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+                if pool:
+                    encoded = list(pool.map(_tokenize, chunks, [self.max_length] * len(chunks)))
+                else:
+                    encoded = [_tokenize(chunk, self.max_length, tokenizer) for chunk in chunks]
+                labels = df["sentiment"].astype(str).map(label_map)
+                if labels.isna().any():
+                    raise ValueError(f"Labels missing from label_map in {source}: "
+                                     f"{sorted(set(df['sentiment'].astype(str)[labels.isna()]))}")
+                table = pa.table({
+                    "input_ids": pa.array([ids for part in encoded for ids in part["input_ids"]],
+                                          type=pa.list_(pa.int32())),
+                    "attention_mask": pa.array([mask for part in encoded for mask in part["attention_mask"]],
+                                               type=pa.list_(pa.int8())),
+                    "labels": pa.array(labels.to_numpy(dtype=np.int64))
+                })
+                write_atomic(self.path(source), lambda tmp_path: self._write_table(table, tmp_path))
+                manifest[source] = {"digest": upstream.get(source, {}).get("digest"), "rows": len(df),
+                                    "label_map": label_map}
+                self._save_manifest(manifest)
+                logger.info(f"Tokenized {len(df)} reviews from {source}")
+        finally:
+            if pool:
+                pool.shutdown()
+        return stale
+
+    @staticmethod
+    def _write_table(table: pa.Table, path: str):
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def load(self, store: ReviewStore, label_map: Dict[str, int]):
+        """
+        Update the cache and open it as one memory-mapped datasets.Dataset
+
+        Args:
+            store: Dataset store
+            label_map: Sentiment label -> class id
+
+        Returns:
+            datasets.Dataset with input_ids, attention_mask and labels, in partition order
+        """
+        from datasets import Dataset, concatenate_datasets
+        self.update(store, label_map)
+        parts = [Dataset.from_file(self.path(source)) for source in store.sources("clean")]
+        if not parts:
+            raise ValueError(f"No 'clean' partitions in {store.root}; run build_dataset.py and preprocess.py")
+        return concatenate_datasets(parts)
@@ -5,7 +5,13 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 
-df = pd.read_csv('review_dataset_clean.csv')
+from dataset_store import ReviewStore
+
+store = ReviewStore()
+if store.sources('clean'):
+    df = store.read('clean', columns=['text', 'sentiment'])
+else:
+    df = pd.read_csv('review_dataset_clean.csv')
 X = df['text']
 y = df['sentiment']
 
@@ -0,0 +1,203 @@
+"""
+Out-of-core training for the baseline sentiment classifier
+
+train_baseline.py loads the whole dataset and fits TfidfVectorizer, which has
+to hold the vocabulary and every document in memory. This trainer reads the
+dataset in chunks instead and never needs more than one chunk at a time:
+
+- HashingVectorizer maps words to a fixed number of features without a
+  vocabulary, so it needs no fitting and vectorizes every chunk the same way
+- SGDClassifier (logistic loss) learns incrementally with partial_fit
+- One review in five (chosen by a hash of its text, so the split is the same
+  on every run and every pass) is held out for the evaluation pass
+
+The input is a ReviewStore directory (see dataset_store.py), whose 'clean'
+stage is streamed as record batches, or a CSV. Progress is checkpointed every
+--checkpoint-every chunks; --resume picks up from the last checkpoint.
+Rows/sec and peak memory are logged as it goes.
+
+The vectorizer and classifier are saved together as one sklearn Pipeline
+(streaming_model.joblib), so they can't be served with train_baseline.py's
+TF-IDF vectorizer by mistake.
+
+    python train_streaming.py [--data review_store] [--chunksize 100000] [--epochs 2] [--resume]
+"""
+
+import argparse
+import logging
+import os
+import resource
+import tempfile
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report
+from sklearn.pipeline import Pipeline
+
+from dataset_store import ReviewStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLASSES = np.array(["negative", "neutral", "positive"])
+HOLDOUT_BUCKETS = 5  # one review in HOLDOUT_BUCKETS is held out
+
+
+def make_vectorizer(n_features: int = 2 ** 20) -> HashingVectorizer:
+    """Stateless vectorizer: unigrams and bigrams hashed into n_features, l2-normalized"""
+    return HashingVectorizer(n_features=n_features, ngram_range=(1, 2), alternate_sign=False, norm="l2")
+
+
+def model_pipeline(vectorizer: HashingVectorizer, clf: SGDClassifier) -> Pipeline:
+    """The vectorizer and classifier as the single artifact that is saved and served"""
+    return Pipeline([("vectorizer", vectorizer), ("classifier", clf)])
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process so far, in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_chunks(path: str, chunksize: int, skip: int = 0) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Stream (chunk number, chunk) pairs with non-empty text and a known label
+
+    Args:
+        path: CSV with 'text' and 'sentiment' columns, or a dataset store
+            directory (its 'clean' stage is read)
+        chunksize: Rows per chunk
+        skip: Number of leading chunks to skip (already trained on)
+    """
+    if os.path.isdir(path):
+        reader = ReviewStore(path).iter_batches("clean", columns=["text", "sentiment"], batch_size=chunksize)
+    else:
+        reader = pd.read_csv(path, usecols=["text", "sentiment"], chunksize=chunksize,
+                             dtype={"text": str, "sentiment": str})
+    for number, chunk in enumerate(reader):
+        if number < skip:
+            continue
+        chunk = chunk.dropna()
+        yield number, chunk[chunk["sentiment"].isin(CLASSES)]
+
+
+def holdout_mask(texts: pd.Series) -> np.ndarray:
+    """Rows that belong to the evaluation split (stable across runs)"""
+    return (pd.util.hash_pandas_object(texts, index=False).to_numpy() % HOLDOUT_BUCKETS) == 0
+
+
+def save_checkpoint(path: str, state: Dict):
+    """Write state to path atomically, so a crash mid-write keeps the previous checkpoint"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def train_streaming(data_path: str, chunksize: int = 100000, epochs: int = 2,
+                    checkpoint_path: str = "streaming_checkpoint.joblib", checkpoint_every: int = 10,
+                    resume: bool = False, n_features: int = 2 ** 20) -> Tuple[HashingVectorizer, SGDClassifier, Dict]:
+    """
+    Train the baseline classifier in bounded memory
+
+    Args:
+        data_path: CSV or dataset store directory (see read_chunks)
+        chunksize: Rows read per chunk
+        epochs: Passes over the training split
+        checkpoint_path: Where to save progress
+        checkpoint_every: Chunks between checkpoints
+        resume: Continue from checkpoint_path if it exists
+        n_features: Hashing vectorizer width
+
+    Returns:
+        (vectorizer, classifier, stats)
+    """
+    vectorizer = make_vectorizer(n_features)
+    state: Optional[Dict] = None
+    if resume and os.path.exists(checkpoint_path):
+        state = joblib.load(checkpoint_path)
+        if state["n_features"] != n_features:
+            raise ValueError(f"Checkpoint was trained with n_features={state['n_features']}, not {n_features}")
+        logger.info(f"Resuming from {checkpoint_path}: epoch {state['epoch'] + 1}, chunk {state['next_chunk']}")
+    if state is None:
+        state = {
+            "clf": SGDClassifier(loss="log_loss", alpha=1e-6, random_state=42),
+            "n_features": n_features,
+            "epoch": 0,
+            "next_chunk": 0,
+            "rows": 0
+        }
+    clf = state["clf"]
+
+    start = time.perf_counter()
+    rows_this_run = 0
+    for epoch in range(state["epoch"], epochs):
+        for number, chunk in read_chunks(data_path, chunksize, skip=state["next_chunk"]):
+            train = chunk[~holdout_mask(chunk["text"])]
+            if len(train):
+                clf.partial_fit(vectorizer.transform(train["text"]), train["sentiment"].to_numpy(), classes=CLASSES)
+            state["next_chunk"] = number + 1
+            state["rows"] += len(train)
+            rows_this_run += len(train)
+            if state["next_chunk"] % checkpoint_every == 0:
+                save_checkpoint(checkpoint_path, state)
+                elapsed = time.perf_counter() - start
+                logger.info(f"epoch {epoch + 1} chunk {number + 1}: {state['rows']:,} rows trained, "
+                            f"{rows_this_run / elapsed:,.0f} rows/sec, peak memory {peak_memory_mb():,.0f} MB")
+        state["epoch"] = epoch + 1
+        state["next_chunk"] = 0
+        save_checkpoint(checkpoint_path, state)
+    train_seconds = time.perf_counter() - start
+
+    # Evaluation pass over the held-out rows; only label indices are kept
+    y_true, y_pred = [], []
+    for _, chunk in read_chunks(data_path, chunksize):
+        test = chunk[holdout_mask(chunk["text"])]
+        if len(test):
+            y_true.append(np.searchsorted(CLASSES, test["sentiment"].to_numpy()).astype(np.int8))
+            y_pred.append(np.searchsorted(CLASSES, clf.predict(vectorizer.transform(test["text"]))).astype(np.int8))
+    y_true = np.concatenate(y_true) if y_true else np.zeros(0, dtype=np.int8)
+    y_pred = np.concatenate(y_pred) if y_pred else np.zeros(0, dtype=np.int8)
+
+    stats = {
+        "rows_trained": state["rows"],
+        "rows_per_sec": rows_this_run / train_seconds if train_seconds else 0.0,
+        "peak_memory_mb": peak_memory_mb(),
+        "holdout_rows": len(y_true),
+        "report": classification_report(y_true, y_pred, labels=range(len(CLASSES)),
+                                        target_names=CLASSES, zero_division=0) if len(y_true) else ""
+    }
+    return vectorizer, clf, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the baseline sentiment model out of core")
+    parser.add_argument("--data", default="review_store", help="dataset store directory or CSV")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--checkpoint", default="streaming_checkpoint.joblib")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="chunks between checkpoints")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--n-features", type=int, default=2 ** 20)
+    parser.add_argument("--model-out", default="streaming_model.joblib", help="vectorizer + classifier pipeline")
+    args = parser.parse_args()
+
+    vectorizer, clf, stats = train_streaming(args.data, args.chunksize, args.epochs, args.checkpoint,
+                                             args.checkpoint_every, args.resume, args.n_features)
+    print(stats["report"])
+    print(f"Trained on {stats['rows_trained']:,} rows at {stats['rows_per_sec']:,.0f} rows/sec, "
+          f"evaluated on {stats['holdout_rows']:,}; peak memory {stats['peak_memory_mb']:,.0f} MB")
+    joblib.dump(model_pipeline(vectorizer, clf), args.model_out)
+
+
+if __name__ == "__main__":
+    main()
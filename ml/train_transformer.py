@@ -1,17 +1,28 @@
-from datasets import load_dataset
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments
+import argparse
+
+from transformers import (AutoTokenizer, AutoModelForSequenceClassification, DataCollatorWithPadding,
+                          Trainer, TrainingArguments)
 import torch
 
-dataset = load_dataset('csv', data_files='review_dataset_clean.csv')
+from dataset_store import ReviewStore
+from token_cache import TokenCache
+
+parser = argparse.ArgumentParser(description='Fine-tune DistilBERT on the review dataset')
+parser.add_argument('--store', default='review_store')
+parser.add_argument('--token-cache', default='token_cache')
+parser.add_argument('--workers', type=int, help='tokenizer processes for uncached data (default one per CPU)')
+args = parser.parse_args()
+
 tokenizer = AutoTokenizer.from_pretrained('distilbert-base-uncased')
 model = AutoModelForSequenceClassification.from_pretrained('distilbert-base-uncased', num_labels=3)
 
-def preprocess(examples):
-    return tokenizer(examples['text'], truncation=True, padding='max_length', max_length=128)
-
-dataset = dataset.map(preprocess, batched=True)
+# Tokenized once per dataset partition and cached (see token_cache); only new or
+# changed partitions are tokenized. No padding here: the collator pads each
+# batch to its own longest review.
 label_map = {'positive': 0, 'neutral': 1, 'negative': 2}
-dataset = dataset.class_encode_column('sentiment', label_map)
+token_cache = TokenCache('distilbert-base-uncased', max_length=128, root=args.token_cache, workers=args.workers)
+dataset = token_cache.load(ReviewStore(args.store), label_map)
+dataset = dataset.train_test_split(test_size=0.2, seed=42)
 
 training_args = TrainingArguments(
     output_dir='./results',
@@ -22,14 +33,16 @@ training_args = TrainingArguments(
     save_strategy='epoch',
     logging_dir='./logs',
     logging_steps=10,
-    fp16=torch.cuda.is_available()
+    fp16=torch.cuda.is_available(),
+    group_by_length=True  # batch reviews of similar length together
 )
 
 trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=dataset['train'],
-    eval_dataset=dataset['test']
+    eval_dataset=dataset['test'],
+    data_collator=DataCollatorWithPadding(tokenizer)
 )
 
 trainer.train()
@@ -0,0 +1,111 @@
+"""
+Scraper plugin interface.
+
+A marketplace is described by a SiteAdapter: where its search page lives, which
+CSS selectors pick the result items and their fields, and how one item's fields
+become a result row. Fetching goes through the shared pool in http_pool and
+parsing is done once for every site by the backends in parsing.py, so adding a
+marketplace is a matter of declaring an adapter and calling register().
+
+Field selectors are plain CSS selectors matched inside each item; the text of
+the first match is extracted, or an attribute when the selector ends in
+"@attr" (e.g. "a.product-link@href"). Selectors are compiled once per adapter
+and parser backend; when container_selector is set, items are only looked up
+inside the result container.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import quote_plus, urljoin
+
+from scrapers.http_pool import fetch_if_changed, fetch_page, run_sync
+from scrapers.parsing import ItemParser, compile_fields, compile_parser
+from scrapers.prices import parse_price
+
+
+def default_parse_item(adapter: 'SiteAdapter', values: Dict[str, Optional[str]]) -> Optional[Dict]:
+    title, price, link = values.get('title'), values.get('price'), values.get('link')
+    if not (title and price and link):
+        return None
+    try:
+        amount = parse_price(price)
+    except ValueError:
+        return None
+    return {
+        'site': adapter.site,
+        'product_title': title.strip(),
+        'price': amount,
+        'currency': adapter.currency,
+        'url': urljoin(adapter.base_url, link),
+        'timestamp': None
+    }
+
+
+class ChangedResults(NamedTuple):
+    rows: List[Dict]
+    url: str
+    validators: Dict[str, str]  # store once rows are persisted, see engine.commit_validators
+
+
+@dataclass(frozen=True)
+class SiteAdapter:
+    name: str                   # registry key, matches PlatformType values
+    site: str                   # display name stored in result rows
+    search_url: str             # template with a {query} placeholder
+    base_url: str               # relative result links are resolved against this
+    item_selector: str
+    fields: Dict[str, str]
+    parse_item: Callable[['SiteAdapter', Dict[str, Optional[str]]], Optional[Dict]] = default_parse_item
+    currency: str = 'INR'
+    container_selector: Optional[str] = None
+    _parsers: Dict[str, ItemParser] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def url_for(self, query: str) -> str:
+        return self.search_url.format(query=quote_plus(query))
+
+    def parser(self, backend: Optional[str] = None) -> ItemParser:
+        key = backend or ''
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = self._parsers[key] = compile_parser(
+                self.item_selector, compile_fields(self.fields), self.container_selector, backend)
+        return parser
+
+    def parse(self, html: str, backend: Optional[str] = None) -> List[Dict]:
+        results = []
+        for values in self.parser(backend).iter_items(html):
+            row = self.parse_item(self, values)
+            if row:
+                results.append(row)
+        return results
+
+    async def search(self, query: str) -> List[Dict]:
+        """Fetch and parse the search page for query."""
+        return self.parse(await fetch_page(self.url_for(query)))
+
+    def search_sync(self, query: str) -> List[Dict]:
+        return run_sync(self.search(query))
+
+    async def search_changed(self, query: str) -> Optional[ChangedResults]:
+        """
+        Like search(), but returns None without parsing when the page has not
+        changed since the validators of the last committed search_changed() for
+        the same query.
+        """
+        url = self.url_for(query)
+        page = await fetch_if_changed(url)
+        return None if page is None else ChangedResults(self.parse(page.text), url, page.validators)
+
+    def search_changed_sync(self, query: str) -> Optional[ChangedResults]:
+        return run_sync(self.search_changed(query))
+
+
+REGISTRY: Dict[str, SiteAdapter] = {}
+
+
+def register(adapter: SiteAdapter) -> SiteAdapter:
+    REGISTRY[adapter.name] = adapter
+    return adapter
+
+
+def get_adapter(name: str) -> SiteAdapter:
+    return REGISTRY[name]
@@ -0,0 +1,74 @@
+"""
+Cache codec benchmark on realistic search results.
+
+Builds the search_all() result for each fixture query (every site's rows parsed
+from scrapers/fixtures/search/), wrapped the way search_cache stores it, and
+reports for every installed serializer/compressor combination the encoded
+size and the mean encode and decode times, against plain json as the baseline.
+
+    python -m scrapers.benchmarks.bench_codecs [--repeat 200] [--scale 4]
+
+--scale repeats each site's rows to mimic queries with many more offers.
+"""
+import argparse
+import glob
+import os
+import time
+from collections import defaultdict
+
+from scrapers.adapters import REGISTRY
+from scrapers.cache_codec import COMPRESSORS, SERIALIZERS, Codec
+from scrapers.fixtures.build_fixtures import SEARCH_DIR
+from scrapers import engine  # noqa: F401  registers the site adapters
+
+
+def load_results(pages_dir: str, scale: int):
+    results = defaultdict(dict)
+    for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+        site, _, query = os.path.basename(path)[:-len('.html')].partition('_')
+        if site in REGISTRY:
+            with open(path, encoding='utf-8') as f:
+                results[query][site] = REGISTRY[site].parse(f.read()) * scale
+    return [{'value': value, 'fresh_until': time.time()} for value in results.values()]
+
+
+def time_codec(codec: Codec, values, repeat: int):
+    raws = [codec.encode(value) for value in values]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value in values:
+            codec.encode(value)
+    encode = (time.perf_counter() - start) / (repeat * len(values))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for raw in raws:
+            codec.decode(raw)
+    decode = (time.perf_counter() - start) / (repeat * len(values))
+    assert [codec.decode(raw) for raw in raws] == values
+    return sum(map(len, raws)) / len(raws), encode, decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', default=SEARCH_DIR)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--compress-min', type=int, default=1024)
+    args = parser.parse_args()
+
+    values = load_results(args.pages, args.scale)
+    rows = sum(len(rows) for value in values for rows in value['value'].values())
+    print(f"{len(values)} cached searches, {rows / len(values):.0f} offers each")
+    print(f"{'codec':<16}{'bytes':>9}{'ratio':>8}{'encode us':>11}{'decode us':>11}")
+    baseline = None
+    for serializer, _, _ in SERIALIZERS.values():
+        for compressor, _, _ in COMPRESSORS.values():
+            codec = Codec(serializer, compressor, args.compress_min)
+            size, encode, decode = time_codec(codec, values, args.repeat)
+            if baseline is None:
+                baseline = size
+            print(f"{codec.name:<16}{size:>9.0f}{baseline / size:>7.1f}x{encode * 1e6:>11.1f}{decode * 1e6:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Title matching benchmark: blocking index against exhaustive comparison.
+
+Generates a synthetic two-site catalog (brand, model and variant combinations,
+each listed with site-specific wording) and matches site A against site B:
+
+    pairwise   normalize.match_titles() on every pair (timed on a sample, extrapolated)
+    cdist      one unblocked rapidfuzz cdist over all pairs
+    index      matching.TitleIndex
+
+Also reports each method's recall of the true same-product pairs and how many
+pairs it matched in total.
+
+    python -m scrapers.benchmarks.bench_matching [--products 5000]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from scrapers.matching import TitleIndex
+from scrapers.normalize import match_titles, normalize_title
+
+BRANDS = ['Samsung', 'Apple', 'OnePlus', 'Xiaomi', 'Realme', 'Vivo', 'Oppo', 'Motorola', 'Nokia', 'iQOO']
+LINES = ['Galaxy', 'Note', 'Nord', 'Edge', 'Pro', 'Neo', 'Max', 'Z', 'X', 'G']
+COLOURS = ['Black', 'Blue', 'Green', 'Titanium', 'Silver']
+STORAGE = ['64 GB', '128 GB', '256 GB', '512 GB']
+
+
+def catalog(products: int, seed: int = 0):
+    rng = random.Random(seed)
+    site_a, site_b = [], []
+    for i in range(products):
+        brand, line = rng.choice(BRANDS), rng.choice(LINES)
+        model = f'{rng.choice("ASMX")}{rng.randint(1, 99)}'
+        colour, storage = rng.choice(COLOURS), rng.choice(STORAGE)
+        site_a.append(f'{brand} {line} {model} ({storage}) - {colour}')
+        site_b.append((i, f'{brand.upper()} {line} {model} ({storage.replace(" ", "")}) {colour}'))
+    rng.shuffle(site_b)
+    truth = {(a, products + b) for b, (a, _) in enumerate(site_b)}
+    return site_a, [title for _, title in site_b], truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=200000, help='pairs timed for the pairwise estimate')
+    args = parser.parse_args()
+
+    site_a, site_b, truth = catalog(args.products)
+    pairs = len(site_a) * len(site_b)
+    print(f"{len(site_a)} x {len(site_b)} titles, {pairs:,} pairs")
+
+    sample = min(args.sample, pairs)
+    start = time.perf_counter()
+    for i in range(sample):
+        match_titles(site_a[i % len(site_a)], site_b[i // len(site_a)])
+    pairwise = (time.perf_counter() - start) / sample * pairs
+
+    start = time.perf_counter()
+    scores = process.cdist([normalize_title(t) for t in site_a], [normalize_title(t) for t in site_b],
+                           scorer=fuzz.ratio, score_cutoff=80, workers=-1)
+    expected = {(a, len(site_a) + b) for a, b in zip(*np.nonzero(scores > 80))}
+    exhaustive = time.perf_counter() - start
+    del scores
+
+    start = time.perf_counter()
+    index = TitleIndex()
+    index.add_all(site_a, 'A')
+    index.add_all(site_b, 'B')
+    clusters = index.clusters(cross_source=True)
+    found = {(a, b) for cluster in clusters for a, b, _ in cluster.pairs}
+    indexed = time.perf_counter() - start
+
+    print(f"{'method':<10}{'seconds':>10}{'speedup':>10}{'recall':>9}{'matched':>11}")
+    print(f"{'pairwise':<10}{pairwise:>10.2f}{1:>9}x{'':>9}{'':>11}")
+    for name, seconds, matched in (('cdist', exhaustive, expected), ('index', indexed, found)):
+        recall = len(matched & truth) / len(truth)
+        print(f"{name:<10}{seconds:>10.2f}{pairwise / seconds:>9.0f}x{recall:>9.1%}{len(matched):>11,}")
+    print(f"{len(clusters):,} clusters")
+
+
+if __name__ == '__main__':
+    main()
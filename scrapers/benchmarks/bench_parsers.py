@@ -0,0 +1,62 @@
+"""
+Parser backend benchmark over saved result pages.
+
+Parses every scrapers/fixtures/search/<site>_*.html page with each installed
+backend and reports the mean time per page and the speedup over bs4. Also checks
+that every backend extracts the same rows as bs4.
+
+    python -m scrapers.benchmarks.bench_parsers [--repeat 20] [--pages DIR]
+"""
+import argparse
+import glob
+import os
+import time
+
+from scrapers.adapters import REGISTRY
+from scrapers.fixtures.build_fixtures import SEARCH_DIR
+from scrapers.parsing import BACKENDS
+from scrapers import engine  # noqa: F401  registers the site adapters
+
+
+def load_pages(pages_dir: str):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+        site = os.path.basename(path).split('_', 1)[0]
+        if site in REGISTRY:
+            with open(path, encoding='utf-8') as f:
+                pages.setdefault(site, []).append(f.read())
+    return pages
+
+
+def time_backend(adapter, pages, backend, repeat):
+    adapter.parse(pages[0], backend)  # compile selectors outside the timed loop
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            adapter.parse(html, backend)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', default=SEARCH_DIR)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    print(f"{'site':<10}{'backend':<12}{'ms/page':>10}{'speedup':>10}{'rows':>7}")
+    for site, site_pages in pages.items():
+        adapter = REGISTRY[site]
+        reference = [adapter.parse(html, 'bs4') for html in site_pages]
+        baseline = time_backend(adapter, site_pages, 'bs4', args.repeat)
+        for backend in BACKENDS:
+            rows = [adapter.parse(html, backend) for html in site_pages]
+            if rows != reference:
+                print(f"{site:<10}{backend:<12} MISMATCH against bs4")
+                continue
+            mean = baseline if backend == 'bs4' else time_backend(adapter, site_pages, backend, args.repeat)
+            print(f"{site:<10}{backend:<12}{mean * 1000:>10.2f}{baseline / mean:>9.1f}x{sum(map(len, rows)):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Price parsing and FX conversion benchmark.
+
+Compares, on a synthetic column of scraped price strings and search result
+rows, the per-item approach (regex + float() and a dict lookup per offer)
+with prices.parse_prices() and FxTable.convert() on whole columns.
+
+    python -m scrapers.benchmarks.bench_prices [--rows 100000]
+"""
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from scrapers.prices import FxTable, load_fx_table, parse_prices
+
+_FIRST_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def price_strings(rows: int, distinct: int, seed: int = 0):
+    rng = random.Random(seed)
+    formats = ['₹{:,}', 'Rs. {:,}', '₹{:,} M.R.P.: ₹{:,}', '₹{:,} - ₹{:,}', '{:,}.']
+    values = []
+    for _ in range(distinct):
+        low = rng.randint(99, 150000)
+        values.append(rng.choice(formats).format(low, low + rng.randint(100, 5000)))
+    return [rng.choice(values) for _ in range(rows)]
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=5000)
+    args = parser.parse_args()
+
+    texts = price_strings(args.rows, args.distinct)
+    per_item = best_of(lambda: [float(_FIRST_NUMBER.search(t).group().replace(',', '')) for t in texts])
+    bulk = best_of(lambda: parse_prices(texts))
+    print(f"parse {args.rows:,} strings: per item {per_item * 1000:.1f} ms, "
+          f"parse_prices {bulk * 1000:.1f} ms ({per_item / bulk:.1f}x)")
+
+    table: FxTable = load_fx_table()
+    amounts = parse_prices(texts).price
+    currencies = np.random.default_rng(0).choice(['INR', 'USD', 'EUR'], size=len(texts))
+    rates = dict(table.rates)
+    per_item = best_of(lambda: [a * rates[c] / rates['USD'] for a, c in zip(amounts.tolist(), currencies.tolist())])
+    bulk = best_of(lambda: table.convert(amounts, currencies, to='USD'))
+    single = best_of(lambda: table.convert(amounts, 'INR', to='USD'))
+    print(f"convert {args.rows:,} prices: per item {per_item * 1000:.1f} ms, convert {bulk * 1000:.2f} ms "
+          f"({per_item / bulk:.0f}x), one currency {single * 1000:.2f} ms")
+    offers = amounts[:50]
+    per_request = best_of(lambda: table.convert(offers, 'INR', to='USD'), repeat=1000)
+    print(f"convert one 50-offer search result: {per_request * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
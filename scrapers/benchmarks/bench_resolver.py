@@ -0,0 +1,52 @@
+"""
+Canonical product resolver throughput.
+
+Streams the synthetic two-site catalog of bench_matching through a fresh
+ProductResolver (site A, then site B, then a repeat scrape of both) and
+reports offers resolved per second for each pass, how many products were
+created, and how many site B offers landed on their true site A product.
+
+    python -m scrapers.benchmarks.bench_resolver [--products 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from scrapers.benchmarks.bench_matching import catalog
+from scrapers.resolver import ProductResolver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, default=20000)
+    args = parser.parse_args()
+
+    site_a, site_b, truth = catalog(args.products)
+    resolver = ProductResolver()
+    print(f"{'pass':<12}{'offers':>9}{'offers/s':>11}{'products':>10}")
+    ids = []
+    for name, titles in (('site A', site_a), ('site B', site_b), ('repeat', site_a + site_b)):
+        start = time.perf_counter()
+        resolved = resolver.resolve_many(titles)
+        seconds = time.perf_counter() - start
+        if name != 'repeat':
+            ids.extend(resolved)
+        print(f"{name:<12}{len(titles):>9}{len(titles) / seconds:>11,.0f}{len(resolver):>10}")
+
+    correct = sum(ids[a] == ids[b] for a, b in truth)
+    print(f"site B offers on their true product: {correct / len(truth):.1%}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'resolver.json.gz')
+        start = time.perf_counter()
+        resolver.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        ProductResolver.load(path)
+        loaded = time.perf_counter() - start
+        print(f"snapshot {os.path.getsize(path) / 1024:.0f} KiB, save {saved:.2f}s, load {loaded:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Scraper throughput benchmark against the local fixture server.
+
+For every search adapter and review scraper this reports:
+
+    pages/s    end-to-end fetch + parse throughput against the fixture server
+    items/s    result rows (or reviews) extracted per second
+    parse ms   mean parse time per page, network excluded
+    peak KiB   peak Python heap allocated while parsing one page (tracemalloc;
+               memory held inside the C parsers is not counted)
+
+    python -m scrapers.benchmarks.bench_scrapers [--pages 50] [--latency 0.05] [--json out.json]
+
+Use --json to keep a baseline and compare runs for regressions.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapers.adapters import REGISTRY
+from scrapers.fixtures.server import FixtureServer
+from scrapers.review_scraper import (
+    parse_reviews_amazon, parse_reviews_flipkart, scrape_reviews_amazon, scrape_reviews_flipkart,
+)
+from scrapers import engine  # noqa: F401  registers the site adapters
+
+REVIEW_SCRAPERS = {
+    'amazon_reviews': ('amazon', scrape_reviews_amazon, parse_reviews_amazon),
+    'flipkart_reviews': ('flipkart', scrape_reviews_flipkart, parse_reviews_flipkart),
+}
+
+
+def measure_parse(parse, pages, repeat=5):
+    """Mean seconds per page and peak traced KiB for one parse."""
+    parse(pages[0])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse(html)
+    mean = (time.perf_counter() - start) / (repeat * len(pages))
+    tracemalloc.start()
+    parse(pages[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return mean, peak / 1024
+
+
+async def _search_many(adapter, queries, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(query):
+        async with semaphore:
+            return await adapter.search(query)
+
+    return await asyncio.gather(*(one(query) for query in queries))
+
+
+def bench_search(server, site, n_pages, concurrency):
+    adapter = server.adapter(REGISTRY[site])
+    queries = [f'{site} query {i}' for i in range(n_pages)]
+    start = time.perf_counter()
+    results = asyncio.run(_search_many(adapter, queries, concurrency))
+    elapsed = time.perf_counter() - start
+    pages = [html.decode('utf-8') for html in server.search_pages[site].values()]
+    parse_s, peak_kib = measure_parse(adapter.parse, pages)
+    return {
+        'pages_per_s': n_pages / elapsed,
+        'items_per_s': sum(map(len, results)) / elapsed,
+        'parse_ms': parse_s * 1000,
+        'peak_kib': peak_kib,
+    }
+
+
+def bench_reviews(server, site, scrape, parse, n_pages, concurrency):
+    products = list(server.review_pages[site])
+    urls = [server.review_url(site, products[i % len(products)]) for i in range(n_pages)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(scrape, urls))
+    elapsed = time.perf_counter() - start
+    pages = [html.decode('utf-8') for html in server.review_pages[site].values()]
+    parse_s, peak_kib = measure_parse(parse, pages)
+    return {
+        'pages_per_s': n_pages / elapsed,
+        'items_per_s': sum(map(len, results)) / elapsed,
+        'parse_ms': parse_s * 1000,
+        'peak_kib': peak_kib,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scraper throughput benchmark')
+    parser.add_argument('--pages', type=int, default=50, help='pages fetched per scraper')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='injected server latency (s)')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    report = {}
+    with FixtureServer(latency=args.latency) as server:
+        for site in REGISTRY:
+            if site in server.search_pages:
+                report[site] = bench_search(server, site, args.pages, args.concurrency)
+        for name, (site, scrape, parse) in REVIEW_SCRAPERS.items():
+            if site in server.review_pages:
+                report[name] = bench_reviews(server, site, scrape, parse, args.pages, args.concurrency)
+
+    print(f"{'scraper':<18}{'pages/s':>10}{'items/s':>10}{'parse ms':>10}{'peak KiB':>10}")
+    for name, row in report.items():
+        print(f"{name:<18}{row['pages_per_s']:>10.1f}{row['items_per_s']:>10.1f}"
+              f"{row['parse_ms']:>10.2f}{row['peak_kib']:>10.0f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
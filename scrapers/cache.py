@@ -1,11 +1,311 @@
-import redis
-import json
+"""
+Two-tier cache for search results.
 
-r = redis.Redis(host='localhost', port=6379, db=0)
+Each worker keeps a bounded in-process LRU tier (entry count and payload bytes,
+short TTL) in front of the shared Redis tier. Hot queries are answered from
+process memory without a network round trip or a JSON decode; misses fall
+through to Redis and are promoted into the local tier.
 
-def cache_search(query: str, data: dict, ttl: int = 3600):
-    r.setex(f'search:{query}', ttl, json.dumps(data))
+Keys are namespaced and versioned ("search:v3:<query>"), so bumping
+SEARCH_CACHE_VERSION retires every entry written in an older format at once.
+Search keys are canonical (see search_key), so "iPhone 15" and "iphone  15"
+share an entry.
 
-def get_cached_search(query: str):
-    val = r.get(f'search:{query}')
-    return json.loads(val) if val else None
+Entries carry a soft TTL inside the hard (storage) TTL. Past the soft TTL an
+entry is stale: get_or_search() still returns it immediately and refreshes it
+in the background, so only a hard miss puts a scrape on the caller's path.
+
+Redis values are encoded by a cache_codec.Codec (SEARCH_CACHE_CODEC, e.g.
+msgpack+zstd). Payloads are self-describing, so changing the codec needs no
+version bump. Both tiers keep hit/miss/latency counters, see
+TwoTierCache.stats().
+
+Values returned from the local tier are shared with other callers in the same
+process and must not be mutated.
+
+get_or_search() coalesces concurrent misses for the same query (see
+singleflight), so a cold popular query is scraped once, not once per request.
+Coroutines use alookup/aget/aset, which do the blocking Redis calls in a
+worker thread so a slow Redis never stalls the shared scraper event loop.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from scrapers import config
+from scrapers.cache_codec import Codec, CodecError, get_codec, payload_size
+from scrapers.normalize import canonical_query
+from scrapers.redis_pool import RedisCooldown
+from scrapers.singleflight import cached_call
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class TierStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'avg_latency_us': self.seconds / lookups * 1e6 if lookups else 0.0,
+        }
+
+
+class LocalTier:
+    """In-process LRU with per-entry TTL, bounded by entry count and payload bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = TierStats()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                value = MISSING
+            else:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                value = entry[0]
+            self.stats.seconds += time.perf_counter() - start
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key: str):
+        self.bytes -= self._entries.pop(key)[1]
+
+
+class RedisTier:
+    """Shared tier; a failing Redis is skipped for retry_after seconds instead of failing callers."""
+
+    def __init__(self, url: Optional[str], retry_after: float = 30.0):
+        self.url = url
+        self.stats = TierStats()
+        self.cooldown = RedisCooldown('Redis cache', 'using the local tier only', retry_after)
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url, socket_timeout=1.0)
+        return self._client
+
+    def _available(self) -> bool:
+        return bool(self.url) and self.cooldown.available()
+
+    def _failed(self, e: Exception):
+        self.stats.errors += 1
+        self.cooldown.failed(e)
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self._available():
+            return None
+        start = time.perf_counter()
+        try:
+            raw = self.client().get(key)
+        except Exception as e:
+            self._failed(e)
+            return None
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+        if raw is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return raw
+
+    def set(self, key: str, raw: bytes, ttl: int):
+        if not self._available():
+            return
+        try:
+            self.client().setex(key, ttl, raw)
+        except Exception as e:
+            self._failed(e)
+
+    def delete(self, key: str):
+        if not self._available():
+            return
+        try:
+            self.client().delete(key)
+        except Exception as e:
+            self._failed(e)
+
+
+class TwoTierCache:
+    def __init__(self, namespace: str, version: int, ttl: int, local: LocalTier, remote: RedisTier,
+                 local_ttl: float, soft_ttl: Optional[int] = None, codec: Optional[Codec] = None):
+        self.namespace = namespace
+        self.version = version
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self.local_ttl = local_ttl
+        self.local = local
+        self.remote = remote
+        self.codec = codec or Codec()
+
+    def key(self, key: str) -> str:
+        return f'{self.namespace}:v{self.version}:{key}'
+
+    def lookup(self, key: str) -> Tuple[Any, bool]:
+        """(value, stale) for key; value is None on a miss."""
+        full_key = self.key(key)
+        entry = self.local.get(full_key)
+        if entry is MISSING:
+            entry = self._fetch(full_key)
+        return self._unpack(entry)
+
+    async def alookup(self, key: str) -> Tuple[Any, bool]:
+        """lookup() for coroutines: a local miss reads Redis in a worker thread, off the event loop."""
+        full_key = self.key(key)
+        entry = self.local.get(full_key)
+        if entry is MISSING:
+            entry = await asyncio.to_thread(self._fetch, full_key)
+        return self._unpack(entry)
+
+    def _fetch(self, full_key: str) -> Optional[dict]:
+        raw = self.remote.get(full_key)
+        if raw is None:
+            return None
+        try:
+            entry = self.codec.decode(raw)
+        except CodecError as e:
+            logger.warning("Ignoring cache entry %s: %s", full_key, e)
+            return None
+        self._set_local_entry(full_key, entry, payload_size(raw), self.local_ttl)
+        return entry
+
+    def _set_local_entry(self, full_key: str, entry: dict, size: int, ttl: float):
+        if self.remote.url:
+            # Not kept locally past its soft TTL, so a refresh by another worker
+            # is seen as soon as this worker's copy goes stale
+            ttl = min(ttl, entry['fresh_until'] - time.time())
+        if ttl > 0:
+            self.local.set(full_key, entry, size, ttl)
+
+    @staticmethod
+    def _unpack(entry: Optional[dict]) -> Tuple[Any, bool]:
+        if entry is None:
+            return None, False
+        return entry['value'], time.time() >= entry['fresh_until']
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, stale or not, or None."""
+        return self.lookup(key)[0]
+
+    async def aget(self, key: str) -> Any:
+        return (await self.alookup(key))[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, soft_ttl: Optional[int] = None):
+        self.remote.set(*self._set_local(key, value, ttl, soft_ttl))
+
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None, soft_ttl: Optional[int] = None):
+        """set() for coroutines: the Redis write runs in a worker thread."""
+        await asyncio.to_thread(self.remote.set, *self._set_local(key, value, ttl, soft_ttl))
+
+    def _set_local(self, key: str, value: Any, ttl: Optional[int], soft_ttl: Optional[int]) -> Tuple[str, bytes, int]:
+        full_key = self.key(key)
+        ttl = ttl or self.ttl
+        soft_ttl = min(soft_ttl or self.soft_ttl or ttl, ttl)
+        # Wall clock, since workers compare it against each other's writes
+        entry = {'value': value, 'fresh_until': time.time() + soft_ttl}
+        raw = self.codec.encode(entry)
+        self._set_local_entry(full_key, entry, payload_size(raw), min(self.local_ttl, ttl))
+        return full_key, raw, ttl
+
+    def delete(self, key: str):
+        full_key = self.key(key)
+        self.local.delete(full_key)
+        self.remote.delete(full_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'local': dict(self.local.stats.as_dict(), entries=len(self.local), bytes=self.local.bytes),
+            'redis': self.remote.stats.as_dict(),
+        }
+
+
+search_cache = TwoTierCache(
+    namespace='search',
+    version=config.SEARCH_CACHE_VERSION,
+    ttl=config.SEARCH_CACHE_TTL,
+    local=LocalTier(config.LOCAL_CACHE_MAX_ENTRIES, config.LOCAL_CACHE_MAX_BYTES),
+    remote=RedisTier(config.REDIS_URL),
+    local_ttl=config.LOCAL_CACHE_TTL,
+    soft_ttl=config.SEARCH_CACHE_SOFT_TTL,
+    codec=get_codec(config.SEARCH_CACHE_CODEC, config.SEARCH_CACHE_COMPRESS_MIN),
+)
+
+
+def search_key(query: str, filters: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical cache key for a query plus filters, independent of case, spacing and filter order."""
+    key = canonical_query(query)
+    if filters:
+        parts = []
+        for name in sorted(filters):
+            value = filters[name]
+            if isinstance(value, (list, tuple, set)):
+                value = ','.join(sorted(str(v).casefold() for v in value))
+            elif isinstance(value, str):
+                value = value.casefold()
+            parts.append(f'{name}={value}')
+        key += '|' + '&'.join(parts)
+    if len(key) > 200:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    return key
+
+
+def cache_search(query: str, data: dict, ttl: Optional[int] = None, filters: Optional[Dict[str, Any]] = None):
+    search_cache.set(search_key(query, filters), data, ttl)
+
+def get_cached_search(query: str, filters: Optional[Dict[str, Any]] = None):
+    return search_cache.get(search_key(query, filters))
+
+async def get_or_search(query: str, compute: Callable[[], Awaitable[dict]], ttl: Optional[int] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> dict:
+    return await cached_call(search_cache, search_key(query, filters), compute, ttl)
@@ -0,0 +1,166 @@
+"""
+Binary encoding of cached values.
+
+A Codec serializes a value (json, orjson or msgpack) and compresses payloads
+above a size threshold (zlib, zstd or lz4). Every payload starts with a small
+header naming its serializer and compressor:
+
+    b'SC' | header version | serializer id | compressor id | uncompressed size (4 bytes)
+
+so decode() reads whatever any worker wrote, whichever codec it was configured
+with; payloads without the header are the plain JSON written before codecs
+existed. Workers can therefore switch codecs one at a time without flushing
+the cache. The optional libraries are only needed to write (or read) their
+own formats:
+
+    codec = get_codec('msgpack+zstd', compress_min=1024)
+    raw = codec.encode(value)
+    codec.decode(raw) == value
+
+Run `python -m scrapers.benchmarks.bench_codecs` to compare the combinations
+on search results.
+"""
+import json
+import struct
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+MAGIC = b'SC'
+HEADER_VERSION = 1
+_HEADER = struct.Struct('>2sBBBI')
+
+
+class CodecError(ValueError):
+    """A payload that is corrupt, or written in a format this worker can't read."""
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+# id -> (name, dumps, loads); ids are stored in payloads, never reuse one
+SERIALIZERS: Dict[int, Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    0: ('json', _json_dumps, json.loads),
+}
+if orjson is not None:
+    SERIALIZERS[1] = ('orjson', lambda v: orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+if msgpack is not None:
+    SERIALIZERS[2] = ('msgpack', lambda v: msgpack.packb(v, use_bin_type=True),
+                      lambda b: msgpack.unpackb(b, raw=False, strict_map_key=False))
+
+COMPRESSORS: Dict[int, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    0: ('none', lambda b: b, lambda b: b),
+    1: ('zlib', lambda b: zlib.compress(b, 6), zlib.decompress),
+}
+if zstandard is not None:
+    _zstd_c = zstandard.ZstdCompressor(level=3)
+    _zstd_d = zstandard.ZstdDecompressor()
+    COMPRESSORS[2] = ('zstd', _zstd_c.compress, _zstd_d.decompress)
+if lz4 is not None:
+    COMPRESSORS[3] = ('lz4', lz4.frame.compress, lz4.frame.decompress)
+
+_SERIALIZER_IDS = {name: id_ for id_, (name, _, _) in SERIALIZERS.items()}
+_COMPRESSOR_IDS = {name: id_ for id_, (name, _, _) in COMPRESSORS.items()}
+_SERIALIZER_PREFERENCE = ('orjson', 'msgpack', 'json')
+_COMPRESSOR_PREFERENCE = ('zstd', 'lz4', 'zlib')
+
+
+class Codec:
+    def __init__(self, serializer: str = 'json', compressor: str = 'none', compress_min: int = 1024):
+        """
+        Args:
+            serializer: json, orjson or msgpack
+            compressor: none, zlib, zstd or lz4
+            compress_min: payloads smaller than this many bytes are stored uncompressed
+        """
+        if serializer not in _SERIALIZER_IDS:
+            raise ValueError(f"Serializer {serializer!r} is not installed")
+        if compressor not in _COMPRESSOR_IDS:
+            raise ValueError(f"Compressor {compressor!r} is not installed")
+        self.serializer = serializer
+        self.compressor = compressor
+        self.compress_min = compress_min
+        self._serializer_id = _SERIALIZER_IDS[serializer]
+        self._compressor_id = _COMPRESSOR_IDS[compressor]
+
+    @property
+    def name(self) -> str:
+        return self.serializer if self.compressor == 'none' else f'{self.serializer}+{self.compressor}'
+
+    def encode(self, value: Any) -> bytes:
+        body = SERIALIZERS[self._serializer_id][1](value)
+        size = len(body)
+        compressor_id = self._compressor_id if size >= self.compress_min else 0
+        if compressor_id:
+            body = COMPRESSORS[compressor_id][1](body)
+        return _HEADER.pack(MAGIC, HEADER_VERSION, self._serializer_id, compressor_id, size) + body
+
+    def decode(self, raw: bytes) -> Any:
+        return decode(raw)
+
+
+def _header(raw: bytes) -> Optional[Tuple[int, int, int, int]]:
+    if raw[:2] != MAGIC or len(raw) < _HEADER.size:
+        return None
+    _, version, serializer_id, compressor_id, size = _HEADER.unpack_from(raw)
+    return version, serializer_id, compressor_id, size
+
+
+def decode(raw: bytes) -> Any:
+    """Decode a payload written by any codec, or legacy plain JSON."""
+    header = _header(raw)
+    try:
+        if header is None:
+            return json.loads(raw)
+        version, serializer_id, compressor_id, _ = header
+        if version != HEADER_VERSION:
+            raise CodecError(f"Unknown cache header version {version}")
+        if serializer_id not in SERIALIZERS or compressor_id not in COMPRESSORS:
+            raise CodecError(f"Cache payload needs serializer {serializer_id} / compressor {compressor_id}, "
+                             "which are not installed")
+        body = COMPRESSORS[compressor_id][2](raw[_HEADER.size:])
+        return SERIALIZERS[serializer_id][2](body)
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"Undecodable cache payload: {e}") from e
+
+
+def payload_size(raw: bytes) -> int:
+    """Uncompressed size of a payload, for budgeting decoded values in memory."""
+    header = _header(raw)
+    return len(raw) if header is None else header[3]
+
+
+def get_codec(spec: str = 'auto', compress_min: int = 1024) -> Codec:
+    """
+    Codec from a "serializer[+compressor]" spec, e.g. "msgpack+zstd" or "json".
+
+    "auto" picks the fastest serializer and compressor installed.
+    """
+    if spec == 'auto':
+        serializer = next(name for name in _SERIALIZER_PREFERENCE if name in _SERIALIZER_IDS)
+        compressor = next(name for name in _COMPRESSOR_PREFERENCE if name in _COMPRESSOR_IDS)
+    else:
+        serializer, _, compressor = spec.partition('+')
+    return Codec(serializer, compressor or 'none', compress_min)
@@ -0,0 +1,76 @@
+"""
+Scraper settings, read from the same environment variables as backend/app/config.py
+"""
+import os
+
+USER_AGENT = os.getenv('SCRAPER_USER_AGENT', 'Mozilla/5.0')
+
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
+
+# Per-site timeout (seconds) for one marketplace search, overridable per site
+# with e.g. SCRAPER_TIMEOUT_AMAZON=5
+SCRAPER_TIMEOUT = float(os.getenv('SCRAPER_TIMEOUT', '8'))
+
+# Connection pool shared by every scraper in a worker process
+MAX_CONNECTIONS = int(os.getenv('SCRAPER_MAX_CONNECTIONS', '20'))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('SCRAPER_MAX_KEEPALIVE', '10'))
+KEEPALIVE_EXPIRY = float(os.getenv('SCRAPER_KEEPALIVE_EXPIRY', '30'))
+
+# Politeness: at most one request per REQUEST_DELAY seconds per host (bursts of
+# REQUEST_BURST), shared across workers through Redis unless disabled
+REQUEST_DELAY = float(os.getenv('REQUEST_DELAY', '1.0'))
+REQUEST_BURST = float(os.getenv('SCRAPER_REQUEST_BURST', '2'))
+SHARED_BUDGETS = os.getenv('SCRAPER_SHARED_BUDGETS', 'true').lower() in ('1', 'true', 'yes')
+MAX_RETRIES = int(os.getenv('SCRAPER_MAX_RETRIES', '3'))
+BACKOFF_BASE = float(os.getenv('SCRAPER_BACKOFF_BASE', '1.0'))
+BACKOFF_CAP = float(os.getenv('SCRAPER_BACKOFF_CAP', '30'))
+BREAKER_THRESHOLD = int(os.getenv('SCRAPER_BREAKER_THRESHOLD', '5'))
+BREAKER_RESET = float(os.getenv('SCRAPER_BREAKER_RESET', '60'))
+# Local stand-ins (fixture server, dev proxies) are never rate limited
+UNTHROTTLED_HOSTS = os.getenv('SCRAPER_UNTHROTTLED_HOSTS', '127.0.0.1,localhost').split(',')
+
+# Repeat scrapes: per-URL validators (ETag, Last-Modified, body hash) are kept
+# in Redis so every worker sees them, unless disabled
+SHARED_VALIDATORS = os.getenv('SCRAPER_SHARED_VALIDATORS', 'true').lower() in ('1', 'true', 'yes')
+
+# Search result cache: Redis tier plus a per-worker in-process tier. Bump
+# SEARCH_CACHE_VERSION to retire every cached entry after a format change.
+# Entries older than the soft TTL are served stale while refreshed in the
+# background; the (hard) TTL is how long they are kept at all.
+SEARCH_CACHE_VERSION = int(os.getenv('SEARCH_CACHE_VERSION', '3'))
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '3600'))
+SEARCH_CACHE_SOFT_TTL = int(os.getenv('SEARCH_CACHE_SOFT_TTL', '900'))
+# Results missing a site that failed or timed out are cached this long only
+# (0: not at all), so an outage isn't served as "no offers" for the full TTL
+SEARCH_CACHE_PARTIAL_TTL = int(os.getenv('SEARCH_CACHE_PARTIAL_TTL', '60'))
+# "serializer[+compressor]" (json/orjson/msgpack, zlib/zstd/lz4) or "auto" for
+# the fastest installed; payloads under SEARCH_CACHE_COMPRESS_MIN bytes stay
+# uncompressed
+SEARCH_CACHE_CODEC = os.getenv('SEARCH_CACHE_CODEC', 'auto')
+SEARCH_CACHE_COMPRESS_MIN = int(os.getenv('SEARCH_CACHE_COMPRESS_MIN', '1024'))
+LOCAL_CACHE_TTL = float(os.getenv('LOCAL_CACHE_TTL', '60'))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', '1024'))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv('LOCAL_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Single-flight: lease held by the worker computing a cache miss, and how often
+# and for how long other workers poll the cache for its result
+SINGLEFLIGHT_LEASE_MS = int(os.getenv('SINGLEFLIGHT_LEASE_MS', '30000'))
+SINGLEFLIGHT_POLL = float(os.getenv('SINGLEFLIGHT_POLL', '0.05'))
+SINGLEFLIGHT_WAIT = float(os.getenv('SINGLEFLIGHT_WAIT', '15'))
+
+# Canonical product resolver: snapshot file, match threshold (fuzz.ratio) and
+# how often (seconds) a changed index is written back
+RESOLVER_SNAPSHOT = os.getenv('RESOLVER_SNAPSHOT', 'data/resolver.json.gz')
+RESOLVER_THRESHOLD = float(os.getenv('RESOLVER_THRESHOLD', '80'))
+RESOLVER_SAVE_INTERVAL = float(os.getenv('RESOLVER_SAVE_INTERVAL', '60'))
+
+# Exchange-rate table used to convert prices (see prices.py); point this at a
+# fresher snapshot to update rates without a deploy
+FX_RATES_PATH = os.getenv('FX_RATES_PATH', os.path.join(os.path.dirname(__file__), 'data', 'fx_rates.json'))
+
+# HTML parser backend: selectolax, lxml or bs4 (default: fastest installed)
+PARSER = os.getenv('SCRAPER_PARSER', '')
+
+
+def site_timeout(site: str) -> float:
+    return float(os.getenv(f'SCRAPER_TIMEOUT_{site.upper()}', SCRAPER_TIMEOUT))
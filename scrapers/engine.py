@@ -0,0 +1,106 @@
+"""
+Concurrent marketplace search.
+
+Every marketplace registered in adapters.REGISTRY is queried at once over the
+shared connection pool (see http_pool), each under its own timeout. A site that
+is slow or failing contributes an empty list instead of holding up the others.
+
+Periodic refresh jobs pass skip_unchanged=True: sites whose result page has not
+changed since the previous refresh then map to None, so neither parsing nor
+the downstream DB write is repeated, and changed sites map to ChangedResults.
+Their validators are stored by commit_validators() once the rows are persisted.
+Sites that fail map to FAILED rather than [], so a failure is not mistaken for
+a page that now lists nothing.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from scrapers import config
+from scrapers import validators
+from scrapers.adapters import REGISTRY
+from scrapers.cache import get_or_search
+from scrapers.http_pool import run_sync
+from scrapers.singleflight import CacheFor
+# Importing the site modules registers their adapters
+from scrapers import amazon_scraper, flipkart_scraper, myntra_scraper, nykaa_scraper  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# What a failed site maps to in skip_unchanged searches
+FAILED = object()
+
+
+async def _search_site(site: str, query: str, timeout: float, skip_unchanged: bool):
+    # FAILED when the site timed out or failed
+    adapter = REGISTRY[site]
+    search = adapter.search_changed if skip_unchanged else adapter.search
+    try:
+        return await asyncio.wait_for(search(query), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("%s search for %r timed out after %.1fs", site, query, timeout)
+    except Exception as e:
+        logger.warning("%s search for %r failed: %s", site, query, e)
+    return FAILED
+
+
+async def search_all(query: str, sites: Optional[Iterable[str]] = None,
+                     timeouts: Optional[Dict[str, float]] = None,
+                     skip_unchanged: bool = False) -> Dict[str, object]:
+    """
+    Search all (or the given) marketplaces concurrently.
+
+    Returns a dict of site name -> results; sites that time out or fail map to [].
+    With skip_unchanged, sites map to ChangedResults, to None when their page is
+    unchanged, or to FAILED.
+    """
+    results = await _gather(query, sites, timeouts, skip_unchanged)
+    if skip_unchanged:
+        return results
+    return {site: [] if rows is FAILED else rows for site, rows in results.items()}
+
+
+async def _gather(query: str, sites: Optional[Iterable[str]], timeouts: Optional[Dict[str, float]],
+                  skip_unchanged: bool) -> Dict[str, object]:
+    names = list(sites or REGISTRY)
+    timeouts = timeouts or {}
+    results = await asyncio.gather(*(
+        _search_site(name, query, timeouts.get(name, config.site_timeout(name)), skip_unchanged)
+        for name in names
+    ))
+    return dict(zip(names, results))
+
+
+def search_all_sync(query: str, sites: Optional[Iterable[str]] = None,
+                    timeouts: Optional[Dict[str, float]] = None,
+                    skip_unchanged: bool = False) -> Dict[str, object]:
+    return run_sync(search_all(query, sites, timeouts, skip_unchanged))
+
+
+async def commit_validators(pending: Dict[str, Dict[str, str]]):
+    """Store ChangedResults validators (url -> validators) once their rows are persisted."""
+    for url, stored in pending.items():
+        await validators.store.set(url, stored)
+
+
+def commit_validators_sync(pending: Dict[str, Dict[str, str]]):
+    run_sync(commit_validators(pending))
+
+
+async def search_all_cached(query: str) -> Dict[str, List[Dict]]:
+    """
+    search_all() through the search cache; concurrent misses share one scrape.
+
+    Results in which a site failed are only cached for SEARCH_CACHE_PARTIAL_TTL.
+    """
+    async def compute():
+        results = await _gather(query, None, None, False)
+        failed = [site for site, rows in results.items() if rows is FAILED]
+        results = {site: [] if rows is FAILED else rows for site, rows in results.items()}
+        return CacheFor(results, config.SEARCH_CACHE_PARTIAL_TTL) if failed else results
+
+    return await get_or_search(query, compute)
+
+
+def search_all_cached_sync(query: str) -> Dict[str, List[Dict]]:
+    return run_sync(search_all_cached(query))
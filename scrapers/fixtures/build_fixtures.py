@@ -0,0 +1,195 @@
+"""
+Build the offline HTML fixture corpus used by the fixture server, benchmarks and tests.
+
+Pages mirror the markup the adapters target (result container, item and field
+classes) surrounded by the kind of bulk real result pages carry: inline
+scripts and styles, navigation, filter sidebars and sponsored widgets. Output is
+deterministic, so the committed files only change when this script does.
+Pages captured from the live sites can be dropped next to them as
+search/<site>_<query slug>.html or reviews/<site>_<product>.html.
+
+    python -m scrapers.fixtures.build_fixtures
+"""
+import os
+import random
+from datetime import date, timedelta
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DIR = os.path.join(FIXTURE_DIR, 'search')
+REVIEWS_DIR = os.path.join(FIXTURE_DIR, 'reviews')
+
+BRANDS = ['Apple', 'Samsung', 'OnePlus', 'Xiaomi', 'Realme', 'Vivo', 'Oppo', 'Motorola', 'Nokia', 'iQOO']
+MODELS = ['15', '15 Pro', 'S24 Ultra', '12R', 'Note 13', 'Nord CE 3', 'X100', 'Edge 50', 'G34', 'Z9']
+VARIANTS = ['128 GB', '256 GB', '8GB RAM', '12GB RAM', 'Black', 'Blue', 'Titanium', 'Green']
+
+QUERIES = {'iphone_15': 'iPhone 15', 'running_shoes': 'running shoes'}
+PRODUCTS = ['iphone_15', 'galaxy_s24']
+REVIEW_PAGES = 5  # review pages per product; later pages are empty
+NEWEST_REVIEW = date(2024, 3, 31)
+
+PHRASES = {
+    5: ['Absolutely love it, great quality.', 'Best phone I have owned.', 'Superb camera and battery.'],
+    4: ['Good value for money.', 'Works well, minor heating issues.', 'Nice display, decent speakers.'],
+    3: ['It is okay, nothing special.', 'Average performance for the price.', 'Does the job.'],
+    2: ['Battery drains too fast.', 'Not worth the price.', 'Camera is disappointing.'],
+    1: ['Terrible, stopped working in a week.', 'Worst purchase ever.', 'Very poor build quality.'],
+}
+
+
+def _title(rng):
+    return f"{rng.choice(BRANDS)} {rng.choice(MODELS)} ({rng.choice(VARIANTS)}, {rng.choice(VARIANTS)})"
+
+
+def _price(rng):
+    return f"{rng.randint(5, 160) * 1000 - 1:,}"
+
+
+def _noise(rng, blocks):
+    # Inline scripts/styles and navigation that parsers have to skip over
+    parts = []
+    for i in range(blocks):
+        payload = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(400))
+        parts.append(f'<script type="text/javascript">window.__w{i} = "{payload}";</script>')
+        parts.append(f'<style>.c{i}{{margin:{i}px;padding:{i % 7}px}}</style>')
+        parts.append('<nav><ul>' + ''.join(
+            f'<li class="nav-item"><a href="/c/{i}/{j}">Category {i}.{j}</a></li>' for j in range(12)
+        ) + '</ul></nav>')
+    return '\n'.join(parts)
+
+
+def _sidebar(rng):
+    return '<aside class="filters">' + ''.join(
+        f'<div class="filter"><input type="checkbox" id="f{i}"><label for="f{i}">{rng.choice(BRANDS)}</label></div>'
+        for i in range(60)
+    ) + '</aside>'
+
+
+def _amazon_item(rng, i):
+    return f'''<div data-asin="B0{i:08d}" class="s-result-item s-asin sg-col">
+  <div class="s-card-container"><span class="a-declarative">
+    <a class="a-link-normal s-no-outline" href="/dp/B0{i:08d}/ref=sr_1_{i}"><img class="s-image" src="https://m.media-amazon.com/images/I/{i}.jpg"></a>
+    <h2 class="a-size-mini"><a class="a-link-normal s-underline-text" href="/dp/B0{i:08d}/ref=sr_1_{i}"><span class="a-size-medium a-color-base a-text-normal">{_title(rng)}</span></a></h2>
+    <div class="a-row"><span class="a-icon-alt">{rng.randint(30, 50) / 10} out of 5 stars</span><span class="a-size-base">{rng.randint(10, 90000):,}</span></div>
+    <span class="a-price"><span class="a-offscreen">&#8377;{_price(rng)}</span><span class="a-price-whole">{_price(rng)}<span class="a-price-decimal">.</span></span></span>
+  </span></div>
+</div>'''
+
+
+def _flipkart_item(rng, i):
+    return f'''<div class="_1AtVbE col-12-12"><div class="_13oc-S"><div data-id="MOB{i:012d}">
+  <a class="_1fQZEK" href="/product/p/itm{i:010d}?pid=MOB{i:012d}"><div class="_3pLy-c row">
+    <div class="col col-7-12"><div class="_4rR01T">{_title(rng)}</div>
+      <ul class="_1xgFaf"><li class="rgWa7D">{rng.choice(VARIANTS)}</li><li class="rgWa7D">6.1 inch Display</li></ul></div>
+    <div class="col col-5-12"><div class="_30jeq3 _1_WHN1">&#8377;{_price(rng)}</div><div class="_3I9_wc">&#8377;{_price(rng)}</div></div>
+  </div></a>
+</div></div></div>'''
+
+
+def _myntra_item(rng, i):
+    return f'''<li class="product-base" id="{i}"><a href="shoes/{rng.choice(BRANDS).lower()}/{i}/buy" target="_blank">
+  <div class="product-imageSliderContainer"><img src="https://assets.myntassets.com/{i}.jpg"></div>
+  <div class="product-productMetaInfo"><h3 class="product-brand">{rng.choice(BRANDS)}</h3>
+    <h4 class="product-product">Men Running Shoes {rng.choice(VARIANTS)}</h4>
+    <div class="product-price"><span><span class="product-discountedPrice">Rs. {_price(rng)}</span><span class="product-strike">Rs. {_price(rng)}</span></span></div>
+  </div></a></li>'''
+
+
+def _nykaa_item(rng, i):
+    return f'''<div class="productWrapper css-17nge1h"><div class="css-d5z3ro">
+  <a class="css-qlopj4" href="/p/{i}?productId={i}&amp;pps=1"><div class="css-43m2vm"><img src="https://images-static.nykaa.com/{i}.jpg"></div>
+    <div class="css-xrzmfa">{rng.choice(BRANDS)} Lip Matte {rng.choice(VARIANTS)}</div>
+    <div class="css-1d0jf8e"><span class="css-17x46n5">MRP:<span>&#8377;{_price(rng)}</span></span><span class="css-111z9ua">&#8377;{_price(rng)}</span></div>
+  </a></div></div>'''
+
+
+def _review_text(rng, stars):
+    return ' '.join(rng.choice(PHRASES[stars]) for _ in range(rng.randint(1, 6)))
+
+
+# Reviews are numbered across pages, newest first: review i is i days old
+
+def _amazon_review(rng, i):
+    stars = rng.randint(1, 5)
+    day = NEWEST_REVIEW - timedelta(days=i)
+    return f'''<div id="R{i:010d}" data-hook="review" class="a-section review aok-relative">
+  <div class="a-profile-content"><span class="a-profile-name">Customer {i}</span></div>
+  <i data-hook="review-star-rating" class="a-icon a-icon-star"><span class="review-rating">{stars}.0 out of 5 stars</span></i>
+  <span data-hook="review-date" class="review-date">Reviewed in India on {day.day} {day:%B %Y}</span>
+  <span data-hook="review-body" class="review-text"><span>{_review_text(rng, stars)}</span></span>
+</div>'''
+
+
+def _flipkart_review(rng, i):
+    stars = rng.randint(1, 5)
+    return f'''<div class="col _2wzgFH"><div class="_16PBlm"><div class="row">
+  <div class="_3LWZlK _1BLPMq">{stars}</div><p class="_2-N8zT">{rng.choice(PHRASES[stars])}</p></div>
+  <div class="t-ZTKy"><div><div class="_6K-7Co">{_review_text(rng, stars)}</div></div></div>
+  <div class="row _3n8db9"><p class="_2sc7ZR _2V5EHH">Customer {i}</p><p class="_2sc7ZR">{i // 30 + 1} months ago</p></div>
+</div></div>'''
+
+
+REVIEW_SITES = {'amazon': (_amazon_review, 10), 'flipkart': (_flipkart_review, 10)}
+
+
+SITES = {
+    'amazon': ('<div class="s-main-slot s-result-list s-search-results sg-row">', '</div>', _amazon_item, 48),
+    'flipkart': ('<div class="_1YokD2 _3Mn1Gg">', '</div>', _flipkart_item, 24),
+    'myntra': ('<ul class="results-base">', '</ul>', _myntra_item, 50),
+    'nykaa': ('<div id="product-list-wrap">', '</div>', _nykaa_item, 20),
+}
+
+
+def build_search_page(site: str, query: str, seed: int = 0) -> str:
+    open_tag, close_tag, make_item, count = SITES[site]
+    rng = random.Random(f'{site}:{query}:{seed}')
+    items = '\n'.join(make_item(rng, i) for i in range(1, count + 1))
+    return f'''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{query} - {site}</title>
+{_noise(rng, 20)}
+</head><body>
+<header>{_noise(rng, 5)}</header>
+<main>{_sidebar(rng)}
+{open_tag}
+{items}
+{close_tag}
+<section class="sponsored">{_noise(rng, 5)}</section>
+</main><footer>{_noise(rng, 5)}</footer></body></html>
+'''
+
+
+def build_review_page(site: str, product: str, page: int = 1) -> str:
+    make_review, count = REVIEW_SITES[site]
+    rng = random.Random(f'{site}:reviews:{product}:{page}')
+    first = (page - 1) * count + 1
+    numbers = range(first, first + count) if page <= REVIEW_PAGES else ()
+    reviews = '\n'.join(make_review(rng, i) for i in numbers)
+    return f'''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Reviews: {product}</title>
+{_noise(rng, 10)}
+</head><body>
+<div id="cm_cr-review_list">
+{reviews}
+</div>
+<footer>{_noise(rng, 3)}</footer></body></html>
+'''
+
+
+def _write(path, html):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print('Wrote', path)
+
+
+def main():
+    os.makedirs(SEARCH_DIR, exist_ok=True)
+    os.makedirs(REVIEWS_DIR, exist_ok=True)
+    for site in SITES:
+        for slug, query in QUERIES.items():
+            _write(os.path.join(SEARCH_DIR, f'{site}_{slug}.html'), build_search_page(site, query))
+    for site in REVIEW_SITES:
+        for product in PRODUCTS:
+            _write(os.path.join(REVIEWS_DIR, f'{site}_{product}.html'), build_review_page(site, product))
+
+
+if __name__ == '__main__':
+    main()
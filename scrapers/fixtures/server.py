@@ -0,0 +1,188 @@
+"""
+Local HTTP stand-in for the marketplaces, serving the recorded fixture pages.
+
+    /search/<site>?q=<query>    search/<site>_<query slug>.html, or the site's first page
+    /reviews/<site>/<product>   reviews/<site>_<product>.html; later pages (?page=N or
+                                ?pageNumber=N) are generated, empty after REVIEW_PAGES
+
+Pages carry an ETag and honour If-None-Match. Latency and failures can be
+injected to exercise timeouts, retries and partial results without touching
+the live sites:
+
+    with FixtureServer(latency=0.2, error_rate=0.1) as server:
+        adapter = server.adapter(AMAZON)   # same adapter, pointed at the server
+        adapter.search_sync('iPhone 15')
+
+Run standalone with `python -m scrapers.fixtures.server --port 8765`.
+"""
+import argparse
+import dataclasses
+import glob
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from scrapers.fixtures.build_fixtures import REVIEWS_DIR, SEARCH_DIR, build_review_page
+
+_SLUG = re.compile(r'[^a-z0-9]+')
+
+
+def slugify(text: str) -> str:
+    return _SLUG.sub('_', text.lower()).strip('_')
+
+
+def _load(directory: str) -> Dict[str, Dict[str, bytes]]:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        site, _, name = os.path.basename(path)[:-len('.html')].partition('_')
+        with open(path, 'rb') as f:
+            pages.setdefault(site, {})[name] = f.read()
+    return pages
+
+
+class FixtureServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, fail_sites: Iterable[str] = (),
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency: seconds to wait before every response
+            jitter: extra uniform random delay of up to this many seconds
+            error_rate: fraction of requests answered with error_status instead of a page
+            fail_sites: sites whose every request fails with error_status
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_sites = set(fail_sites)
+        self.search_pages = _load(SEARCH_DIR)
+        self.review_pages = _load(REVIEWS_DIR)
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def search_url(self, site: str) -> str:
+        return f'{self.base_url}/search/{site}?q={{query}}'
+
+    def review_url(self, site: str, product: str) -> str:
+        return f'{self.base_url}/reviews/{site}/{product}'
+
+    def adapter(self, adapter):
+        """Copy of a SiteAdapter whose searches hit this server."""
+        return dataclasses.replace(adapter, search_url=self.search_url(adapter.name))
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _page(self, path: str, query: Dict[str, list]) -> Optional[bytes]:
+        parts = path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'search':
+            pages = self.search_pages.get(parts[1], {})
+            slug = slugify(query.get('q', [''])[0])
+            return pages.get(slug) or next(iter(pages.values()), None)
+        if len(parts) == 3 and parts[0] == 'reviews':
+            recorded = self.review_pages.get(parts[1], {}).get(parts[2])
+            page = int((query.get('page') or query.get('pageNumber') or ['1'])[0])
+            if recorded is None or page == 1:
+                return recorded
+            return build_review_page(parts[1], parts[2], page).encode('utf-8')
+        return None
+
+    def _should_fail(self, path: str) -> bool:
+        parts = path.strip('/').split('/')
+        if len(parts) > 1 and parts[1] in self.fail_sites:
+            return True
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                url = urlparse(self.path)
+                delay = server._delay()
+                if delay:
+                    time.sleep(delay)
+                if server._should_fail(url.path):
+                    self._send(server.error_status, b'injected failure')
+                    return
+                body = server._page(url.path, parse_qs(url.query))
+                if body is None:
+                    self._send(404, b'no fixture')
+                    return
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b'', etag=etag)
+                else:
+                    self._send(200, body, 'text/html; charset=utf-8', etag=etag)
+
+            def _send(self, status, body, content_type='text/plain', etag=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the scraper fixture pages locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+    server = FixtureServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, error_status=args.error_status)
+    print('Serving fixtures on', server.base_url)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Shared keep-alive HTTP client for the scrapers.
+
+One httpx.AsyncClient is kept per event loop, so every marketplace request made
+from a worker reuses the same pooled connections. Synchronous callers (Celery
+tasks, scripts) run their coroutines on a single background loop so the pool
+survives between calls instead of being rebuilt by every asyncio.run().
+
+fetch_if_changed(url) is for periodic re-scrapes: it returns None when the page
+is unchanged since its validators were last stored (see validators).
+"""
+import asyncio
+import threading
+import weakref
+from typing import Dict, NamedTuple, Optional
+
+import httpx
+
+from scrapers import config
+from scrapers import validators
+from scrapers.scheduler import scheduler
+
+_clients = weakref.WeakKeyDictionary()
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _new_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=config.MAX_CONNECTIONS,
+        max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        headers={'User-Agent': config.USER_AGENT},
+        limits=limits,
+        timeout=config.SCRAPER_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = _new_client()
+    return client
+
+
+class ChangedPage(NamedTuple):
+    text: str
+    validators: Dict[str, str]  # store with validators.store.set() once the page is persisted
+
+
+async def fetch_page(url: str) -> str:
+    client = get_client()
+    # Rate limited, retried and circuit-broken per host, see scheduler.py
+    resp = await scheduler.request(url, lambda: client.get(url))
+    return resp.text
+
+
+async def fetch_if_changed(url: str) -> Optional[ChangedPage]:
+    """
+    Conditional fetch: None when the page is unchanged, else the page and its new validators.
+
+    The validators are not stored here. The caller stores them only after it has
+    persisted what it parsed from the page, so a failed parse or DB write means
+    the page is fetched and processed again on the next run. Error responses
+    raise httpx.HTTPStatusError.
+    """
+    client = get_client()
+    stored = await validators.store.get(url)
+    headers = validators.request_headers(stored)
+    resp = await scheduler.request(url, lambda: client.get(url, headers=headers))
+    if resp.status_code == 304:
+        return None
+    resp.raise_for_status()
+    digest = validators.content_digest(resp.content)
+    # Servers without validators still get caught by the body hash
+    if digest == stored.get('digest'):
+        return None
+    return ChangedPage(resp.text, {
+        'etag': resp.headers.get('ETag'),
+        'last_modified': resp.headers.get('Last-Modified'),
+        'digest': digest,
+    })
+
+
+async def fetch_text(url: str) -> str:
+    return await fetch_page(url)
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='scraper-io', daemon=True).start()
+    return _loop
+
+
+def run_sync(coro):
+    """Run a scraper coroutine on the shared loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+async def aclose():
+    """Close the client bound to the running loop (e.g. on app shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
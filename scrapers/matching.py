@@ -0,0 +1,198 @@
+"""
+Cross-platform product title matching.
+
+normalize.match_titles() compares one pair of titles; comparing every Amazon
+result with every Flipkart result that way is N*M Python calls. TitleIndex
+instead puts each title into a few blocks keyed on its brand (first token) and
+model-like tokens (anything with a digit: "s24", "15"; quantities such as
+"256 GB" or "500ml" are variants, not models, and are left out), or brand and
+second token for titles without one:
+
+    "Samsung Galaxy S24 Ultra (256 GB)" -> samsung|s24, samsung|24
+
+Only titles sharing a block are scored, each block in one
+rapidfuzz.process.cdist call across all cores, and pairs scoring above the
+threshold are joined into clusters:
+
+    index = TitleIndex()
+    index.add_all(amazon_titles, source='Amazon')
+    index.add_all(flipkart_titles, source='Flipkart')
+    for cluster in index.clusters(cross_source=True):
+        cluster.members, cluster.score
+
+Scores use the same normalization and scorer as match_titles(), so a pair
+matches here exactly when match_titles() would say so, provided the two
+titles share a block. Blocks larger than max_block (a very common brand with
+no model token) are too unselective to be worth scoring and are skipped.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from scrapers.normalize import canonical_query, normalize_title
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_DIGIT = re.compile(r'\d')
+_UNITS = {'gb', 'tb', 'mb', 'mah', 'ml', 'l', 'g', 'kg', 'mm', 'cm', 'm', 'inch', 'in', 'w', 'hz', 'mp', 'pcs'}
+_QUANTITY = re.compile(r'\d+(?:%s)' % '|'.join(sorted(_UNITS, key=len, reverse=True)))
+
+
+def _is_quantity(tokens: List[str], i: int) -> bool:
+    token = tokens[i]
+    if token.isdigit():
+        return i + 1 < len(tokens) and tokens[i + 1] in _UNITS
+    return _QUANTITY.fullmatch(token) is not None
+
+
+def blocking_keys(title: str) -> Set[str]:
+    """Blocking keys of a title: brand|model-token, or brand|second-token without one."""
+    tokens = _TOKEN.findall(canonical_query(title))
+    if not tokens:
+        return set()
+    brand = tokens[0]
+    keys = set()
+    for i, token in enumerate(tokens[1:], 1):
+        if _DIGIT.search(token) and not _is_quantity(tokens, i):
+            keys.add(f'{brand}|{token}')
+            digits = ''.join(c for c in token if c.isdigit())
+            if digits != token:
+                # "S24" vs "S 24": also block on the bare number
+                keys.add(f'{brand}|{digits}')
+    if not keys:
+        keys.add(f'{brand}|{tokens[1]}' if len(tokens) > 1 else brand)
+    return keys
+
+
+@dataclass
+class MatchCluster:
+    members: List[int]                    # ids returned by TitleIndex.add(), ascending
+    score: float                          # mean score of the pairs that linked the cluster
+    pairs: List[Tuple[int, int, float]] = field(default_factory=list)  # (id, id, score)
+
+
+class TitleIndex:
+    def __init__(self, threshold: float = 80, max_block: int = 1000, workers: int = -1):
+        """
+        Args:
+            threshold: pairs must score above this (fuzz.ratio, 0-100) to match
+            max_block: blocks with more titles than this are not scored
+            workers: cores used by cdist, -1 for all
+        """
+        self.threshold = threshold
+        self.max_block = max_block
+        self.workers = workers
+        self.titles: List[str] = []
+        self.sources: List[Optional[str]] = []
+        self._normalized: List[str] = []
+        self._blocks: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, title: str, source: Optional[str] = None) -> int:
+        """Index a title and return its id."""
+        id_ = len(self.titles)
+        self.titles.append(title)
+        self.sources.append(source)
+        self._normalized.append(normalize_title(title))
+        for key in blocking_keys(title):
+            self._blocks[key].append(id_)
+        return id_
+
+    def add_all(self, titles: Iterable[str], source: Optional[str] = None) -> List[int]:
+        return [self.add(title, source) for title in titles]
+
+    def candidates(self, title: str) -> Set[int]:
+        """Ids sharing a block with title."""
+        ids = set()
+        for key in blocking_keys(title):
+            block = self._blocks.get(key, ())
+            if len(block) <= self.max_block:
+                ids.update(block)
+        return ids
+
+    def query(self, title: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(id, score) of indexed titles matching title, best first."""
+        ids = sorted(self.candidates(title))
+        if not ids:
+            return []
+        scores = process.cdist([normalize_title(title)], [self._normalized[i] for i in ids],
+                               scorer=fuzz.ratio, score_cutoff=self.threshold, workers=self.workers)[0]
+        matches = sorted(((ids[j], round(float(scores[j]), 2)) for j in np.flatnonzero(scores > self.threshold)),
+                         key=lambda m: -m[1])
+        return matches[:limit] if limit else matches
+
+    def pairs(self, cross_source: bool = False) -> Dict[Tuple[int, int], float]:
+        """Every matching pair (lower id first) -> score, scored block by block."""
+        matched = {}
+        for block in self._blocks.values():
+            if len(block) < 2 or len(block) > self.max_block:
+                continue
+            ids = np.asarray(block)
+            scores = process.cdist([self._normalized[i] for i in block], [self._normalized[i] for i in block],
+                                   scorer=fuzz.ratio, score_cutoff=self.threshold, workers=self.workers)
+            rows, cols = np.nonzero(np.triu(scores > self.threshold, k=1))
+            for a, b, score in zip(ids[rows].tolist(), ids[cols].tolist(), scores[rows, cols].tolist()):
+                if cross_source and self.sources[a] == self.sources[b]:
+                    continue
+                matched[(a, b)] = round(score, 2)
+        return matched
+
+    def clusters(self, cross_source: bool = False, singletons: bool = False) -> List[MatchCluster]:
+        """
+        Connected groups of matching titles.
+
+        Args:
+            cross_source: only link titles from different sources
+            singletons: also return titles that matched nothing, as one-member clusters
+        """
+        parent = list(range(len(self.titles)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        pairs = self.pairs(cross_source)
+        for a, b in pairs:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        groups: Dict[int, MatchCluster] = {}
+        for i in range(len(self.titles)):
+            root = find(i)
+            if root not in groups:
+                groups[root] = MatchCluster([], 100.0)
+            groups[root].members.append(i)
+        for (a, b), score in sorted(pairs.items()):
+            groups[find(a)].pairs.append((a, b, score))
+        for cluster in groups.values():
+            if cluster.pairs:
+                cluster.score = sum(p[2] for p in cluster.pairs) / len(cluster.pairs)
+        return [c for c in groups.values() if singletons or len(c.members) > 1]
+
+
+def match_offers(results: Dict[str, List[Dict]], threshold: float = 80) -> List[List[Dict]]:
+    """
+    Group search_all() results across sites into same-product offer lists.
+
+    Args:
+        results: site -> offers, as returned by engine.search_all()
+        threshold: minimum match score
+
+    Returns:
+        One list of offers per product found on at least two sites, most offers first.
+    """
+    index = TitleIndex(threshold)
+    offers = []
+    for site, site_offers in results.items():
+        for offer in site_offers or ():
+            index.add(offer['product_title'], site)
+            offers.append(offer)
+    groups = [[offers[i] for i in c.members] for c in index.clusters(cross_source=True)]
+    return sorted(groups, key=len, reverse=True)
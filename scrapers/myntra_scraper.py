@@ -0,0 +1,38 @@
+from typing import List, Dict, Optional
+
+from scrapers.adapters import SiteAdapter, default_parse_item, register
+
+def _parse_myntra_item(adapter: SiteAdapter, values: Dict[str, Optional[str]]) -> Optional[Dict]:
+    # Myntra splits the title into brand and product name
+    if values.get('brand') and values.get('title'):
+        values = dict(values, title=f"{values['brand'].strip()} {values['title'].strip()}")
+    # Undiscounted items only carry a plain price
+    if not values.get('price'):
+        values = dict(values, price=values.get('mrp'))
+    return default_parse_item(adapter, values)
+
+MYNTRA = register(SiteAdapter(
+    name='myntra',
+    site='Myntra',
+    search_url='https://www.myntra.com/{query}?rawQuery={query}',
+    base_url='https://www.myntra.com/',
+    container_selector='ul.results-base',
+    item_selector='li.product-base',
+    fields={
+        'brand': 'h3.product-brand',
+        'title': 'h4.product-product',
+        'price': 'span.product-discountedPrice',
+        'mrp': 'div.product-price span',
+        'link': 'a@href',
+    },
+    parse_item=_parse_myntra_item,
+))
+
+def parse_myntra(html: str) -> List[Dict]:
+    return MYNTRA.parse(html)
+
+async def search_myntra_async(query: str) -> List[Dict]:
+    return await MYNTRA.search(query)
+
+def search_myntra(query: str) -> List[Dict]:
+    return MYNTRA.search_sync(query)
@@ -1,11 +1,23 @@
+import re
+import unicodedata
+
 from rapidfuzz import fuzz
 
+from scrapers.prices import load_fx_table
+
+_QUERY_SEPARATORS = re.compile(r'[\s\-_]+')
+
 def normalize_title(title: str) -> str:
     return title.lower().replace(' ', '').replace('-', '').replace('_', '')
 
+def canonical_query(query: str) -> str:
+    # Like normalize_title, but keeps word boundaries: "IPHONE  15" -> "iphone 15"
+    query = unicodedata.normalize('NFKC', query).casefold()
+    return _QUERY_SEPARATORS.sub(' ', query).strip()
+
 def match_titles(title1: str, title2: str) -> bool:
     return fuzz.ratio(normalize_title(title1), normalize_title(title2)) > 80
 
 def normalize_price(price: float, currency: str, to_currency: str = 'INR') -> float:
-    # For demo, assume 1:1 conversion
-    return price
+    # One price; convert whole columns with prices.FxTable.convert instead
+    return load_fx_table().convert(price, currency, to_currency)
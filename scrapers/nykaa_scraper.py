@@ -0,0 +1,26 @@
+from typing import List, Dict
+
+from scrapers.adapters import SiteAdapter, register
+
+NYKAA = register(SiteAdapter(
+    name='nykaa',
+    site='Nykaa',
+    search_url='https://www.nykaa.com/search/result/?q={query}',
+    base_url='https://www.nykaa.com',
+    container_selector='div#product-list-wrap',
+    item_selector='div.productWrapper',
+    fields={
+        'title': 'div.css-xrzmfa',
+        'price': 'span.css-111z9ua',
+        'link': 'a.css-qlopj4@href',
+    },
+))
+
+def parse_nykaa(html: str) -> List[Dict]:
+    return NYKAA.parse(html)
+
+async def search_nykaa_async(query: str) -> List[Dict]:
+    return await NYKAA.search(query)
+
+def search_nykaa(query: str) -> List[Dict]:
+    return NYKAA.search_sync(query)
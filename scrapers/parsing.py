@@ -0,0 +1,178 @@
+"""
+HTML parsing backends for the scrapers.
+
+Adapters hand their selectors to a backend once and get back a compiled
+ItemParser, which turns a result page into one {field: value} dict per item.
+Three backends are available, fastest first:
+
+    selectolax  lexbor C parser
+    lxml        libxml2 parser with cssselect selectors compiled to XPath
+    bs4         BeautifulSoup 'html.parser', always available
+
+The default is the fastest one installed, or SCRAPER_PARSER if set. When an
+adapter declares a container selector, items are only looked up inside the
+result container (and bs4 only builds the tree for that container when the
+selector is a simple tag/class/id).
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from scrapers import config
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from cssselect import GenericTranslator
+except ImportError:
+    lxml = None
+
+# field name -> (css selector, attribute or None for text); an empty selector
+# ("@id") reads the item element itself
+FieldSpec = Dict[str, Tuple[str, Optional[str]]]
+Values = Dict[str, Optional[str]]
+
+
+def compile_fields(fields: Dict[str, str]) -> FieldSpec:
+    """Split "selector@attr" field specs into (selector, attr) pairs."""
+    compiled = {}
+    for name, spec in fields.items():
+        selector, _, attr = spec.partition('@')
+        compiled[name] = (selector.strip(), attr or None)
+    return compiled
+
+
+class ItemParser:
+    def __init__(self, item_selector: str, fields: FieldSpec, container_selector: Optional[str] = None):
+        self.item_selector = item_selector
+        self.fields = fields
+        self.container_selector = container_selector
+
+    def parse(self, html: str) -> List[Values]:
+        return list(self.iter_items(html))
+
+    def iter_items(self, html: str) -> Iterator[Values]:
+        raise NotImplementedError
+
+
+class SoupItemParser(ItemParser):
+    name = 'bs4'
+
+    _SIMPLE = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?:\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+))?$')
+
+    def __init__(self, item_selector, fields, container_selector=None):
+        super().__init__(item_selector, fields, container_selector)
+        self._strainer = self._strainer_for(container_selector) if container_selector else None
+
+    def _strainer_for(self, selector: str) -> Optional[SoupStrainer]:
+        match = self._SIMPLE.match(selector)
+        if not match or not any(match.groupdict().values()):
+            return None
+        attrs = {}
+        if match['cls']:
+            # parse_only sees the raw, unsplit class attribute
+            attrs['class'] = re.compile(r'(?:^|\s)%s(?:\s|$)' % re.escape(match['cls']))
+        if match['id']:
+            attrs['id'] = match['id']
+        return SoupStrainer(match['tag'] or True, attrs=attrs)
+
+    def iter_items(self, html):
+        soup = BeautifulSoup(html, 'html.parser', parse_only=self._strainer)
+        root = soup
+        if self.container_selector and self._strainer is None:
+            root = soup.select_one(self.container_selector) or soup
+        for item in root.select(self.item_selector):
+            values = {}
+            for name, (selector, attr) in self.fields.items():
+                node = item.select_one(selector) if selector else item
+                if node is None:
+                    values[name] = None
+                elif attr:
+                    values[name] = node.get(attr)
+                else:
+                    values[name] = node.text
+            yield values
+
+
+class LxmlItemParser(ItemParser):
+    name = 'lxml'
+
+    def __init__(self, item_selector, fields, container_selector=None):
+        super().__init__(item_selector, fields, container_selector)
+        translator = GenericTranslator()
+        # Selectors are translated to XPath once and reused for every page
+        self._container = (lxml.etree.XPath(translator.css_to_xpath(container_selector))
+                           if container_selector else None)
+        self._items = lxml.etree.XPath(translator.css_to_xpath(item_selector, prefix='descendant::'))
+        self._fields = {
+            name: (lxml.etree.XPath(translator.css_to_xpath(selector, prefix='descendant::')) if selector else None,
+                   attr)
+            for name, (selector, attr) in fields.items()
+        }
+
+    def iter_items(self, html):
+        if not html.strip():
+            return
+        root = lxml.html.fromstring(html)
+        if self._container is not None:
+            containers = self._container(root)
+            root = containers[0] if containers else root
+        for item in self._items(root):
+            values = {}
+            for name, (xpath, attr) in self._fields.items():
+                nodes = xpath(item) if xpath is not None else [item]
+                if not nodes:
+                    values[name] = None
+                elif attr:
+                    values[name] = nodes[0].get(attr)
+                else:
+                    values[name] = nodes[0].text_content()
+            yield values
+
+
+class SelectolaxItemParser(ItemParser):
+    name = 'selectolax'
+
+    def iter_items(self, html):
+        root = LexborHTMLParser(html).root
+        if root is None:
+            return
+        if self.container_selector:
+            root = root.css_first(self.container_selector) or root
+        fields = self.fields.items()
+        for item in root.css(self.item_selector):
+            values = {}
+            for name, (selector, attr) in fields:
+                node = item.css_first(selector) if selector else item
+                if node is None:
+                    values[name] = None
+                elif attr:
+                    values[name] = node.attributes.get(attr)
+                else:
+                    values[name] = node.text()
+            yield values
+
+
+BACKENDS = {'bs4': SoupItemParser}
+if lxml is not None:
+    BACKENDS['lxml'] = LxmlItemParser
+if LexborHTMLParser is not None:
+    BACKENDS['selectolax'] = SelectolaxItemParser
+
+_PREFERENCE = ('selectolax', 'lxml', 'bs4')
+
+
+def default_backend() -> str:
+    if config.PARSER in BACKENDS:
+        return config.PARSER
+    return next(name for name in _PREFERENCE if name in BACKENDS)
+
+
+def compile_parser(item_selector: str, fields: FieldSpec, container_selector: Optional[str] = None,
+                   backend: Optional[str] = None) -> ItemParser:
+    return BACKENDS[backend or default_backend()](item_selector, fields, container_selector)
@@ -0,0 +1,176 @@
+"""
+Price parsing and currency conversion, in bulk.
+
+parse_prices() turns a column of scraped price strings into NumPy arrays:
+
+    '₹1,299'                       -> price 1299
+    'Rs. 1,099.50'                 -> price 1099.5
+    '₹1,299 - ₹1,499'              -> price 1299, high 1499
+    '₹999 M.R.P.: ₹1,999'          -> price 999, mrp 1999
+    'M.R.P. ₹1,999'                -> price 1999, mrp 1999 (undiscounted)
+
+Unparseable strings give NaN. Each distinct string is parsed once, so pages
+repeating the same prices cost one regex match per distinct value.
+
+Exchange rates come from a versioned FX table file (JSON: version, base and
+units of base per unit of each currency), cached in memory and reloaded only
+when the file changes. convert() works on whole columns: currency codes are
+looked up with one vectorized binary search over the table's sorted codes,
+the rest is array arithmetic.
+
+    table = load_fx_table()
+    prices = table.convert(amounts, currencies, to='USD')
+"""
+import json
+import math
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from scrapers import config
+
+_AMOUNT = re.compile(r'(?P<mrp>m\.?\s*r\.?\s*p\.?\D{0,12}?)?(?P<amount>\d[\d,]*(?:\.\d+)?)', re.IGNORECASE)
+_RANGE = re.compile(r'^\s*(?:-|–|to)\s*\D{0,6}$', re.IGNORECASE)
+
+_SYMBOLS = (
+    ('INR', re.compile(r'₹|\brs\b\.?|\binr\b', re.IGNORECASE)),
+    ('USD', re.compile(r'\$|\busd\b', re.IGNORECASE)),
+    ('EUR', re.compile(r'€|\beur\b', re.IGNORECASE)),
+    ('GBP', re.compile(r'£|\bgbp\b', re.IGNORECASE)),
+)
+
+
+class ParsedPrices(NamedTuple):
+    price: np.ndarray   # selling price, the low end of a range
+    high: np.ndarray    # high end of a range, else equal to price
+    mrp: np.ndarray     # list price (M.R.P.) when given, else NaN
+
+
+def _parse_one(text: str):
+    price = high = mrp = math.nan
+    previous_end = None
+    for match in _AMOUNT.finditer(text):
+        amount = float(match.group('amount').replace(',', ''))
+        if match.group('mrp'):
+            if math.isnan(mrp):
+                mrp = amount
+        elif math.isnan(price):
+            price = high = amount
+        elif high == price and previous_end is not None and _RANGE.match(text[previous_end:match.start()]):
+            high = amount
+        previous_end = None if match.group('mrp') else match.end()
+    if math.isnan(price):
+        price = high = mrp
+    return price, high, mrp
+
+
+def parse_price(text: str) -> float:
+    """Selling price in one price string; raises ValueError if there is none."""
+    price = _parse_one(text)[0]
+    if math.isnan(price):
+        raise ValueError(f"no price in {text!r}")
+    return price
+
+
+def parse_prices(texts: Iterable[Optional[str]]) -> ParsedPrices:
+    """Parse a column of price strings (None allowed) into float arrays."""
+    texts = list(texts)
+    parsed = {text: _parse_one(text) for text in dict.fromkeys(texts) if text}
+    empty = (math.nan, math.nan, math.nan)
+    table = np.array([parsed.get(text, empty) if text else empty for text in texts], dtype=float).reshape(-1, 3)
+    return ParsedPrices(table[:, 0], table[:, 1], table[:, 2])
+
+
+def detect_currencies(texts: Iterable[Optional[str]], default: str = 'INR') -> np.ndarray:
+    """ISO code of the currency symbol in each price string, default where there is none."""
+    def detect(text):
+        for code, pattern in _SYMBOLS:
+            if pattern.search(text):
+                return code
+        return default
+
+    texts = list(texts)
+    detected = {text: detect(text) for text in dict.fromkeys(texts) if text}
+    return np.array([detected.get(text, default) if text else default for text in texts], dtype='<U3')
+
+
+class FxTable:
+    def __init__(self, rates: Dict[str, float], base: str = 'INR', version: str = ''):
+        """
+        Args:
+            rates: units of base per one unit of each currency ({'USD': 83.4, ...})
+            base: currency the rates are quoted in
+            version: identifies the rate snapshot, e.g. its date
+        """
+        self.base = base
+        self.version = version
+        self.rates = {code.upper(): float(rate) for code, rate in dict(rates, **{base: 1.0}).items()}
+        self._codes = np.array(sorted(self.rates), dtype='<U3')
+        self._rates = np.array([self.rates[code] for code in self._codes])
+
+    @classmethod
+    def from_file(cls, path: str) -> 'FxTable':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['rates'], data.get('base', 'INR'), str(data.get('version', '')))
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        try:
+            return self.rates[from_currency.upper()] / self.rates[to_currency.upper()]
+        except KeyError as e:
+            raise ValueError(f"No FX rate for {e.args[0]} in table {self.version!r}") from None
+
+    def convert(self, amounts: Union[float, Sequence[float], np.ndarray],
+                currencies: Union[str, Sequence[str], np.ndarray], to: str = 'INR') -> Union[float, np.ndarray]:
+        """
+        Convert amounts to the `to` currency.
+
+        Args:
+            amounts: one amount or a column of them
+            currencies: one currency code for all amounts, or a code per amount
+
+        Raises:
+            ValueError: a currency is missing from the table
+        """
+        if isinstance(currencies, str):
+            factor = self.rate(currencies, to)
+            if np.ndim(amounts) == 0:
+                return float(amounts) * factor
+            return np.asarray(amounts, dtype=float) * factor
+        currencies = np.asarray(currencies, dtype='<U3')
+        index = np.minimum(np.searchsorted(self._codes, currencies), len(self._codes) - 1)
+        unknown = self._codes[index] != currencies
+        if unknown.any():
+            # Lower-case codes are rare; upper-case only those before giving up
+            currencies = np.where(unknown, np.char.upper(currencies), currencies)
+            index = np.minimum(np.searchsorted(self._codes, currencies), len(self._codes) - 1)
+            unknown = self._codes[index] != currencies
+            if unknown.any():
+                raise ValueError(f"No FX rate for {', '.join(sorted(set(currencies[unknown].tolist())))} "
+                                 f"in table {self.version!r}")
+        return np.asarray(amounts, dtype=float) * (self._rates[index] * self.rate(self.base, to))
+
+
+_tables: Dict[str, tuple] = {}  # path -> (mtime_ns, FxTable)
+_lock = threading.Lock()
+
+
+def load_fx_table(path: Optional[str] = None) -> FxTable:
+    """FX table from path (default FX_RATES_PATH), re-read only when the file changes."""
+    path = path or config.FX_RATES_PATH
+    mtime = os.stat(path).st_mtime_ns
+    with _lock:
+        cached = _tables.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _tables[path] = (mtime, FxTable.from_file(path))
+        return cached[1]
+
+
+def convert_offers(offers: List[Dict], to: str = 'INR', table: Optional[FxTable] = None) -> np.ndarray:
+    """Prices of search result rows (see adapters.default_parse_item) in the `to` currency."""
+    table = table or load_fx_table()
+    amounts = np.fromiter((offer['price'] for offer in offers), dtype=float, count=len(offers))
+    return table.convert(amounts, [offer.get('currency') or table.base for offer in offers], to)
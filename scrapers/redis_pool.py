@@ -0,0 +1,58 @@
+"""
+Per-event-loop async Redis clients shared by the scraper modules.
+
+redis.asyncio connections belong to the loop that opened them, so like the
+HTTP client in http_pool one client is kept per loop and URL.
+
+Everything the scrapers keep in Redis has an in-process fallback. RedisCooldown
+is how each user skips Redis for a while after it fails, instead of paying a
+socket timeout on every call while it is down.
+"""
+import asyncio
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis(url: str):
+    import redis.asyncio as aioredis
+
+    per_loop = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = per_loop.get(url)
+    if client is None:
+        client = per_loop[url] = aioredis.from_url(url, socket_timeout=1.0)
+    return client
+
+
+class RedisCooldown:
+    """
+    Skip a failing Redis for retry_after seconds.
+
+        if cooldown.available():
+            try:
+                ...
+            except Exception as e:
+                cooldown.failed(e)
+    """
+
+    def __init__(self, what: str, fallback: str, retry_after: float = 30.0):
+        """
+        Args:
+            what: what is unavailable, for the log ("Redis cache")
+            fallback: what is done instead ("using the local tier only")
+        """
+        self.what = what
+        self.fallback = fallback
+        self.retry_after = retry_after
+        self._down_until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def failed(self, e: Exception):
+        logger.warning("%s unavailable (%s), %s for %.0fs", self.what, e, self.fallback, self.retry_after)
+        self._down_until = time.monotonic() + self.retry_after
@@ -0,0 +1,206 @@
+"""
+Canonical product resolver.
+
+Assigns each scraped offer to a canonical product (the products table's
+canonical_title / normalized_title), incrementally: an offer joins the best
+matching existing product, or starts a new one. Nothing is ever re-clustered,
+so a stream of offers is resolved in a single pass.
+
+Products are found the same way as in matching.TitleIndex: blocking keys on
+brand and model tokens select a handful of candidate titles, and the offer's
+normalized title is scored against them with fuzz.ratio. Every product keeps
+up to max_variants distinct titles it was listed under (one per site
+wording), and an exact normalized title is resolved with a dict lookup
+before any scoring, which is the common case on repeat scrapes.
+
+The index lives in memory and is snapshotted to disk (gzip JSON, written
+atomically), so a restarted worker resumes with the same product ids:
+
+    resolver = ProductResolver.load('resolver.json.gz')
+    for offer in offers:
+        offer['product_id'] = resolver.resolve(offer['product_title'])
+    resolver.save('resolver.json.gz')
+
+A resolver is not shared between processes; run resolution in one worker
+process (backend/tasks.py routes resolve_offers to a 'resolver' queue served
+with --concurrency=1).
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from rapidfuzz import fuzz, process
+
+from scrapers import config
+from scrapers.matching import blocking_keys
+from scrapers.normalize import normalize_title
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class CanonicalProduct:
+    id: str
+    canonical_title: str
+    normalized_title: str
+    brand: str
+    offers: int = 0
+    titles: List[str] = field(default_factory=list)  # distinct titles it was listed under
+
+
+class ProductResolver:
+    def __init__(self, threshold: float = 80, max_variants: int = 8, max_candidates: int = 2000):
+        """
+        Args:
+            threshold: an offer joins a product when its title scores above this against one of the product's titles
+            max_variants: distinct titles kept and matched against per product
+            max_candidates: blocks larger than this are not searched (too unselective)
+        """
+        self.threshold = threshold
+        self.max_variants = max_variants
+        self.max_candidates = max_candidates
+        self.products: Dict[str, CanonicalProduct] = {}
+        self.resolved = 0
+        self.created = 0
+        self._by_title: Dict[str, str] = {}          # normalized title -> product id
+        self._blocks: Dict[str, List[str]] = defaultdict(list)  # key -> normalized titles
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.products)
+
+    def resolve(self, title: str) -> str:
+        """Product id for an offer title, creating the product if nothing matches."""
+        normalized = normalize_title(title)
+        with self._lock:
+            self.resolved += 1
+            product_id = self._by_title.get(normalized)
+            if product_id is None:
+                keys = blocking_keys(title)
+                product_id = self._match(normalized, keys)
+                if product_id is None:
+                    product_id = self._create(title, normalized)
+                self._add_variant(self.products[product_id], title, normalized, keys)
+                self._dirty = True
+            self.products[product_id].offers += 1
+            return product_id
+
+    def resolve_many(self, titles: Iterable[str]) -> List[str]:
+        return [self.resolve(title) for title in titles]
+
+    def resolve_offers(self, offers: Iterable[Dict]) -> List[Dict]:
+        """Set 'product_id' on each scraped offer dict (see adapters.default_parse_item)."""
+        offers = list(offers)
+        for offer in offers:
+            offer['product_id'] = self.resolve(offer['product_title'])
+        return offers
+
+    def product(self, product_id: str) -> CanonicalProduct:
+        return self.products[product_id]
+
+    def _match(self, normalized: str, keys: Iterable[str]) -> Optional[str]:
+        candidates = set()
+        for key in keys:
+            block = self._blocks.get(key, ())
+            if len(block) <= self.max_candidates:
+                candidates.update(block)
+        if not candidates:
+            return None
+        best = process.extractOne(normalized, candidates, scorer=fuzz.ratio, score_cutoff=self.threshold)
+        if best is None or best[1] <= self.threshold:
+            return None
+        return self._by_title[best[0]]
+
+    def _create(self, title: str, normalized: str) -> str:
+        product_id = str(uuid.uuid4())
+        brand = title.split(None, 1)[0] if title.strip() else ''
+        self.products[product_id] = CanonicalProduct(product_id, title.strip(), normalized, brand)
+        self.created += 1
+        return product_id
+
+    def _add_variant(self, product: CanonicalProduct, title: str, normalized: str, keys: Iterable[str]):
+        self._by_title[normalized] = product.id
+        if len(product.titles) >= self.max_variants:
+            return  # still resolved by exact title, just not matched against
+        product.titles.append(title)
+        for key in keys:
+            self._blocks[key].append(normalized)
+
+    def stats(self) -> Dict[str, int]:
+        return {'products': len(self.products), 'titles': len(self._by_title),
+                'resolved': self.resolved, 'created': self.created}
+
+    # Snapshots
+
+    def save(self, path: str):
+        """Write the index to path atomically."""
+        with self._lock:
+            snapshot = {
+                'version': SNAPSHOT_VERSION,
+                'threshold': self.threshold,
+                'products': [[p.id, p.canonical_title, p.brand, p.offers, p.titles] for p in self.products.values()],
+                # exact titles beyond max_variants still resolve after a restart
+                'aliases': [[t, pid] for t, pid in self._by_title.items()],
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def maybe_save(self, path: str, interval: float) -> bool:
+        """Save if anything changed and the last save is more than interval seconds old."""
+        if not self._dirty or time.monotonic() - self._saved_at < interval:
+            return False
+        self.save(path)
+        return True
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'ProductResolver':
+        """Resolver restored from a snapshot, or an empty one if there is none yet."""
+        resolver = cls(**kwargs)
+        if not os.path.exists(path):
+            return resolver
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported resolver snapshot version {snapshot.get('version')} in {path}")
+        for product_id, canonical_title, brand, offers, titles in snapshot['products']:
+            product = CanonicalProduct(product_id, canonical_title, normalize_title(canonical_title), brand, offers)
+            resolver.products[product_id] = product
+            for title in titles:
+                resolver._add_variant(product, title, normalize_title(title), blocking_keys(title))
+        for normalized, product_id in snapshot['aliases']:
+            resolver._by_title.setdefault(normalized, product_id)
+        logger.info("Loaded %d canonical products from %s", len(resolver.products), path)
+        return resolver
+
+
+_resolver: Optional[ProductResolver] = None
+
+
+def get_resolver() -> ProductResolver:
+    """Process-wide resolver, loaded from RESOLVER_SNAPSHOT on first use."""
+    global _resolver
+    if _resolver is None:
+        _resolver = ProductResolver.load(config.RESOLVER_SNAPSHOT, threshold=config.RESOLVER_THRESHOLD)
+    return _resolver
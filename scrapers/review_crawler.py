@@ -0,0 +1,173 @@
+"""
+Paginated review crawler with streaming output.
+
+crawl_reviews() walks a product's review pages (newest first) over the shared
+HTTP pool, keeping at most `concurrency` pages in flight, and yields reviews one
+at a time in page order. Consumers such as the DB writer or the sentiment
+pipeline can start on the first page while later ones are still downloading,
+and memory stays bounded by the in-flight window rather than the review count.
+
+The crawl stops at the first empty page, after max_pages, or as soon as it
+reaches a review older than `since` or the `stop_at_id` watermark left by the
+previous run, which makes incremental refreshes cheap:
+
+    async for review in crawl_reviews(AMAZON_REVIEWS, url, stop_at_id=last_seen_id):
+        ...
+"""
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from scrapers.http_pool import fetch_text
+from scrapers.parsing import ItemParser, compile_fields, compile_parser
+
+_FIRST_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_AMAZON_DATE = re.compile(r'(\d{1,2} \w+ \d{4})$')
+_RELATIVE_DATE = re.compile(r'(\d+) (day|month|year)s? ago')
+_RELATIVE_DAYS = {'day': 1, 'month': 30, 'year': 365}
+
+
+def parse_amazon_date(text: str) -> Optional[datetime]:
+    # "Reviewed in India on 12 March 2024"
+    match = _AMAZON_DATE.search(text.strip())
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), '%d %B %Y')
+    except ValueError:
+        return None
+
+
+def parse_relative_date(text: str) -> Optional[datetime]:
+    # "3 months ago"; only as precise as the site's wording
+    match = _RELATIVE_DATE.search(text)
+    if not match:
+        return None
+    return datetime.utcnow() - timedelta(days=int(match.group(1)) * _RELATIVE_DAYS[match.group(2)])
+
+
+def _review_id(source: str, values: Dict[str, Optional[str]]) -> str:
+    if values.get('id'):
+        return values['id']
+    # Sites without review ids in their markup: author + text is stable across crawls
+    digest = hashlib.sha1(f"{values.get('author')}\0{values.get('text')}".encode()).hexdigest()
+    return f'{source.lower()}-{digest[:16]}'
+
+
+@dataclass(frozen=True)
+class ReviewAdapter:
+    source: str                 # stored in each review's 'source'
+    page_param: str             # query parameter selecting the review page
+    item_selector: str
+    fields: Dict[str, str]      # text, rating, and optionally id, author, date
+    parse_date: Callable[[str], Optional[datetime]]
+    extra_params: Dict[str, str] = field(default_factory=dict)  # e.g. newest-first sorting
+    container_selector: Optional[str] = None
+    _parsers: Dict[str, ItemParser] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def page_url(self, product_url: str, page: int) -> str:
+        parts = urlsplit(product_url)
+        params = dict(parse_qsl(parts.query))
+        params.update(self.extra_params)
+        params[self.page_param] = str(page)
+        return urlunsplit(parts._replace(query=urlencode(params)))
+
+    def parser(self, backend: Optional[str] = None) -> ItemParser:
+        key = backend or ''
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = self._parsers[key] = compile_parser(
+                self.item_selector, compile_fields(self.fields), self.container_selector, backend)
+        return parser
+
+    def parse(self, html: str, backend: Optional[str] = None) -> List[Dict]:
+        reviews = []
+        for values in self.parser(backend).iter_items(html):
+            text, rating = values.get('text'), values.get('rating')
+            match = _FIRST_NUMBER.search(rating or '')
+            if not (text and match):
+                continue
+            reviews.append({
+                'review_id': _review_id(self.source, values),
+                'source': self.source,
+                'text': text.strip(),
+                'rating': float(match.group()),
+                'timestamp': self.parse_date(values['date']) if values.get('date') else None
+            })
+        return reviews
+
+
+AMAZON_REVIEWS = ReviewAdapter(
+    source='Amazon',
+    page_param='pageNumber',
+    extra_params={'sortBy': 'recent'},
+    item_selector='.review',
+    fields={
+        'id': '@id',
+        'text': '.review-text',
+        'rating': '.review-rating',
+        'date': '.review-date',
+    },
+    parse_date=parse_amazon_date,
+)
+
+FLIPKART_REVIEWS = ReviewAdapter(
+    source='Flipkart',
+    page_param='page',
+    extra_params={'sortOrder': 'MOST_RECENT'},
+    item_selector='._16PBlm',
+    fields={
+        'text': '._6K-7Co',
+        'rating': '._3LWZlK',
+        'author': '._2sc7ZR._2V5EHH',
+        'date': '._2sc7ZR:not(._2V5EHH)',
+    },
+    parse_date=parse_relative_date,
+)
+
+
+async def crawl_reviews(adapter: ReviewAdapter, product_url: str, max_pages: Optional[int] = None,
+                        concurrency: int = 4, since: Optional[datetime] = None,
+                        stop_at_id: Optional[str] = None) -> AsyncIterator[Dict]:
+    """
+    Yield a product's reviews, newest first, page by page.
+
+    Args:
+        adapter: the site's ReviewAdapter
+        product_url: review page URL of the product (page 1)
+        max_pages: stop after this many pages
+        concurrency: review pages fetched ahead of the consumer
+        since: stop at the first review older than this
+        stop_at_id: stop at this review id (the newest one seen on the last crawl)
+    """
+    pending = []
+    next_page = 1
+
+    def schedule():
+        nonlocal next_page
+        while len(pending) < concurrency and (max_pages is None or next_page <= max_pages):
+            url = adapter.page_url(product_url, next_page)
+            pending.append(asyncio.ensure_future(fetch_text(url)))
+            next_page += 1
+
+    try:
+        schedule()
+        while pending:
+            html = await pending.pop(0)
+            reviews = adapter.parse(html)
+            if not reviews:
+                return
+            for review in reviews:
+                if stop_at_id is not None and review['review_id'] == stop_at_id:
+                    return
+                if since is not None and review['timestamp'] is not None and review['timestamp'] < since:
+                    return
+                yield review
+            schedule()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,37 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
 from typing import List, Dict
 
+from scrapers.http_pool import run_sync
+from scrapers.review_crawler import AMAZON_REVIEWS, FLIPKART_REVIEWS, ReviewAdapter, crawl_reviews
+
+# First-page helpers kept for existing callers; use review_crawler.crawl_reviews
+# to stream every page.
+
+def parse_reviews_amazon(html: str) -> List[Dict]:
+    return AMAZON_REVIEWS.parse(html)
+
+def parse_reviews_flipkart(html: str) -> List[Dict]:
+    return FLIPKART_REVIEWS.parse(html)
+
+async def _first_page(adapter: ReviewAdapter, product_url: str) -> List[Dict]:
+    return [review async for review in crawl_reviews(adapter, product_url, max_pages=1)]
+
 def scrape_reviews_amazon(product_url: str) -> List[Dict]:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(product_url, headers=headers)
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    reviews = []
-    for item in soup.select('.review'):  # Simplified selector
-        text = item.select_one('.review-text')
-        rating = item.select_one('.review-rating')
-        if text and rating:
-            reviews.append({
-                'source': 'Amazon',
-                'text': text.text.strip(),
-                'rating': float(rating.text[0]),
-                'timestamp': None
-            })
-    return reviews
+    return run_sync(_first_page(AMAZON_REVIEWS, product_url))
 
 def scrape_reviews_flipkart(product_url: str) -> List[Dict]:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(product_url, headers=headers)
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    reviews = []
-    for item in soup.select('._16PBlm'):
-        text = item.select_one('._6K-7Co')
-        rating = item.select_one('._3LWZlK')
-        if text and rating:
-            reviews.append({
-                'source': 'Flipkart',
-                'text': text.text.strip(),
-                'rating': float(rating.text),
-                'timestamp': None
-            })
-    return reviews
+    return run_sync(_first_page(FLIPKART_REVIEWS, product_url))
@@ -0,0 +1,276 @@
+"""
+Per-host politeness scheduler for scraper requests.
+
+Every request made through http_pool passes through HostScheduler.request():
+
+- a token bucket per host limits the request rate (1 / REQUEST_DELAY per second,
+  with a small burst). With Redis available the bucket lives there, so all
+  Celery workers share one budget per host; otherwise each process keeps its own.
+- 429/503 responses and transport errors are retried with exponential backoff
+  and full jitter, honouring Retry-After. Throttling also halves the host's rate,
+  which then creeps back up as requests succeed.
+- a circuit breaker per host opens after repeated failures and fails requests
+  fast with CircuitOpenError until a cool-down has passed, then lets one probe
+  request through.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from scrapers import config
+from scrapers.redis_pool import RedisCooldown, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host}, retry in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """In-process token bucket. take() returns 0 when a token was taken, else the wait."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, rate: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / rate
+
+
+# Same algorithm as TokenBucket, run atomically inside Redis on the server clock
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBuckets:
+    """Token buckets shared by every worker through Redis, one key per host."""
+
+    def __init__(self, url: str, capacity: float, retry_after: float = 30.0):
+        self.url = url
+        self.capacity = capacity
+        self.cooldown = RedisCooldown('Shared rate limiting', 'using local buckets', retry_after)
+        self._scripts = weakref.WeakKeyDictionary()
+
+    def _script(self):
+        client = get_async_redis(self.url)
+        script = self._scripts.get(client)
+        if script is None:
+            script = self._scripts[client] = client.register_script(_TAKE_SCRIPT)
+        return script
+
+    async def take(self, host: str, rate: float) -> Optional[float]:
+        """Wait time for host, or None when Redis is unreachable."""
+        if not self.cooldown.available():
+            return None
+        try:
+            take = self._script()
+            return float(await take(keys=[f'scraper:bucket:{host}'], args=[rate, self.capacity]))
+        except Exception as e:
+            self.cooldown.failed(e)
+            return None
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> float:
+        """0 if a request may go out, else seconds until the circuit half-opens."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return 0.0
+            now = time.monotonic()
+            # One probe at a time; a probe that never reported back (cancelled) is replaced
+            if state == 'half-open' and (self._probe_started is None
+                                         or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return 0.0
+            return max(self.reset_timeout - (now - self.opened_at), 1.0)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe_started is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+
+class HostScheduler:
+    def __init__(self, rate: float, burst: float = 2, max_retries: int = 3, backoff_base: float = 1.0,
+                 backoff_cap: float = 30.0, breaker_threshold: int = 5, breaker_reset: float = 60.0,
+                 redis_url: Optional[str] = None, unthrottled_hosts: Iterable[str] = ()):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.shared = RedisTokenBuckets(redis_url, burst) if redis_url else None
+        self.unthrottled_hosts = set(unthrottled_hosts)
+        self.rates: Dict[str, float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers.setdefault(host, CircuitBreaker(self.breaker_threshold, self.breaker_reset))
+        return breaker
+
+    async def acquire(self, host: str):
+        """Wait until host's token bucket allows another request."""
+        if self.max_rate == float('inf'):
+            return
+        while True:
+            rate = self.rates.get(host, self.max_rate)
+            wait = await self.shared.take(host, rate) if self.shared else None
+            if wait is None:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = self._buckets.setdefault(host, TokenBucket(self.burst))
+                wait = bucket.take(rate)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _throttled(self, host: str):
+        self.rates[host] = max(self.min_rate, self.rates.get(host, self.max_rate) / 2)
+
+    def _succeeded(self, host: str):
+        rate = self.rates.get(host)
+        if rate is not None:
+            rate += self.max_rate / 10
+            if rate >= self.max_rate:
+                del self.rates[host]
+            else:
+                self.rates[host] = rate
+
+    async def request(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request politely.
+
+        Args:
+            url: request URL, used to pick the host's bucket and breaker
+            send: coroutine factory performing the actual request
+
+        Returns:
+            The response; after the last retry this may still be a 429/503.
+
+        Raises:
+            CircuitOpenError: the host's circuit is open
+            httpx.TransportError: the last attempt failed to connect
+        """
+        parts = urlsplit(url)
+        host = parts.netloc
+        throttled = parts.hostname not in self.unthrottled_hosts
+        breaker = self.breaker(host)
+        for attempt in range(self.max_retries + 1):
+            retry_in = breaker.allow()
+            if retry_in:
+                raise CircuitOpenError(host, retry_in)
+            if throttled:
+                await self.acquire(host)
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                logger.info("%s request failed (%s), retry %d", host, e, attempt + 1)
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES:
+                breaker.record_failure()
+                self._throttled(host)
+                if attempt == self.max_retries:
+                    return response
+                delay = self.backoff(attempt, response)
+                logger.info("%s answered %d, retry %d in %.1fs", host, response.status_code, attempt + 1, delay)
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            self._succeeded(host)
+            return response
+
+
+scheduler = HostScheduler(
+    rate=1.0 / config.REQUEST_DELAY if config.REQUEST_DELAY > 0 else float('inf'),
+    burst=config.REQUEST_BURST,
+    max_retries=config.MAX_RETRIES,
+    backoff_base=config.BACKOFF_BASE,
+    backoff_cap=config.BACKOFF_CAP,
+    breaker_threshold=config.BREAKER_THRESHOLD,
+    breaker_reset=config.BREAKER_RESET,
+    redis_url=config.REDIS_URL if config.SHARED_BUDGETS else None,
+    unthrottled_hosts=config.UNTHROTTLED_HOSTS,
+)
@@ -0,0 +1,181 @@
+"""
+Request coalescing for cache misses.
+
+When a popular query is not cached, only one caller should scrape it:
+
+- within a worker, SingleFlight shares one in-flight computation per key among
+  all concurrent callers on the same event loop (blocking callers all run on
+  the shared loop in http_pool, so they coalesce too);
+- across workers, RedisLease grants a short lease per key. Whoever holds it
+  computes and fills the cache, the others poll the cache until the value
+  lands, the lease expires, or wait_timeout passes (then they compute
+  themselves rather than fail).
+
+    value = await cached_call(search_cache, query, lambda: search_all(query))
+
+cached_call() also implements stale-while-revalidate: a stale hit is returned
+at once and one background refresh per key (per worker, and across workers
+while the refresh lease is held) recomputes it.
+
+compute() can return CacheFor(value, ttl) to cache a value it knows is
+incomplete for less time (or not at all, ttl=0). A background refresh that
+returns one keeps the stale entry instead.
+"""
+import asyncio
+import logging
+import time
+import uuid
+import weakref
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from scrapers import config
+from scrapers.redis_pool import RedisCooldown, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class CacheFor(NamedTuple):
+    value: Any
+    ttl: int  # seconds; 0 to return the value without caching it
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key within one event loop."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = weakref.WeakKeyDictionary()  # loop -> {key: task}
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """The in-flight task for key, starting fn() if there is none."""
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is None:
+            # A task of its own, so a cancelled first caller doesn't cancel the others
+            task = calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: calls.pop(key, None) if calls.get(key) is t else None)
+        else:
+            self.coalesced += 1
+        return task
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await asyncio.shield(self.start(key, fn))
+
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """Per-key leases in Redis; acquire() returns a token, '' when Redis is down, or None if taken."""
+
+    def __init__(self, url: Optional[str], lease_ms: int = 30000, retry_after: float = 30.0):
+        self.url = url
+        self.lease_ms = lease_ms
+        self.cooldown = RedisCooldown('Redis leases', 'coalescing per worker only', retry_after)
+
+    def _redis(self):
+        if self.url and self.cooldown.available():
+            return get_async_redis(self.url)
+        return None
+
+    async def acquire(self, key: str) -> Optional[str]:
+        redis = self._redis()
+        if redis is None:
+            return ''
+        token = uuid.uuid4().hex
+        try:
+            acquired = await redis.set(f'lease:{key}', token, nx=True, px=self.lease_ms)
+        except Exception as e:
+            self.cooldown.failed(e)
+            return ''
+        return token if acquired else None
+
+    async def release(self, key: str, token: str):
+        redis = self._redis()
+        if not token or redis is None:
+            return
+        try:
+            await redis.eval(_RELEASE_SCRIPT, 1, f'lease:{key}', token)
+        except Exception as e:
+            self.cooldown.failed(e)
+
+
+flight = SingleFlight()
+lease = RedisLease(config.REDIS_URL, lease_ms=config.SINGLEFLIGHT_LEASE_MS)
+
+
+async def _compute_once(cache, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[int]) -> Any:
+    full_key = cache.key(key)
+    deadline = time.monotonic() + config.SINGLEFLIGHT_WAIT
+    token = None
+    while True:
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+        token = await lease.acquire(full_key)
+        if token is not None:
+            break
+        if time.monotonic() >= deadline:
+            logger.warning("Gave up waiting for another worker to compute %s", full_key)
+            break
+        await asyncio.sleep(config.SINGLEFLIGHT_POLL)
+    try:
+        value = await compute()
+        if isinstance(value, CacheFor):
+            value, ttl = value
+            if ttl <= 0:
+                return value
+        await cache.aset(key, value, ttl)
+        return value
+    finally:
+        if token:
+            await lease.release(full_key, token)
+
+
+async def _refresh(cache, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[int]):
+    full_key = 'refresh:' + cache.key(key)
+    token = await lease.acquire(full_key)
+    if token is None:
+        return  # another worker is already refreshing it
+    try:
+        if cache.remote.url:
+            # The stale copy may only be local: another worker can have refreshed
+            # the entry and released the lease since, so check the shared tier first
+            cache.local.delete(cache.key(key))
+            value, stale = await cache.alookup(key)
+            if value is not None and not stale:
+                return
+        value = await compute()
+        if isinstance(value, CacheFor):
+            logger.info("Background refresh of %s was incomplete, keeping the stale entry", cache.key(key))
+            return
+        await cache.aset(key, value, ttl)
+    except Exception as e:
+        logger.warning("Background refresh of %s failed: %s", cache.key(key), e)
+    finally:
+        await lease.release(full_key, token)
+
+
+async def cached_call(cache, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[int] = None) -> Any:
+    """
+    Return cache[key], computing it at most once across concurrent callers.
+
+    A stale entry is returned as is and refreshed in the background.
+
+    Args:
+        cache: a cache.TwoTierCache
+        key: cache key (unversioned)
+        compute: coroutine factory producing the value (or a CacheFor) on a miss
+        ttl: cache TTL for the computed value, defaults to the cache's
+    """
+    value, stale = await cache.alookup(key)
+    if value is not None:
+        if stale:
+            flight.start('refresh:' + cache.key(key), lambda: _refresh(cache, key, compute, ttl))
+        return value
+    return await flight.do(cache.key(key), lambda: _compute_once(cache, key, compute, ttl))
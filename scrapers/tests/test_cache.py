@@ -0,0 +1,64 @@
+import time
+
+from scrapers import cache as cache_module
+from scrapers.cache import MISSING, LocalTier, RedisTier, TwoTierCache, cache_search, search_key
+
+def _cache(**local):
+    local = dict(dict(max_entries=100, max_bytes=10000), **local)
+    return TwoTierCache('search', 1, ttl=60, local=LocalTier(**local), remote=RedisTier(None), local_ttl=60)
+
+def test_local_tier_serves_hits():
+    cache = _cache()
+    assert cache.get('iphone') is None
+    cache.set('iphone', {'offers': [1, 2]})
+    assert cache.get('iphone') == {'offers': [1, 2]}
+    stats = cache.stats()['local']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+def test_local_tier_evicts_least_recently_used_by_count_and_size():
+    tier = LocalTier(max_entries=2, max_bytes=100)
+    tier.set('a', 1, size=10, ttl=60)
+    tier.set('b', 2, size=10, ttl=60)
+    tier.get('a')
+    tier.set('c', 3, size=10, ttl=60)
+    assert tier.get('b') is MISSING and tier.get('a') == 1
+    tier.set('big', 4, size=95, ttl=60)
+    assert len(tier) == 1 and tier.bytes == 95
+
+def test_local_tier_expires_entries():
+    tier = LocalTier(max_entries=10, max_bytes=100)
+    tier.set('a', 1, size=1, ttl=0.01)
+    time.sleep(0.02)
+    assert tier.get('a') is MISSING
+    assert tier.bytes == 0
+
+def test_keys_are_versioned():
+    assert _cache().key('iphone') == 'search:v1:iphone'
+
+def test_entries_go_stale_after_soft_ttl():
+    cache = _cache()
+    cache.set('iphone', {'offers': [1]}, soft_ttl=0.01)
+    assert cache.lookup('iphone') == ({'offers': [1]}, False)
+    time.sleep(0.02)
+    assert cache.lookup('iphone') == ({'offers': [1]}, True)
+
+def test_search_keys_are_canonical():
+    assert search_key('iPhone  15') == search_key(' iphone-15 ') == 'iphone 15'
+    assert search_key('shoes', {'size': 9, 'brand': 'Nike'}) == search_key('Shoes', {'brand': 'nike', 'size': 9})
+    assert search_key('shoes', {'brand': 'nike'}) != search_key('shoes')
+    assert len(search_key('x' * 500)) == 40
+
+def test_cache_search_defaults_to_the_configured_ttl(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(cache_module, 'search_cache', cache)
+    written = []
+    monkeypatch.setattr(cache.remote, 'set', lambda key, raw, ttl: written.append(ttl))
+    cache_search('iphone', {'offers': []})
+    cache_search('iphone', {'offers': []}, ttl=5)
+    assert written == [60, 5]
+
+def test_failing_redis_is_skipped_for_retry_after():
+    tier = RedisTier('redis://127.0.0.1:1', retry_after=60)
+    assert tier.get('a') is None and tier.stats.errors == 1
+    assert not tier.cooldown.available()
+    assert tier.get('a') is None and tier.stats.errors == 1
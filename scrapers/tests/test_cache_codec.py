@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from scrapers.cache_codec import COMPRESSORS, SERIALIZERS, Codec, CodecError, decode, payload_size
+
+VALUE = {'value': {'amazon': [{'product_title': 'iPhone 15', 'price': 69999.0, 'timestamp': None}] * 50},
+         'fresh_until': 1700000000.5}
+
+def test_every_codec_round_trips_and_any_codec_reads_it():
+    reader = Codec()
+    for serializer, _, _ in SERIALIZERS.values():
+        for compressor, _, _ in COMPRESSORS.values():
+            raw = Codec(serializer, compressor, compress_min=100).encode(VALUE)
+            assert reader.decode(raw) == VALUE
+            assert payload_size(raw) >= len(raw) - 9
+
+def test_small_payloads_stay_uncompressed():
+    codec = Codec('json', 'zlib', compress_min=10000)
+    raw = codec.encode(VALUE)
+    assert raw[4] == 0 and decode(raw) == VALUE
+    assert len(Codec('json', 'zlib', compress_min=0).encode(VALUE)) < len(raw)
+
+def test_legacy_json_and_corrupt_payloads():
+    assert decode(json.dumps(VALUE).encode()) == VALUE
+    with pytest.raises(CodecError):
+        decode(Codec('json', 'zlib', compress_min=0).encode(VALUE)[:-5])
@@ -0,0 +1,34 @@
+import httpx
+
+from scrapers.adapters import REGISTRY
+from scrapers.fixtures.server import FixtureServer
+from scrapers.parsing import BACKENDS
+from scrapers.review_scraper import scrape_reviews_amazon
+from scrapers import engine  # noqa: F401
+
+def test_backends_agree_on_fixture_pages():
+    with FixtureServer() as server:
+        for site, pages in server.search_pages.items():
+            adapter = REGISTRY[site]
+            for html in pages.values():
+                reference = adapter.parse(html.decode(), 'bs4')
+                assert reference
+                for backend in BACKENDS:
+                    assert adapter.parse(html.decode(), backend) == reference
+
+def test_search_against_fixture_server():
+    with FixtureServer() as server:
+        results = server.adapter(REGISTRY['amazon']).search_sync('iPhone 15')
+        assert len(results) == 48
+        assert all(r['site'] == 'Amazon' and r['price'] > 0 for r in results)
+
+def test_reviews_against_fixture_server():
+    with FixtureServer() as server:
+        reviews = scrape_reviews_amazon(server.review_url('amazon', 'iphone_15'))
+        assert len(reviews) == 10
+        assert all(1 <= r['rating'] <= 5 for r in reviews)
+
+def test_error_injection():
+    with FixtureServer(fail_sites=['flipkart']) as server:
+        assert httpx.get(server.search_url('flipkart').format(query='x')).status_code == 503
+        assert httpx.get(server.search_url('amazon').format(query='x')).status_code == 200
@@ -0,0 +1,29 @@
+from scrapers.matching import TitleIndex, blocking_keys, match_offers
+from scrapers.normalize import match_titles
+
+AMAZON = ['Samsung Galaxy S24 Ultra (256 GB, Titanium)', 'Apple iPhone 15 (128 GB) - Black', 'Nike Running Shoes']
+FLIPKART = ['SAMSUNG Galaxy S24 Ultra (Titanium, 256 GB)', 'APPLE iPhone 15 (128GB) Black', 'Apple iPhone 14 (Blue, 128 GB)']
+
+def test_blocking_keys_use_brand_and_model_tokens():
+    assert blocking_keys('Samsung Galaxy S24 Ultra (256 GB)') == {'samsung|s24', 'samsung|24'}
+    assert blocking_keys('Nike Running Shoes') == {'nike|running'}
+    assert blocking_keys('Dove Shampoo 650ml') == {'dove|shampoo'}
+
+def test_clusters_agree_with_pairwise_matching():
+    index = TitleIndex()
+    index.add_all(AMAZON, 'Amazon')
+    index.add_all(FLIPKART, 'Flipkart')
+    titles = AMAZON + FLIPKART
+    expected = {(a, b) for a in range(len(titles)) for b in range(a + 1, len(titles))
+                if match_titles(titles[a], titles[b])}
+    assert set(index.pairs()) == expected
+    clusters = index.clusters(cross_source=True)
+    assert sorted(c.members for c in clusters) == [[0, 3], [1, 4]]
+    assert all(c.score > 80 for c in clusters)
+    assert index.query('Apple iPhone 15 128 GB Black')[0][0] in (1, 4)
+
+def test_match_offers_groups_search_results():
+    results = {'Amazon': [{'product_title': t} for t in AMAZON],
+               'Flipkart': [{'product_title': t} for t in FLIPKART], 'Myntra': None}
+    groups = match_offers(results)
+    assert len(groups) == 2 and all(len(g) == 2 for g in groups)
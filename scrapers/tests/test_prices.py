@@ -0,0 +1,41 @@
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from scrapers.normalize import normalize_price
+from scrapers.prices import FxTable, convert_offers, detect_currencies, load_fx_table, parse_price, parse_prices
+
+def test_parse_prices_handles_symbols_ranges_and_mrp():
+    parsed = parse_prices(['₹1,299', 'Rs. 1,099.50', '₹1,299 - ₹1,499', '₹999 M.R.P.: ₹1,999',
+                           'M.R.P. ₹1,999', 'Price on request', None, '1,299.'])
+    nan = math.nan
+    np.testing.assert_array_equal(parsed.price, [1299, 1099.5, 1299, 999, 1999, nan, nan, 1299])
+    np.testing.assert_array_equal(parsed.high, [1299, 1099.5, 1499, 999, 1999, nan, nan, 1299])
+    np.testing.assert_array_equal(parsed.mrp, [nan, nan, nan, 1999, 1999, nan, nan, nan])
+    assert parse_price('M.R.P.: ₹1,999 ₹1,299') == 1299
+    with pytest.raises(ValueError):
+        parse_price('Currently unavailable')
+
+def test_detect_currencies():
+    assert detect_currencies(['₹10', 'Rs 10', '$10', '€ 10', '10', None]).tolist() == \
+        ['INR', 'INR', 'USD', 'EUR', 'INR', 'INR']
+
+def test_fx_conversion_is_vectorized_and_reloads_changed_tables(tmp_path):
+    table = FxTable({'USD': 80.0, 'EUR': 100.0}, version='test')
+    np.testing.assert_allclose(table.convert([800, 10, 10], ['INR', 'usd', 'EUR'], to='USD'), [10, 10, 12.5])
+    assert table.convert(160, 'INR', to='USD') == 2
+    with pytest.raises(ValueError):
+        table.convert([1], ['XYZ'])
+    offers = [{'price': 10.0, 'currency': 'USD'}, {'price': 100.0, 'currency': 'INR'}]
+    np.testing.assert_allclose(convert_offers(offers, 'INR', table), [800, 100])
+
+    path = tmp_path / 'fx.json'
+    path.write_text(json.dumps({'version': 'v1', 'rates': {'USD': 80}}))
+    assert load_fx_table(str(path)) is load_fx_table(str(path))
+    path.write_text(json.dumps({'version': 'v2', 'rates': {'USD': 90}}))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+    assert load_fx_table(str(path)).version == 'v2'
+    assert normalize_price(100, 'INR') == 100
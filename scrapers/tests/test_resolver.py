@@ -0,0 +1,22 @@
+from scrapers.resolver import ProductResolver
+
+def test_offers_join_matching_products_or_start_new_ones():
+    resolver = ProductResolver()
+    s24 = resolver.resolve('Samsung Galaxy S24 Ultra (256 GB, Titanium)')
+    iphone = resolver.resolve('Apple iPhone 15 (128 GB) - Black')
+    assert resolver.resolve('SAMSUNG Galaxy S24 Ultra (Titanium, 256 GB)') == s24
+    assert resolver.resolve('APPLE iPhone 15 (128GB) Black') == iphone
+    assert resolver.resolve('Samsung Galaxy S23 FE (128 GB, Mint)') not in (s24, iphone)
+    assert resolver.product(s24).canonical_title == 'Samsung Galaxy S24 Ultra (256 GB, Titanium)'
+    assert resolver.product(s24).offers == 2
+    assert resolver.stats() == {'products': 3, 'titles': 4, 'resolved': 5, 'created': 3}
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'resolver.json.gz')
+    resolver = ProductResolver(max_variants=1)
+    ids = resolver.resolve_many(['Apple iPhone 15 (128 GB) - Black', 'APPLE iPhone 15 (128GB) Black', 'Nike Pegasus 40'])
+    resolver.save(path)
+    assert not resolver.maybe_save(path, interval=0)
+    restored = ProductResolver.load(path, max_variants=1)
+    assert restored.resolve_many(['APPLE iPhone 15 (128GB) Black', 'Nike Pegasus 40']) == ids[1:]
+    assert ProductResolver.load(str(tmp_path / 'missing.json.gz')).stats()['products'] == 0
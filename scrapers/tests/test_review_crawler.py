@@ -0,0 +1,24 @@
+import asyncio
+
+from scrapers.fixtures.build_fixtures import REVIEW_PAGES, REVIEW_SITES
+from scrapers.fixtures.server import FixtureServer
+from scrapers.review_crawler import AMAZON_REVIEWS, FLIPKART_REVIEWS, crawl_reviews
+
+def _crawl(adapter, url, **kwargs):
+    async def run():
+        return [review async for review in crawl_reviews(adapter, url, **kwargs)]
+    return asyncio.run(run())
+
+def test_crawl_follows_pagination_until_empty_page():
+    with FixtureServer() as server:
+        reviews = _crawl(FLIPKART_REVIEWS, server.review_url('flipkart', 'iphone_15'), concurrency=2)
+    assert len(reviews) == REVIEW_PAGES * REVIEW_SITES['flipkart'][1]
+    assert len({r['review_id'] for r in reviews}) == len(reviews)
+
+def test_crawl_stops_at_watermarks():
+    with FixtureServer() as server:
+        url = server.review_url('amazon', 'iphone_15')
+        reviews = _crawl(AMAZON_REVIEWS, url)
+        assert len(_crawl(AMAZON_REVIEWS, url, stop_at_id=reviews[12]['review_id'])) == 12
+        assert len(_crawl(AMAZON_REVIEWS, url, since=reviews[25]['timestamp'])) == 26
+        assert len(_crawl(AMAZON_REVIEWS, url, max_pages=1)) == REVIEW_SITES['amazon'][1]
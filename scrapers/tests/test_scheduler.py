@@ -0,0 +1,43 @@
+import asyncio
+
+import httpx
+import pytest
+
+from scrapers.fixtures.server import FixtureServer
+from scrapers.scheduler import CircuitBreaker, CircuitOpenError, HostScheduler, TokenBucket
+
+def _get(scheduler, url):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await scheduler.request(url, lambda: client.get(url))
+    return asyncio.run(run())
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(capacity=1)
+    assert bucket.take(rate=10) == 0
+    assert 0 < bucket.take(rate=10) <= 0.1
+
+def test_retries_then_gives_up_on_429():
+    scheduler = HostScheduler(rate=1000, max_retries=2, backoff_base=0.01, breaker_threshold=10)
+    with FixtureServer(error_rate=1.0, error_status=429) as server:
+        response = _get(scheduler, server.search_url('amazon').format(query='x'))
+        assert response.status_code == 429
+        assert server.requests == 3
+    assert scheduler.rates  # throttling lowered the host's rate
+
+def test_circuit_opens_after_repeated_failures():
+    scheduler = HostScheduler(rate=1000, max_retries=0, breaker_threshold=2, breaker_reset=60)
+    with FixtureServer(fail_sites=['amazon']) as server:
+        url = server.search_url('amazon').format(query='x')
+        _get(scheduler, url)
+        _get(scheduler, url)
+        with pytest.raises(CircuitOpenError):
+            _get(scheduler, url)
+        assert server.requests == 2
+
+def test_half_open_circuit_closes_on_success():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() == 0
+    breaker.record_success()
+    assert breaker.state == 'closed'
@@ -0,0 +1,185 @@
+import asyncio
+import time
+
+import fakeredis
+
+from scrapers import singleflight
+from scrapers.cache import LocalTier, RedisTier, TwoTierCache
+
+def test_concurrent_misses_compute_once(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    cache = TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=RedisTier(None), local_ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'amazon': [1]}
+
+    async def run():
+        return await asyncio.gather(*(singleflight.cached_call(cache, 'iphone', compute) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {'amazon': [1]} for r in results)
+    assert cache.get('iphone') == {'amazon': [1]}
+
+def test_failures_are_shared_and_not_cached():
+    flight = singleflight.SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('scrape failed')
+
+    async def run():
+        return await asyncio.gather(*(flight.do('k', boom) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+    assert flight.coalesced == 2
+
+def test_stale_hit_is_served_and_refreshed_once(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    cache = TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=RedisTier(None), local_ttl=60)
+    cache.set('iphone', {'amazon': [1]}, soft_ttl=0.001)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {'amazon': [2]}
+
+    async def run():
+        await asyncio.sleep(0.01)
+        stale = await asyncio.gather(*(singleflight.cached_call(cache, 'iphone', compute) for _ in range(5)))
+        await asyncio.sleep(0.05)
+        return stale, await singleflight.cached_call(cache, 'iphone', compute)
+
+    stale, fresh = asyncio.run(run())
+    assert all(r == {'amazon': [1]} for r in stale)
+    assert fresh == {'amazon': [2]} and len(calls) == 1
+
+def test_redis_reads_do_not_block_the_event_loop(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    remote = RedisTier(None)
+
+    def slow_get(key):
+        time.sleep(0.1)  # e.g. Redis timing out
+        return None
+
+    monkeypatch.setattr(remote, 'get', slow_get)
+    cache = TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=remote, local_ttl=60)
+
+    async def compute():
+        return {'amazon': [1]}
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(ticker())
+        value = await singleflight.cached_call(cache, 'iphone', compute)
+        task.cancel()
+        return value, ticks
+
+    value, ticks = asyncio.run(run())
+    assert value == {'amazon': [1]}
+    assert ticks >= 10
+
+def test_refresh_is_not_repeated_by_other_workers(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    remote = RedisTier('redis://shared')
+    remote._client = fakeredis.FakeRedis()
+    workers = [TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=remote, local_ttl=60)
+               for _ in range(2)]
+    workers[0].set('iphone', {'amazon': [1]}, soft_ttl=0.05)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {'amazon': [2]}
+
+    async def run():
+        for worker in workers:
+            assert await singleflight.cached_call(worker, 'iphone', compute) == {'amazon': [1]}
+        await asyncio.sleep(0.06)
+        # Both workers see the stale entry one after the other, as with a lease
+        # that is released between their refreshes
+        await singleflight.cached_call(workers[0], 'iphone', compute)
+        await asyncio.sleep(0.02)
+        return await singleflight.cached_call(workers[1], 'iphone', compute)
+
+    assert asyncio.run(run()) == {'amazon': [2]}
+    assert len(calls) == 1
+
+def test_failed_refresh_without_redis_keeps_the_stale_entry(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    cache = TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=RedisTier(None), local_ttl=60)
+    cache.set('iphone', {'amazon': [1]}, soft_ttl=0.001)
+
+    async def compute():
+        raise RuntimeError('site down')
+
+    async def run():
+        await asyncio.sleep(0.01)
+        value = await singleflight.cached_call(cache, 'iphone', compute)
+        await asyncio.sleep(0.02)
+        return value
+
+    assert asyncio.run(run()) == {'amazon': [1]}
+    assert cache.lookup('iphone') == ({'amazon': [1]}, True)
+
+def test_partial_results_are_cached_briefly(monkeypatch):
+    from scrapers import engine
+
+    class Site:
+        def __init__(self, rows):
+            self.rows = rows
+
+        async def search(self, query):
+            if self.rows is None:
+                raise RuntimeError('site down')
+            return self.rows
+
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    cache = TwoTierCache('search', 1, ttl=3600, local=LocalTier(100, 10000), remote=RedisTier(None), local_ttl=60)
+    monkeypatch.setattr(engine, 'get_or_search',
+                        lambda query, compute: singleflight.cached_call(cache, query, compute))
+    monkeypatch.setattr(engine.config, 'SEARCH_CACHE_PARTIAL_TTL', 0)
+    sites = {'up': Site([{'price': 1}]), 'down': Site(None)}
+    monkeypatch.setattr(engine, 'REGISTRY', sites)
+
+    assert engine.search_all_cached_sync('iphone') == {'up': [{'price': 1}], 'down': []}
+    assert cache.get('iphone') is None
+
+    monkeypatch.setattr(engine.config, 'SEARCH_CACHE_PARTIAL_TTL', 1)
+    engine.search_all_cached_sync('iphone')
+    assert cache.get('iphone') is not None
+    time.sleep(1.1)
+    assert cache.get('iphone') is None
+
+    sites['down'].rows = [{'price': 2}]
+    assert engine.search_all_cached_sync('iphone')['down'] == [{'price': 2}]
+    assert cache.get('iphone') == {'up': [{'price': 1}], 'down': [{'price': 2}]}
+
+
+def test_incomplete_refresh_keeps_the_stale_entry(monkeypatch):
+    monkeypatch.setattr(singleflight, 'lease', singleflight.RedisLease(None))
+    cache = TwoTierCache('search', 1, ttl=60, local=LocalTier(100, 10000), remote=RedisTier(None), local_ttl=60)
+    cache.set('iphone', {'amazon': [1]}, soft_ttl=0.001)
+
+    async def compute():
+        return singleflight.CacheFor({'amazon': []}, 60)
+
+    async def run():
+        await asyncio.sleep(0.01)
+        value = await singleflight.cached_call(cache, 'iphone', compute)
+        await asyncio.sleep(0.02)
+        return value
+
+    assert asyncio.run(run()) == {'amazon': [1]}
+    assert cache.lookup('iphone') == ({'amazon': [1]}, True)
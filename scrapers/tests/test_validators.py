@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from scrapers import validators
+from scrapers.adapters import REGISTRY
+from scrapers.fixtures.server import FixtureServer
+from scrapers import engine
+
+def test_unchanged_page_is_skipped(monkeypatch):
+    monkeypatch.setattr(validators, 'store', validators.ValidatorStore(redis_url=None))
+    with FixtureServer() as server:
+        adapter = server.adapter(REGISTRY['flipkart'])
+        changed = adapter.search_changed_sync('iPhone 15')
+        assert changed.rows and changed.url == adapter.url_for('iPhone 15')
+        engine.commit_validators_sync({changed.url: changed.validators})
+        assert adapter.search_changed_sync('iPhone 15') is None
+        # Plain searches always return results
+        assert adapter.search_sync('iPhone 15')
+
+def test_uncommitted_page_is_fetched_again(monkeypatch):
+    monkeypatch.setattr(validators, 'store', validators.ValidatorStore(redis_url=None))
+    with FixtureServer() as server:
+        adapter = server.adapter(REGISTRY['flipkart'])
+        first = adapter.search_changed_sync('iPhone 15')
+        # The caller failed to persist the rows, so nothing was committed
+        second = adapter.search_changed_sync('iPhone 15')
+        assert second is not None and second.rows == first.rows
+
+def test_body_hash_catches_servers_without_etags(monkeypatch):
+    store = validators.ValidatorStore(redis_url=None)
+    monkeypatch.setattr(validators, 'store', store)
+    with FixtureServer() as server:
+        adapter = server.adapter(REGISTRY['amazon'])
+        changed = adapter.search_changed_sync('iPhone 15')
+        engine.commit_validators_sync({changed.url: dict(changed.validators, etag='')})
+        assert adapter.search_changed_sync('iPhone 15') is None
+        assert server.requests == 2
+
+def test_failed_site_is_not_an_empty_result(monkeypatch):
+    monkeypatch.setattr(validators, 'store', validators.ValidatorStore(redis_url=None))
+    with FixtureServer(fail_sites=['flipkart'], error_status=404) as server:
+        adapter = server.adapter(REGISTRY['flipkart'])
+        with pytest.raises(httpx.HTTPStatusError):
+            adapter.search_changed_sync('iPhone 15')
+        monkeypatch.setitem(engine.REGISTRY, 'flipkart', adapter)
+        results = engine.search_all_sync('iPhone 15', sites=['flipkart'], skip_unchanged=True)
+        assert results['flipkart'] is engine.FAILED
+        assert asyncio.run(validators.store.get(adapter.url_for('iPhone 15'))) == {}
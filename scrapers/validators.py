@@ -0,0 +1,83 @@
+"""
+Per-URL change detection for repeat scrapes.
+
+For every URL fetched in conditional mode we remember the ETag, Last-Modified
+and a hash of the body. The next fetch sends If-None-Match/If-Modified-Since;
+a 304, or a 200 whose body hashes the same as last time, means the page is
+unchanged and the caller can skip parsing and writing it again. Validators are
+only stored once the caller has persisted the page (see http_pool.fetch_if_changed),
+and are kept in Redis so every worker sees them, with an in-process LRU fallback.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from scrapers import config
+from scrapers.redis_pool import RedisCooldown, get_async_redis
+
+
+def content_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ValidatorStore:
+    def __init__(self, redis_url: Optional[str], ttl: int = 7 * 24 * 3600, local_size: int = 10000,
+                 retry_after: float = 30.0):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.local_size = local_size
+        self.cooldown = RedisCooldown('Validator store', 'using local store', retry_after)
+        self._local: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return 'scraper:validators:' + hashlib.sha1(url.encode()).hexdigest()
+
+    def _redis(self):
+        if self.redis_url and self.cooldown.available():
+            return get_async_redis(self.redis_url)
+        return None
+
+    async def get(self, url: str) -> Dict[str, str]:
+        redis = self._redis()
+        if redis is not None:
+            try:
+                stored = await redis.hgetall(self._key(url))
+                return {k.decode(): v.decode() for k, v in stored.items()}
+            except Exception as e:
+                self.cooldown.failed(e)
+        stored = self._local.get(url)
+        if stored is not None:
+            self._local.move_to_end(url)
+        return dict(stored or {})
+
+    async def set(self, url: str, validators: Dict[str, str]):
+        validators = {k: v for k, v in validators.items() if v}
+        redis = self._redis()
+        if redis is not None:
+            try:
+                key = self._key(url)
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.hset(key, mapping=validators)
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                self.cooldown.failed(e)
+        self._local[url] = validators
+        self._local.move_to_end(url)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+
+def request_headers(stored: Dict[str, str]) -> Dict[str, str]:
+    headers = {}
+    if stored.get('etag'):
+        headers['If-None-Match'] = stored['etag']
+    if stored.get('last_modified'):
+        headers['If-Modified-Since'] = stored['last_modified']
+    return headers
+
+
+store = ValidatorStore(config.REDIS_URL if config.SHARED_VALIDATORS else None)